@@ -0,0 +1,54 @@
+from typing import Optional, Set
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.lookups import get_global_grant, get_project_grant
+from app.models.project import UserProject, GlobalAccess, OwnerVersion, ProjectRole, GlobalRole
+
+def get_affected_user_ids(db: Session, owner_id: int, project_id: Optional[int] = None) -> Set[int]:
+    """Users whose view of an owner's projects changes when that data changes.
+
+    That is the owner, everyone holding global access from the owner and, for a
+    single project, everyone with individual access to it. Call this before
+    deleting grant rows, since the deleted grantees are affected too.
+    """
+    user_ids = {owner_id}
+    user_ids.update(db.execute(
+        select(GlobalAccess.user_id).where(GlobalAccess.owner_id == owner_id)
+    ).scalars())
+    if project_id is not None:
+        user_ids.update(db.execute(
+            select(UserProject.user_id).where(UserProject.project_id == project_id)
+        ).scalars())
+    return user_ids
+
+def bump_owner_version(db: Session, owner_id: int) -> None:
+    """Advance the version of an owner's data, in the transaction that changes it.
+
+    Call it for every change to the owner's projects, their keywords or the
+    grants the owner gave; ``db`` must be on the owner's shard. The row stays
+    locked until commit, so writes to one owner's data commit one at a time.
+    """
+    versions = OwnerVersion.__table__
+    bump = update(versions).where(versions.c.owner_id == owner_id).values(version=versions.c.version + 1)
+    if db.execute(bump).rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.execute(insert(versions).values(owner_id=owner_id, version=1))
+        except IntegrityError:
+            # A concurrent first write created the row
+            db.execute(bump)
+
+def can_edit_project_keywords(db: Session, project, user_id: int) -> bool:
+    """Whether a user may change a project's keywords: its owner, a full access
+    grantee of the project, or an administrator of the owner's projects.
+
+    ``db`` must be on the project's shard.
+    """
+    if project.owner_id == user_id:
+        return True
+    individual_access = get_project_grant(db, project.id, user_id)
+    if individual_access and individual_access.role == ProjectRole.FULL_ACCESS:
+        return True
+    global_access = get_global_grant(db, project.owner_id, user_id)  # Check against project's owner
+    return bool(global_access and global_access.role == GlobalRole.ADMINISTRATOR)
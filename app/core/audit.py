@@ -0,0 +1,131 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import engine, run_after_commit
+from app.core.logs import request_id_var
+from app.models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Audit trail of access and keyword changes. Routes record events as part of
+# their transaction; once it commits the events go onto a bounded in-memory
+# queue, and a background thread writes them to audit_events with one
+# multi-row INSERT per batch (AUDIT_BATCH_SIZE events, or whatever arrived
+# within AUDIT_FLUSH_SECONDS). Mutations never wait on the audit write.
+#
+# Events are lost if the queue is full or a batch fails to write, and those
+# still queued when a process is killed without shutting down; the counters
+# in /metrics show both.
+
+class AuditLog:
+    """Bounded queue of audit event rows, flushed in batches from a background thread."""
+
+    def __init__(self, max_queue: int, batch_size: int, interval_seconds: float):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, event: dict) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Audit queue full, dropped %s event", event["action"])
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch, flushed = self._next_batch()
+            if batch:
+                self._write(batch)
+            if flushed is not None:
+                flushed.set()
+
+    def _next_batch(self) -> Tuple[List[dict], Optional[threading.Event]]:
+        batch = []
+        deadline = time.monotonic() + self.interval_seconds
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Wait until every event submitted so far has been written."""
+        if self._thread is None:
+            return
+        flushed = threading.Event()
+        try:
+            self._queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return
+        flushed.wait(timeout)
+
+    def _write(self, batch: List[dict]) -> None:
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(AuditEvent.__table__), batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to write %d audit events", len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.AUDIT_ENABLED,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queued": self._queue.qsize(),
+        }
+
+audit_log = AuditLog(settings.AUDIT_MAX_QUEUE, settings.AUDIT_BATCH_SIZE, settings.AUDIT_FLUSH_SECONDS)
+
+def record_audit_event(
+    db: Session,
+    action: str,
+    actor_id: int,
+    owner_id: int,
+    project_id: Optional[int] = None,
+    target_user_id: Optional[int] = None,
+    details: Optional[dict] = None
+) -> None:
+    """Queue an audit event for when ``db``'s transaction commits; nothing is recorded if it rolls back."""
+    if not settings.AUDIT_ENABLED:
+        return
+    event = {
+        "action": action,
+        "actor_id": actor_id,
+        "owner_id": owner_id,
+        "project_id": project_id,
+        "target_user_id": target_user_id,
+        "details": details,
+        "request_id": request_id_var.get(),
+        "created_at": datetime.utcnow(),
+    }
+    run_after_commit(db, lambda: audit_log.submit(event))
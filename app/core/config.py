@@ -14,6 +14,49 @@ class Settings(BaseModel):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    JWT_KEYS_DIR: str = ""
+    JWT_ACTIVE_KID: str = ""
+    JWT_ACCEPT_LEGACY_HS256: bool = False
+    JWKS_CACHE_SECONDS: int = 3600
+
+    # Password Hashing Settings
+    PASSWORD_HASH_TARGET_MS: int = 250
+    BCRYPT_ROUNDS: int = 0  # Fixed cost; 0 calibrates at startup
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 14
+    PASSWORD_REHASH_TOLERANCE: int = 1
+    STATELESS_AUTH: bool = False
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = 30
+    TOKEN_VERSION_CACHE_MAX_ENTRIES: int = 100000
+    INTROSPECT_MAX_TOKENS: int = 100
+    SERVICE_API_KEYS: str = ""  # Comma-separated X-Service-Key values for internal endpoints; empty refuses them
+    VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
+    RESET_TOKEN_EXPIRE_HOURS: int = 24
+
+    # Logging Settings
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_INFO_SAMPLE_RATE: float = 1.0  # Fraction of requests whose INFO logs are kept
+    LOG_ACCESS: bool = True
+
+    # Tracing Settings
+    TRACE_SAMPLE_RATE: float = 0.0  # Fraction of requests without a traceparent that are traced
+    TRACE_EXPORT_FILE: str = ""
+    TRACE_EXPORT_URL: str = ""
+    TRACE_MAX_QUEUE: int = 10000
+    TRACE_TRUSTED_NETWORKS: str = ""  # Comma-separated CIDRs whose traceparent sampling decision is followed
+
+    # Profiler Settings
+    PROFILER_SECRET: str = ""  # Empty disables on-demand profiling
+    PROFILER_DIR: str = "/tmp/profiles"
+    PROFILER_INTERVAL_MS: int = 5
+    PROFILER_MAX_SECONDS: int = 30
+    PROFILER_MAX_PER_MINUTE: int = 6
+
+    # Warmup Settings
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 5
 
     # Database Settings
     DB_HOST: str
@@ -22,6 +65,62 @@ class Settings(BaseModel):
     DB_PASSWORD: str
     DB_NAME: str
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated; empty sends every read to the primary
+    REPLICA_STICKY_SECONDS: int = 5
+    DATABASE_SHARD_URLS: str = ""  # Comma-separated, in shard order; empty keeps project data on the primary
+    SHARD_PLACEMENT_REFRESH_SECONDS: int = 10
+    SHARD_SCATTER_WORKERS: int = 8
+    SHARD_DIRECTORY_CACHE_MAX_ENTRIES: int = 100000
+
+    # Keyword Index Settings
+    KEYWORD_INDEX_ENABLED: bool = True
+    KEYWORD_INDEX_MAX_PREFIX_TERMS: int = 10000
+    KEYWORD_INDEX_REFRESH_SECONDS: int = 5
+    KEYWORD_CHANGES_MAX_BATCH: int = 5000
+    KEYWORD_IMPORT_CHUNK_ROWS: int = 5000
+    KEYWORD_IMPORT_MAX_ERRORS: int = 1000
+
+    # Response Cache Settings
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+
+    # Idempotency Settings
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    IDEMPOTENCY_WAIT_SECONDS: int = 30
+
+    # Single-flight Settings
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Audit Log Settings
+    AUDIT_ENABLED: bool = True
+    AUDIT_MAX_QUEUE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_QUERY_MAX_LIMIT: int = 500
+
+    # Notification Settings
+    NOTIFY_ENABLED: bool = True
+    NOTIFY_BACKEND: str = "local"  # "local" (single worker) or "redis" (across workers)
+    NOTIFY_REDIS_URL: str = "redis://localhost:6379/0"
+    NOTIFY_REDIS_CHANNEL: str = "project-notifications"
+    NOTIFY_QUEUE_SIZE: int = 100
+    NOTIFY_MAX_STREAMS: int = 1000
+    NOTIFY_HEARTBEAT_SECONDS: int = 15
+    NOTIFY_MAX_STREAM_SECONDS: int = 3600
+
+    # Maintenance Settings
+    MAINTENANCE_ENABLED: bool = False
+    MAINTENANCE_DRY_RUN: bool = False
+    MAINTENANCE_TICK_SECONDS: int = 60
+    MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    MAINTENANCE_LEASE_SECONDS: int = 900
+    MAINTENANCE_BATCH_SIZE: int = 500
+    MAINTENANCE_MAX_BATCHES: int = 100
+    MAINTENANCE_THROTTLE_SECONDS: float = 0.5
+    MAINTENANCE_UNVERIFIED_ACCOUNT_DAYS: int = 30
 
     @classmethod
     def from_env(cls):
@@ -40,12 +139,87 @@ class Settings(BaseModel):
             JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "your-secret-key-here"),
             JWT_ALGORITHM=os.getenv("JWT_ALGORITHM", "HS256"),
             ACCESS_TOKEN_EXPIRE_MINUTES=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+            JWT_KEYS_DIR=os.getenv("JWT_KEYS_DIR", ""),
+            JWT_ACTIVE_KID=os.getenv("JWT_ACTIVE_KID", ""),
+            JWT_ACCEPT_LEGACY_HS256=os.getenv("JWT_ACCEPT_LEGACY_HS256", "false").lower() == "true",
+            JWKS_CACHE_SECONDS=int(os.getenv("JWKS_CACHE_SECONDS", "3600")),
+            PASSWORD_HASH_TARGET_MS=int(os.getenv("PASSWORD_HASH_TARGET_MS", "250")),
+            BCRYPT_ROUNDS=int(os.getenv("BCRYPT_ROUNDS", "0")),
+            BCRYPT_MIN_ROUNDS=int(os.getenv("BCRYPT_MIN_ROUNDS", "10")),
+            BCRYPT_MAX_ROUNDS=int(os.getenv("BCRYPT_MAX_ROUNDS", "14")),
+            PASSWORD_REHASH_TOLERANCE=int(os.getenv("PASSWORD_REHASH_TOLERANCE", "1")),
+            STATELESS_AUTH=os.getenv("STATELESS_AUTH", "false").lower() == "true",
+            TOKEN_VERSION_CACHE_TTL_SECONDS=int(os.getenv("TOKEN_VERSION_CACHE_TTL_SECONDS", "30")),
+            TOKEN_VERSION_CACHE_MAX_ENTRIES=int(os.getenv("TOKEN_VERSION_CACHE_MAX_ENTRIES", "100000")),
+            INTROSPECT_MAX_TOKENS=int(os.getenv("INTROSPECT_MAX_TOKENS", "100")),
+            SERVICE_API_KEYS=os.getenv("SERVICE_API_KEYS", ""),
+            VERIFICATION_TOKEN_EXPIRE_HOURS=int(os.getenv("VERIFICATION_TOKEN_EXPIRE_HOURS", "24")),
+            RESET_TOKEN_EXPIRE_HOURS=int(os.getenv("RESET_TOKEN_EXPIRE_HOURS", "24")),
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+            LOG_JSON=os.getenv("LOG_JSON", "true").lower() == "true",
+            LOG_QUEUE_SIZE=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            LOG_INFO_SAMPLE_RATE=float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0")),
+            LOG_ACCESS=os.getenv("LOG_ACCESS", "true").lower() == "true",
+            TRACE_SAMPLE_RATE=float(os.getenv("TRACE_SAMPLE_RATE", "0.0")),
+            TRACE_EXPORT_FILE=os.getenv("TRACE_EXPORT_FILE", ""),
+            TRACE_EXPORT_URL=os.getenv("TRACE_EXPORT_URL", ""),
+            TRACE_MAX_QUEUE=int(os.getenv("TRACE_MAX_QUEUE", "10000")),
+            TRACE_TRUSTED_NETWORKS=os.getenv("TRACE_TRUSTED_NETWORKS", ""),
+            PROFILER_SECRET=os.getenv("PROFILER_SECRET", ""),
+            PROFILER_DIR=os.getenv("PROFILER_DIR", "/tmp/profiles"),
+            PROFILER_INTERVAL_MS=int(os.getenv("PROFILER_INTERVAL_MS", "5")),
+            PROFILER_MAX_SECONDS=int(os.getenv("PROFILER_MAX_SECONDS", "30")),
+            PROFILER_MAX_PER_MINUTE=int(os.getenv("PROFILER_MAX_PER_MINUTE", "6")),
+            WARMUP_ENABLED=os.getenv("WARMUP_ENABLED", "true").lower() == "true",
+            WARMUP_DB_CONNECTIONS=int(os.getenv("WARMUP_DB_CONNECTIONS", "5")),
             DB_HOST=os.getenv("DB_HOST", "localhost"),
             DB_PORT=os.getenv("DB_PORT", "3306"),
             DB_USER=os.getenv("DB_USER", "root"),
             DB_PASSWORD=os.getenv("DB_PASSWORD", ""),
             DB_NAME=os.getenv("DB_NAME", "auth_db"),
-            DATABASE_URL=database_url
+            DATABASE_URL=database_url,
+            DATABASE_REPLICA_URLS=os.getenv("DATABASE_REPLICA_URLS", ""),
+            REPLICA_STICKY_SECONDS=int(os.getenv("REPLICA_STICKY_SECONDS", "5")),
+            DATABASE_SHARD_URLS=os.getenv("DATABASE_SHARD_URLS", ""),
+            SHARD_PLACEMENT_REFRESH_SECONDS=int(os.getenv("SHARD_PLACEMENT_REFRESH_SECONDS", "10")),
+            SHARD_SCATTER_WORKERS=int(os.getenv("SHARD_SCATTER_WORKERS", "8")),
+            SHARD_DIRECTORY_CACHE_MAX_ENTRIES=int(os.getenv("SHARD_DIRECTORY_CACHE_MAX_ENTRIES", "100000")),
+            KEYWORD_INDEX_ENABLED=os.getenv("KEYWORD_INDEX_ENABLED", "true").lower() == "true",
+            KEYWORD_INDEX_MAX_PREFIX_TERMS=int(os.getenv("KEYWORD_INDEX_MAX_PREFIX_TERMS", "10000")),
+            KEYWORD_INDEX_REFRESH_SECONDS=int(os.getenv("KEYWORD_INDEX_REFRESH_SECONDS", "5")),
+            KEYWORD_CHANGES_MAX_BATCH=int(os.getenv("KEYWORD_CHANGES_MAX_BATCH", "5000")),
+            KEYWORD_IMPORT_CHUNK_ROWS=int(os.getenv("KEYWORD_IMPORT_CHUNK_ROWS", "5000")),
+            KEYWORD_IMPORT_MAX_ERRORS=int(os.getenv("KEYWORD_IMPORT_MAX_ERRORS", "1000")),
+            RESPONSE_CACHE_ENABLED=os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true",
+            RESPONSE_CACHE_TTL_SECONDS=int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60")),
+            RESPONSE_CACHE_MAX_ENTRIES=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000")),
+            IDEMPOTENCY_ENABLED=os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true",
+            IDEMPOTENCY_TTL_SECONDS=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+            IDEMPOTENCY_MAX_ENTRIES=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+            IDEMPOTENCY_WAIT_SECONDS=int(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30")),
+            SINGLE_FLIGHT_ENABLED=os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true",
+            AUDIT_ENABLED=os.getenv("AUDIT_ENABLED", "true").lower() == "true",
+            AUDIT_MAX_QUEUE=int(os.getenv("AUDIT_MAX_QUEUE", "10000")),
+            AUDIT_BATCH_SIZE=int(os.getenv("AUDIT_BATCH_SIZE", "500")),
+            AUDIT_FLUSH_SECONDS=float(os.getenv("AUDIT_FLUSH_SECONDS", "2.0")),
+            AUDIT_QUERY_MAX_LIMIT=int(os.getenv("AUDIT_QUERY_MAX_LIMIT", "500")),
+            NOTIFY_ENABLED=os.getenv("NOTIFY_ENABLED", "true").lower() == "true",
+            NOTIFY_BACKEND=os.getenv("NOTIFY_BACKEND", "local"),
+            NOTIFY_REDIS_URL=os.getenv("NOTIFY_REDIS_URL", "redis://localhost:6379/0"),
+            NOTIFY_REDIS_CHANNEL=os.getenv("NOTIFY_REDIS_CHANNEL", "project-notifications"),
+            NOTIFY_QUEUE_SIZE=int(os.getenv("NOTIFY_QUEUE_SIZE", "100")),
+            NOTIFY_MAX_STREAMS=int(os.getenv("NOTIFY_MAX_STREAMS", "1000")),
+            NOTIFY_HEARTBEAT_SECONDS=int(os.getenv("NOTIFY_HEARTBEAT_SECONDS", "15")),
+            NOTIFY_MAX_STREAM_SECONDS=int(os.getenv("NOTIFY_MAX_STREAM_SECONDS", "3600")),
+            MAINTENANCE_ENABLED=os.getenv("MAINTENANCE_ENABLED", "false").lower() == "true",
+            MAINTENANCE_DRY_RUN=os.getenv("MAINTENANCE_DRY_RUN", "false").lower() == "true",
+            MAINTENANCE_TICK_SECONDS=int(os.getenv("MAINTENANCE_TICK_SECONDS", "60")),
+            MAINTENANCE_INTERVAL_SECONDS=int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600")),
+            MAINTENANCE_LEASE_SECONDS=int(os.getenv("MAINTENANCE_LEASE_SECONDS", "900")),
+            MAINTENANCE_BATCH_SIZE=int(os.getenv("MAINTENANCE_BATCH_SIZE", "500")),
+            MAINTENANCE_MAX_BATCHES=int(os.getenv("MAINTENANCE_MAX_BATCHES", "100")),
+            MAINTENANCE_THROTTLE_SECONDS=float(os.getenv("MAINTENANCE_THROTTLE_SECONDS", "0.5")),
+            MAINTENANCE_UNVERIFIED_ACCOUNT_DAYS=int(os.getenv("MAINTENANCE_UNVERIFIED_ACCOUNT_DAYS", "30"))
         )
 
 settings = Settings.from_env()
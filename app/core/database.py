@@ -1,4 +1,11 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -10,13 +17,140 @@ engine = create_engine(
     pool_recycle=3600,  # Recycle connections after 1 hour
 )
 
+# Optional read replicas, used only by endpoints marked with @read_only
+replica_engines = [
+    create_engine(url.strip(), pool_pre_ping=True, pool_recycle=3600)
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+_next_replica = itertools.cycle(replica_engines)
+
+# Shards holding owner-scoped project data (see app/core/sharding.py). Without
+# DATABASE_SHARD_URLS the primary is the only shard.
+shard_engines = [
+    engine if url.strip() == settings.DATABASE_URL else create_engine(url.strip(), pool_pre_ping=True, pool_recycle=3600)
+    for url in settings.DATABASE_SHARD_URLS.split(",")
+    if url.strip()
+] or [engine]
+
+logger = logging.getLogger(__name__)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+_read_only_endpoints = set()
+
+def read_only(endpoint):
+    """Mark a route endpoint as safe to serve from a read replica.
+
+    Apply it below the router decorator. Everything the request resolves
+    through get_db (including the authentication lookup) then reads from a
+    replica, unless the caller wrote recently.
+    """
+    _read_only_endpoints.add(endpoint)
+    return endpoint
+
+# user id -> monotonic time until which that user's reads go to the primary.
+# Kept per process: with several workers, a read may land on a worker that did
+# not see the write and fall back to replica lag for that one request.
+_sticky_until: Dict[int, float] = {}
+_sticky_lock = threading.Lock()
+_STICKY_MAX_ENTRIES = 100000
+
+def stick_to_primary(user_ids: Iterable[int]) -> None:
+    """Route the users' reads to the primary for REPLICA_STICKY_SECONDS."""
+    until = time.monotonic() + settings.REPLICA_STICKY_SECONDS
+    with _sticky_lock:
+        for user_id in user_ids:
+            _sticky_until[user_id] = until
+        if len(_sticky_until) > _STICKY_MAX_ENTRIES:
+            now = time.monotonic()
+            for user_id in [u for u, t in _sticky_until.items() if t < now]:
+                del _sticky_until[user_id]
+
+def _is_sticky(user_id: Optional[int]) -> bool:
+    if user_id is None:
+        return False
+    until = _sticky_until.get(user_id)
+    return until is not None and until >= time.monotonic()
+
+def _token_subject(request: Request) -> Optional[int]:
+    # Unverified on purpose: this only chooses a database, and a forged subject
+    # can do no more than send the request to the primary. The token is still
+    # fully verified by the authentication dependency.
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(jwt.get_unverified_claims(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
 # Dependency
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    route = request.scope.get("route")
+    if (
+        replica_engines
+        and getattr(route, "endpoint", None) in _read_only_endpoints
+        and not _is_sticky(_token_subject(request))
+    ):
+        db = SessionLocal(bind=next(_next_replica))
+        db.info["replica"] = True
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
+        close_shard_sessions(db)
         db.close()
+
+def close_shard_sessions(db) -> None:
+    """Close the shard sessions opened alongside ``db`` by the shard router."""
+    for shard_db in db.info.pop("shard_sessions", {}).values():
+        shard_db.close()
+
+def run_after_commit(db, callback) -> None:
+    """Run ``callback`` once the session's current transaction commits.
+
+    Callbacks are dropped if the transaction rolls back, so in-memory state
+    (indexes, caches) only ever reflects data that actually reached the database.
+    """
+    db.info.setdefault("after_commit", []).append(callback)
+
+# Shard sessions follow the session they were opened from. Shards commit first,
+# one at a time: there is no two-phase commit, so a failure part way leaves
+# the shards before it committed. These events also fire when a savepoint
+# (begin_nested) is released or rolled back; the listeners wait for the
+# outermost transaction.
+@event.listens_for(SessionLocal, "before_commit")
+def _commit_shard_sessions(session):
+    if session.in_nested_transaction():
+        return
+    for shard_db in session.info.get("shard_sessions", {}).values():
+        shard_db.commit()
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _rollback_shard_sessions(session, previous_transaction):
+    if previous_transaction.nested:
+        return
+    for shard_db in session.info.get("shard_sessions", {}).values():
+        shard_db.rollback()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _run_after_commit_callbacks(session):
+    if session.in_nested_transaction():
+        return
+    # A commit by an authenticated caller is their own write: read it back from the primary
+    if replica_engines and "user_id" in session.info and not session.info.get("replica"):
+        stick_to_primary([session.info["user_id"]])
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("After-commit callback failed")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_commit_callbacks(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop("after_commit", None)
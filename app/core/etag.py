@@ -0,0 +1,33 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values a response is derived from."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Clients may keep the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def json_response(content: bytes, etag: Optional[str] = None) -> Response:
+    """Return an already-serialized JSON body, skipping response_model re-validation."""
+    response = Response(content=content, media_type="application/json")
+    if etag:
+        set_etag(response, etag)
+    return response
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
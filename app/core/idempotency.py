@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import authenticate
+
+# Idempotency-Key support for mutating routes that clients retry on
+# timeouts. The first request with a given key runs; its response is kept
+# for IDEMPOTENCY_TTL_SECONDS and replayed, without running the route again,
+# to every later request from the same user with the same key, method, path
+# and body. The caller is authenticated first, exactly as the route would,
+# so a revoked or stale token never gets a stored response back. A duplicate arriving while the first is still running waits for
+# it. Server errors (5xx) are not kept, so a retry after one runs again.
+#
+# The store is per process: with several workers, a retry routed to another
+# worker runs again and gets the route's own "already exists" answer.
+
+IDEMPOTENCY_KEY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+class IdempotencyStore:
+    """Completed responses by ``(user_id, path, key)`` with TTL and LRU bounds, plus in-flight markers."""
+
+    RUN, REPLAY, WAIT, MISMATCH = "run", "replay", "wait", "mismatch"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, str, str], Tuple[float, str, StoredResponse]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[int, str, str], Tuple[str, asyncio.Event]] = {}
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.replays = 0
+        self.waits = 0
+        self.mismatches = 0
+        self.evictions = 0
+
+    def begin(self, key: Tuple[int, str, str], fingerprint: str):
+        """Return ``(RUN, None)``, ``(REPLAY, response)``, ``(WAIT, event)`` or ``(MISMATCH, None)``.
+
+        RUN marks the key in flight; the caller must call ``finish`` whatever happens.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry[1] != fingerprint:
+                    self.mismatches += 1
+                    return self.MISMATCH, None
+                self._entries.move_to_end(key)
+                self.replays += 1
+                return self.REPLAY, entry[2]
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                if in_flight[0] != fingerprint:
+                    self.mismatches += 1
+                    return self.MISMATCH, None
+                self.waits += 1
+                return self.WAIT, in_flight[1]
+            self._in_flight[key] = (fingerprint, asyncio.Event())
+            return self.RUN, None
+
+    def finish(self, key: Tuple[int, str, str], response: Optional[StoredResponse]) -> None:
+        """Store ``response`` (None: nothing worth replaying) and wake the requests waiting on ``key``."""
+        with self._lock:
+            fingerprint, event = self._in_flight.pop(key)
+            if response is not None:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, fingerprint, response)
+                self.stored += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.IDEMPOTENCY_ENABLED,
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "stored": self.stored,
+                "replays": self.replays,
+                "waits": self.waits,
+                "mismatches": self.mismatches,
+                "evictions": self.evictions,
+            }
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_TTL_SECONDS)
+
+class IdempotencyMiddleware:
+    """Apply Idempotency-Key handling to POST requests on ``paths``.
+
+    Keys are scoped to the authenticated caller; requests that fail
+    authentication pass through and get the route's own 401 (or 400).
+    Replays carry an ``Idempotent-Replayed: true`` header.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+            or not settings.IDEMPOTENCY_ENABLED
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = idempotency_key.decode("latin-1").strip()
+        if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+        # Authentication may query the database: keep it off the event loop
+        user_id = await run_in_threadpool(_authenticated_user_id, headers.get(b"authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = (user_id, scope["path"], idempotency_key)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            state, value = idempotency_store.begin(key, fingerprint)
+            if state == IdempotencyStore.REPLAY:
+                await _send_stored(send, value)
+                return
+            if state == IdempotencyStore.MISMATCH:
+                await _send_error(send, 422, "Idempotency-Key was already used with a different request")
+                return
+            if state == IdempotencyStore.RUN:
+                break
+            try:
+                await asyncio.wait_for(value.wait(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                await _send_error(
+                    send, 409, "A request with this Idempotency-Key is still in progress",
+                    [(b"retry-after", b"1")]
+                )
+                return
+            # The first request finished: replay its response, or run if it left none
+
+        response = StoredResponse(status=0, headers=[], body=b"")
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response.body += message.get("body", b"")
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+            completed = True
+        finally:
+            keep = completed and 0 < response.status < 500
+            idempotency_store.finish(key, response if keep else None)
+
+def _authenticated_user_id(authorization: Optional[bytes]) -> Optional[int]:
+    if authorization is None:
+        return None
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    db = SessionLocal()
+    try:
+        return authenticate(db, token.strip()).id
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Afterwards, only a disconnect can come
+        return await receive()
+    return replay
+
+async def _send_stored(send, response: StoredResponse) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": response.status,
+        "headers": response.headers + [REPLAYED_HEADER],
+    })
+    await send({"type": "http.response.body", "body": response.body})
+
+async def _send_error(send, status: int, detail: str, headers: List[Tuple[bytes, bytes]] = ()) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
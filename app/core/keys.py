@@ -0,0 +1,107 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from app.core.config import settings
+from app.core.tracing import span
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+@dataclass
+class SigningKey:
+    kid: Optional[str]
+    algorithm: str
+    # Parsed once at startup; python-jose re-parses PEM strings on every call
+    private_key: Optional[Key]
+    public_key: Key
+
+class KeyRing:
+    """Keys used to sign and verify JWTs, addressed by ``kid``.
+
+    Only the active key signs. Every other key stays available for verification
+    so tokens signed before a rotation keep working until they expire.
+    """
+
+    def __init__(self, keys: List[SigningKey], active_kid: Optional[str], legacy_key: Optional[SigningKey] = None):
+        self._keys: Dict[Optional[str], SigningKey] = {key.kid: key for key in keys}
+        if active_kid not in self._keys:
+            raise ValueError(f"Active JWT key '{active_kid}' not found")
+        self.active = self._keys[active_kid]
+        if self.active.private_key is None:
+            raise ValueError(f"Active JWT key '{active_kid}' has no private key")
+        # Verifies kid-less HS256 tokens issued before switching to asymmetric keys
+        self.legacy_key = legacy_key
+        self._jwks = json.dumps(self._build_jwks()).encode()
+
+    def sign(self, claims: dict) -> str:
+        headers = {"kid": self.active.kid} if self.active.kid else None
+        with span("jwt.sign", alg=self.active.algorithm, kid=self.active.kid):
+            return jwt.encode(claims, self.active.private_key, algorithm=self.active.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict:
+        """Verify ``token`` with the key named by its ``kid`` header; raises JWTError."""
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        key = self._keys.get(kid)
+        if key is None and kid is None and self.legacy_key is not None:
+            key = self.legacy_key
+        if key is None:
+            raise JWTError("Unknown signing key")
+        with span("jwt.verify", alg=key.algorithm, kid=key.kid):
+            return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+
+    def _build_jwks(self) -> dict:
+        keys = []
+        for key in self._keys.values():
+            if key.algorithm not in ASYMMETRIC_ALGORITHMS:
+                continue
+            entry = key.public_key.to_dict()
+            entry.update({"kid": key.kid, "use": "sig", "alg": key.algorithm})
+            keys.append(entry)
+        return {"keys": keys}
+
+    def jwks_json(self) -> bytes:
+        return self._jwks
+
+def _load_pem_key(path: str, kid: str, algorithm: str) -> SigningKey:
+    with open(path) as f:
+        pem = f.read()
+    key = jwk.construct(pem, algorithm)
+    if "PRIVATE KEY" in pem:
+        return SigningKey(kid=kid, algorithm=algorithm, private_key=key, public_key=key.public_key())
+    return SigningKey(kid=kid, algorithm=algorithm, private_key=None, public_key=key)
+
+def load_keyring() -> KeyRing:
+    """Build the keyring from settings.
+
+    Without JWT_KEYS_DIR the shared JWT_SECRET_KEY is used as before. With it,
+    every ``<kid>.pem`` in the directory is loaded (private keys can sign,
+    public-only keys just verify) and JWT_ACTIVE_KID selects the signer,
+    defaulting to the last kid in sort order.
+    """
+    if not settings.JWT_KEYS_DIR:
+        secret = jwk.construct(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        return KeyRing([SigningKey(None, settings.JWT_ALGORITHM, secret, secret)], None)
+
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"JWT_KEYS_DIR requires one of {sorted(ASYMMETRIC_ALGORITHMS)}, got {settings.JWT_ALGORITHM}")
+
+    keys = [
+        _load_pem_key(os.path.join(settings.JWT_KEYS_DIR, name), name[:-len(".pem")], settings.JWT_ALGORITHM)
+        for name in sorted(os.listdir(settings.JWT_KEYS_DIR))
+        if name.endswith(".pem")
+    ]
+    if not keys:
+        raise ValueError(f"No .pem keys found in {settings.JWT_KEYS_DIR}")
+    signing_kids = [key.kid for key in keys if key.private_key is not None]
+    active_kid = settings.JWT_ACTIVE_KID or (signing_kids[-1] if signing_kids else None)
+
+    legacy_key = None
+    if settings.JWT_ACCEPT_LEGACY_HS256:
+        secret = jwk.construct(settings.JWT_SECRET_KEY, "HS256")
+        legacy_key = SigningKey(None, "HS256", None, secret)
+    return KeyRing(keys, active_kid, legacy_key)
+
+keyring = load_keyring()
@@ -0,0 +1,243 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Dict, List, Optional, Set, Tuple, Union
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.access import bump_owner_version, can_edit_project_keywords, get_affected_user_ids
+from app.core.audit import record_audit_event
+from app.core.config import settings
+from app.core.keywords import add_project_keywords, remove_project_keywords
+from app.core.notifications import notify_after_commit
+from app.core.response_cache import invalidate_after_commit
+from app.core.sharding import shard_router
+from app.models.project import Project
+
+# Bulk keyword import from CSV or NDJSON uploads with project_id, keyword and
+# an optional op column (add, the default, or remove). The upload is parsed
+# KEYWORD_IMPORT_CHUNK_ROWS rows at a time, so memory use does not grow with
+# the file. Each chunk is normalized and deduplicated with vectorized pandas
+# operations (within a chunk the last row for a project and keyword wins),
+# then applied in one transaction with multi-row statements per project.
+# A failing chunk is rolled back on its own; earlier chunks stay applied.
+# Write permission is checked once per project for the whole import.
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+OPS = ("add", "remove")
+MAX_KEYWORD_LENGTH = 255  # keyword_changes.keyword
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    projects: Set[int] = field(default_factory=set)
+    errors: List[dict] = field(default_factory=list)
+
+    def fail(self, rows, error, project_ids=None, keywords=None) -> None:
+        """Record failed rows; ``error``, ``project_ids`` and ``keywords`` are per-row sequences or one value for all."""
+        rows = list(rows)
+        self.failed += len(rows)
+        room = settings.KEYWORD_IMPORT_MAX_ERRORS - len(self.errors)
+        for i, row in enumerate(rows[:max(room, 0)]):
+            project_id = _pick(project_ids, i)
+            keyword = _pick(keywords, i)
+            self.errors.append({
+                "row": int(row),
+                "project_id": None if project_id is None or pd.isna(project_id) or project_id % 1 else int(project_id),
+                "keyword": None if keyword is None or pd.isna(keyword) else str(keyword),
+                "error": _pick(error, i),
+            })
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "added": self.added,
+            "removed": self.removed,
+            "unchanged": self.unchanged,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "projects": len(self.projects),
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+def _pick(values, i):
+    if np.ndim(values) == 0:
+        return values
+    return values[i]
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    return None
+
+def _read_chunks(file: IO[bytes], fmt: str, chunk_rows: int):
+    if fmt == "csv":
+        # Everything as text: ids are validated below and keywords such as "007" stay as written
+        return pd.read_csv(file, chunksize=chunk_rows, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    return pd.read_json(file, lines=True, chunksize=chunk_rows, dtype=False)
+
+def normalize_chunk(chunk: pd.DataFrame, first_row: int, report: ImportReport) -> pd.DataFrame:
+    """Validate and normalize one chunk; return its valid rows, one per project and keyword."""
+    chunk = chunk.reindex(columns=["project_id", "keyword", "op"])
+    rows = np.arange(first_row, first_row + len(chunk))
+    project_ids = pd.to_numeric(chunk["project_id"], errors="coerce")
+    keywords = chunk["keyword"].astype("string").str.strip().str.lower()
+    ops = chunk["op"].astype("string").str.strip().str.lower().replace("", pd.NA).fillna("add")
+
+    errors = np.select(
+        [
+            (project_ids.isna() | (project_ids % 1 != 0) | (project_ids <= 0)).to_numpy(bool),
+            keywords.fillna("").eq("").to_numpy(bool),
+            keywords.str.len().gt(MAX_KEYWORD_LENGTH).fillna(False).to_numpy(bool),
+            (~ops.isin(OPS)).to_numpy(bool),
+        ],
+        [
+            "project_id must be a positive integer",
+            "keyword is empty",
+            f"keyword is longer than {MAX_KEYWORD_LENGTH} characters",
+            "op must be add or remove",
+        ],
+        default=""
+    )
+    invalid = errors != ""
+    if invalid.any():
+        report.fail(rows[invalid], errors[invalid], project_ids[invalid].to_numpy(), keywords[invalid].to_numpy())
+
+    valid = pd.DataFrame({
+        "row": rows[~invalid],
+        "project_id": project_ids[~invalid].astype("int64").to_numpy(),
+        "keyword": keywords[~invalid].to_numpy(object),
+        "op": ops[~invalid].to_numpy(object),
+    })
+    deduped = valid.drop_duplicates(["project_id", "keyword"], keep="last")
+    report.duplicates += len(valid) - len(deduped)
+    return deduped
+
+def _resolve_project(db: Session, project_id: int, user_id: int) -> Union[str, Tuple[Row, Set[int]]]:
+    """The project and the users its keyword changes affect, or why the user cannot change them."""
+    projects = Project.__table__
+    shard_db = shard_router.session_for_project(db, project_id)
+    project = shard_db.execute(
+        select(projects).where(projects.c.id == project_id)
+    ).first() if shard_db is not None else None
+    if project is None:
+        return "Project not found"
+    if not can_edit_project_keywords(shard_db, project, user_id):
+        return "Not authorized to update keywords for this project"
+    return project, get_affected_user_ids(shard_db, project.owner_id, project.id)
+
+def apply_chunk(
+    db: Session,
+    user_id: int,
+    chunk: pd.DataFrame,
+    targets: Dict[int, Union[str, Tuple[Row, Set[int]]]],
+    report: ImportReport
+) -> None:
+    projects = Project.__table__
+    applied = []
+    counts = {"added": 0, "removed": 0, "unchanged": 0}
+    touched = set()
+    try:
+        for project_id, group in chunk.groupby("project_id", sort=False):
+            project_id = int(project_id)
+            target = targets.get(project_id)
+            if target is None:
+                target = targets[project_id] = _resolve_project(db, project_id, user_id)
+            if isinstance(target, str):
+                report.fail(group["row"], target, project_id, group["keyword"].to_numpy())
+                continue
+            try:
+                shard_db = shard_router.session_for_project(db, project_id, write=True)
+            except HTTPException as e:
+                report.fail(group["row"], e.detail, project_id, group["keyword"].to_numpy())
+                continue
+            project, affected_user_ids = target
+
+            # The project name is always one of its keywords (see update_project_keywords)
+            removes_name = (group["op"] == "remove") & (group["keyword"] == project.name.lower())
+            if removes_name.any():
+                report.fail(
+                    group.loc[removes_name, "row"], "The project name keyword cannot be removed",
+                    project_id, project.name.lower()
+                )
+                group = group[~removes_name]
+
+            adds = group.loc[group["op"] == "add", "keyword"].tolist()
+            removes = group.loc[group["op"] == "remove", "keyword"].tolist()
+            added = add_project_keywords(shard_db, project.id, project.owner_id, project.name, adds)
+            removed = remove_project_keywords(shard_db, project.id, project.owner_id, removes)
+            applied.append(group)
+            counts["added"] += len(added)
+            counts["removed"] += len(removed)
+            counts["unchanged"] += len(adds) + len(removes) - len(added) - len(removed)
+            touched.add(project.id)
+            if added or removed:
+                shard_db.execute(
+                    update(projects).where(projects.c.id == project.id).values(updated_at=datetime.utcnow())
+                )
+                bump_owner_version(shard_db, project.owner_id)
+                invalidate_after_commit(db, affected_user_ids, owner_ids=[project.owner_id])
+                notify_after_commit(
+                    db, affected_user_ids, "keywords_updated", owner_id=project.owner_id, project_id=project.id
+                )
+                record_audit_event(
+                    db, "keywords.import", user_id, project.owner_id,
+                    project_id=project.id, details={"added": len(added), "removed": len(removed)}
+                )
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("Keyword import chunk failed")
+        for group in applied:
+            report.fail(group["row"], "Not applied: database error", group["project_id"].to_numpy(), group["keyword"].to_numpy())
+        return
+    report.added += counts["added"]
+    report.removed += counts["removed"]
+    report.unchanged += counts["unchanged"]
+    report.projects.update(touched)
+
+def import_keywords(db: Session, user_id: int, file: IO[bytes], fmt: str) -> dict:
+    """Import keyword changes from ``file`` on behalf of ``user_id`` and return the report."""
+    report = ImportReport()
+    targets = {}
+    try:
+        chunks = _read_chunks(file, fmt, settings.KEYWORD_IMPORT_CHUNK_ROWS)
+    except ValueError as e:  # pandas' parser errors derive from it
+        raise HTTPException(status_code=400, detail=f"Could not parse the file: {e}")
+    with chunks:
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except ValueError as e:
+                if report.rows == 0:
+                    raise HTTPException(status_code=400, detail=f"Could not parse the file: {e}")
+                # Earlier chunks are committed: report where parsing stopped
+                report.fail([report.rows + 1], f"Could not parse the file from this row on: {e}")
+                break
+            chunk.columns = [str(column).strip().lower() for column in chunk.columns]
+            if report.rows == 0:
+                missing = [column for column in ("project_id", "keyword") if column not in chunk.columns]
+                if missing:
+                    raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
+            first_row = report.rows + 1
+            report.rows += len(chunk)
+            apply_chunk(db, user_id, normalize_chunk(chunk, first_row, report), targets, report)
+    return report.as_dict()
@@ -0,0 +1,150 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Project ids are stored as unsigned 32-bit ints to keep posting lists compact
+POSTING_TYPECODE = "I"
+
+class KeywordIndex:
+    """In-memory inverted index: keyword -> sorted array of project ids.
+
+    Terms are also kept in a sorted list so prefix lookups are a bisect plus a
+    short forward scan instead of a walk over every term.
+
+    Each worker holds its own index and applies its own writes once they
+    commit. Writes made through other workers reach it through the
+    keyword_changes log: ``cursors`` holds the last log id applied per shard,
+    and ``apply_changes`` moves it forward (see refresh_keyword_index).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._terms: List[str] = []
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.cursors: Dict[int, int] = {}
+        self.refreshed_at = 0.0
+        self.changes_applied = 0
+
+    def load(self, sessions: Iterable[Session], batch_size: int = 100000) -> int:
+        """Rebuild the index from the keyword_projects table of each session (one per shard)."""
+        rows = 0
+        cursors = {}
+        def stream():
+            nonlocal rows
+            for shard, db in enumerate(sessions):
+                # Taken before the scan: changes committed during it are replayed, which is harmless
+                cursors[shard] = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM keyword_changes")).scalar()
+                result = db.connection().execution_options(stream_results=True).execute(
+                    text("SELECT relevan_keyword, project_id FROM keyword_projects")
+                )
+                for partition in result.partitions(batch_size):
+                    rows += len(partition)
+                    yield from partition
+        self.build(stream())
+        with self._lock:
+            self.cursors = cursors
+            self.refreshed_at = time.monotonic()
+        return rows
+
+    def build(self, rows: Iterable[Tuple[str, int]]) -> None:
+        """Replace the index contents with ``(keyword, project_id)`` rows."""
+        postings: Dict[str, array] = {}
+        for keyword, project_id in rows:
+            posting = postings.get(keyword)
+            if posting is None:
+                posting = postings[keyword] = array(POSTING_TYPECODE)
+            posting.append(project_id)
+
+        for keyword, posting in postings.items():
+            postings[keyword] = array(POSTING_TYPECODE, sorted(set(posting)))
+
+        terms = sorted(postings)
+        with self._lock:
+            self._postings = postings
+            self._terms = terms
+            self.loaded = True
+
+    def add(self, project_id: int, keywords: Iterable[str]) -> None:
+        with self._lock:
+            for keyword in keywords:
+                posting = self._postings.get(keyword)
+                if posting is None:
+                    self._postings[keyword] = array(POSTING_TYPECODE, [project_id])
+                    insort(self._terms, keyword)
+                    continue
+                i = bisect_left(posting, project_id)
+                if i == len(posting) or posting[i] != project_id:
+                    posting.insert(i, project_id)
+
+    def remove(self, project_id: int, keywords: Iterable[str]) -> None:
+        with self._lock:
+            for keyword in keywords:
+                posting = self._postings.get(keyword)
+                if posting is None:
+                    continue
+                i = bisect_left(posting, project_id)
+                if i < len(posting) and posting[i] == project_id:
+                    del posting[i]
+                if not posting:
+                    del self._postings[keyword]
+                    j = bisect_left(self._terms, keyword)
+                    if j < len(self._terms) and self._terms[j] == keyword:
+                        del self._terms[j]
+
+    def apply_changes(self, shard: int, changes: Iterable) -> None:
+        """Apply change log entries of ``shard`` in id order and advance its cursor.
+
+        Entries this worker already applied on commit are applied again, which
+        leaves the index unchanged.
+        """
+        with self._lock:
+            for change in changes:
+                if change.op == "add":
+                    self.add(change.project_id, [change.keyword])
+                else:
+                    self.remove(change.project_id, [change.keyword])
+                self.cursors[shard] = change.id
+                self.changes_applied += 1
+
+    def lookup(self, keyword: str) -> List[int]:
+        with self._lock:
+            posting = self._postings.get(keyword)
+            return posting.tolist() if posting is not None else []
+
+    def lookup_prefix(self, prefix: str, max_terms: Optional[int] = None) -> Tuple[List[int], bool]:
+        """Return project ids tracking any keyword that starts with ``prefix``.
+
+        At most ``max_terms`` matching keywords are read; the second value is
+        True when more keywords matched and their projects were left out.
+        """
+        project_ids = set()
+        truncated = False
+        with self._lock:
+            i = bisect_left(self._terms, prefix)
+            scanned = 0
+            while i < len(self._terms) and self._terms[i].startswith(prefix):
+                if max_terms is not None and scanned >= max_terms:
+                    truncated = True
+                    break
+                project_ids.update(self._postings[self._terms[i]])
+                i += 1
+                scanned += 1
+        return sorted(project_ids), truncated
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._postings.values()),
+                "cursors": dict(self.cursors),
+                "changes_applied": self.changes_applied,
+                "refreshed_seconds_ago": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+            }
+
+keyword_index = KeywordIndex()
@@ -0,0 +1,279 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import event, func, text, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, run_after_commit
+from app.core.keyword_index import keyword_index
+from app.core.sharding import shard_router
+from app.models.keyword import KeywordChange, KeywordChangeOp, KeywordChangeSequence
+
+# Shared write paths for the keyword_projects table. Every mutation goes through
+# here so the change log is written in the same transaction and the in-memory
+# keyword index follows the table once the transaction commits.
+#
+# Change log rows are held back until their transaction commits and only then
+# given ids, from a per-database sequence row that stays locked until the
+# commit completes. Ids therefore become visible in increasing order, and a
+# consumer that has seen id N has seen everything below it. The price is that
+# transactions writing keywords on the same shard commit one at a time.
+
+logger = logging.getLogger(__name__)
+
+_refresh_lock = threading.Lock()
+
+def get_project_keywords(db: Session, project_id: int, owner_id: int) -> List[str]:
+    keywords = db.execute(
+        text("""
+            SELECT relevan_keyword
+            FROM keyword_projects
+            WHERE project_id = :project_id
+            AND owner_id = :owner_id
+        """),
+        {"project_id": project_id, "owner_id": owner_id}
+    ).fetchall()
+    return [k[0] for k in keywords]
+
+def _record_changes(
+    db: Session,
+    project_id: int,
+    owner_id: int,
+    keywords: List[str],
+    op: KeywordChangeOp,
+    created_at: datetime
+) -> None:
+    # Written by _write_keyword_changes when ``db`` commits. Opening the
+    # transaction now means a rollback (and with it the discard) always follows.
+    db.connection()
+    db.info.setdefault("keyword_changes", []).extend(
+        {
+            "project_id": project_id,
+            "owner_id": owner_id,
+            "keyword": keyword,
+            "op": op,
+            "created_at": created_at
+        }
+        for keyword in keywords
+    )
+
+def _reserve_change_ids(db: Session, count: int) -> int:
+    """Take ``count`` consecutive change log ids and return the first.
+
+    The sequence row stays locked until ``db``'s transaction ends, so no other
+    transaction can take ids until this one has committed.
+    """
+    sequence = KeywordChangeSequence.__table__
+    advance = update(sequence).where(sequence.c.id == 1).values(last_id=sequence.c.last_id + count)
+    if db.execute(advance).rowcount == 0:
+        # First change log write on this database since the sequence was added
+        try:
+            with db.begin_nested():
+                db.execute(insert(sequence).from_select(
+                    ["id", "last_id"],
+                    select(literal(1), func.coalesce(func.max(KeywordChange.id), 0) + count)
+                ))
+        except IntegrityError:
+            # Another transaction seeded it first
+            db.execute(advance)
+    last_id = db.execute(select(sequence.c.last_id).where(sequence.c.id == 1)).scalar_one()
+    return last_id - count + 1
+
+@event.listens_for(SessionLocal, "before_commit")
+def _write_keyword_changes(session):
+    if session.in_nested_transaction():
+        return
+    rows = session.info.pop("keyword_changes", None)
+    if not rows:
+        return
+    first_id = _reserve_change_ids(session, len(rows))
+    session.execute(
+        insert(KeywordChange.__table__),
+        [{**row, "id": first_id + i} for i, row in enumerate(rows)]
+    )
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_keyword_changes(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop("keyword_changes", None)
+
+def insert_project_keywords(
+    db: Session,
+    project_id: int,
+    owner_id: int,
+    project_name: str,
+    keywords: Iterable[str],
+    created_at: Optional[datetime] = None
+) -> None:
+    keywords = list(keywords)
+    if not keywords:
+        return
+    created_at = created_at or datetime.utcnow()
+    db.execute(
+        text("""
+            INSERT INTO keyword_projects (project_id, owner_id, relevan_keyword, project_name, created_at)
+            VALUES (:project_id, :owner_id, :keyword, :project_name, :created_at)
+        """),
+        [
+            {
+                "project_id": project_id,
+                "owner_id": owner_id,
+                "keyword": keyword,
+                "project_name": project_name,
+                "created_at": created_at
+            }
+            for keyword in keywords
+        ]
+    )
+    _record_changes(db, project_id, owner_id, keywords, KeywordChangeOp.ADD, created_at)
+    if settings.KEYWORD_INDEX_ENABLED:
+        run_after_commit(db, lambda: keyword_index.add(project_id, keywords))
+
+def delete_project_keywords(db: Session, project_id: int, owner_id: int) -> int:
+    """Delete all keywords of a project and return the number of rows deleted."""
+    removed = get_project_keywords(db, project_id, owner_id)
+    result = db.execute(
+        text("""
+            DELETE FROM keyword_projects
+            WHERE project_id = :project_id AND owner_id = :owner_id
+        """),
+        {"project_id": project_id, "owner_id": owner_id}
+    )
+    if removed:
+        _record_changes(db, project_id, owner_id, removed, KeywordChangeOp.REMOVE, datetime.utcnow())
+        if settings.KEYWORD_INDEX_ENABLED:
+            run_after_commit(db, lambda: keyword_index.remove(project_id, removed))
+    return result.rowcount
+
+def replace_project_keywords(
+    db: Session,
+    project_id: int,
+    owner_id: int,
+    project_name: str,
+    keywords: Iterable[str]
+) -> List[str]:
+    """Make the project's keywords equal ``keywords``, touching only rows that change.
+
+    Returns the resulting keyword list.
+    """
+    keywords = list(dict.fromkeys(keywords))
+    current = get_project_keywords(db, project_id, owner_id)
+    wanted = set(keywords)
+    removed = [k for k in dict.fromkeys(current) if k not in wanted]
+    existing = set(current)
+    added = [k for k in keywords if k not in existing]
+
+    _delete_keywords(db, project_id, owner_id, removed)
+    insert_project_keywords(db, project_id, owner_id, project_name, added)
+    return [k for k in current if k in wanted] + added
+
+def add_project_keywords(
+    db: Session,
+    project_id: int,
+    owner_id: int,
+    project_name: str,
+    keywords: Iterable[str]
+) -> List[str]:
+    """Insert the keywords the project does not have yet and return them."""
+    existing = set(get_project_keywords(db, project_id, owner_id))
+    added = [k for k in dict.fromkeys(keywords) if k not in existing]
+    insert_project_keywords(db, project_id, owner_id, project_name, added)
+    return added
+
+def remove_project_keywords(db: Session, project_id: int, owner_id: int, keywords: Iterable[str]) -> List[str]:
+    """Delete the given keywords from a project and return the ones it had."""
+    existing = set(get_project_keywords(db, project_id, owner_id))
+    removed = [k for k in dict.fromkeys(keywords) if k in existing]
+    _delete_keywords(db, project_id, owner_id, removed)
+    return removed
+
+def _delete_keywords(db: Session, project_id: int, owner_id: int, keywords: List[str]) -> None:
+    if not keywords:
+        return
+    db.execute(
+        text("""
+            DELETE FROM keyword_projects
+            WHERE project_id = :project_id AND owner_id = :owner_id
+            AND relevan_keyword = :keyword
+        """),
+        [{"project_id": project_id, "owner_id": owner_id, "keyword": k} for k in keywords]
+    )
+    _record_changes(db, project_id, owner_id, keywords, KeywordChangeOp.REMOVE, datetime.utcnow())
+    if settings.KEYWORD_INDEX_ENABLED:
+        run_after_commit(db, lambda: keyword_index.remove(project_id, keywords))
+
+def get_keyword_changes(db: Session, since: int, limit: int) -> List[KeywordChange]:
+    """Return up to ``limit`` change log entries with an id greater than ``since``.
+
+    Ids are handed out in commit order, so no entry below the last one
+    returned can still show up later: ``since`` never skips an entry.
+    """
+    return db.execute(
+        select(KeywordChange)
+        .where(KeywordChange.id > since)
+        .order_by(KeywordChange.id)
+        .limit(limit)
+    ).scalars().all()
+
+def refresh_keyword_index(db: Session) -> int:
+    """Apply the change log entries the index has not seen yet, from every shard.
+
+    This is how writes made through other workers reach this worker's index.
+    Returns the number of entries applied; returns 0 right away while another
+    thread is refreshing.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return 0
+    try:
+        applied = 0
+        for shard in range(shard_router.count):
+            shard_db = shard_router.session_for_shard(db, shard)
+            while True:
+                changes = get_keyword_changes(
+                    shard_db, keyword_index.cursors.get(shard, 0), settings.KEYWORD_CHANGES_MAX_BATCH
+                )
+                keyword_index.apply_changes(shard, changes)
+                applied += len(changes)
+                if len(changes) < settings.KEYWORD_CHANGES_MAX_BATCH:
+                    break
+        keyword_index.refreshed_at = time.monotonic()
+        return applied
+    finally:
+        _refresh_lock.release()
+
+def find_projects_by_keyword(db: Session, keyword: str, prefix: bool = False) -> Tuple[List[int], bool]:
+    """Reverse lookup of project ids tracking ``keyword``, and whether a prefix lookup was truncated.
+
+    Served from the in-memory index when it is loaded, otherwise from the
+    table on every shard. The index reads at most KEYWORD_INDEX_MAX_PREFIX_TERMS
+    keywords per prefix lookup and catches up on the change log at most
+    KEYWORD_INDEX_REFRESH_SECONDS after the last time it did.
+    """
+    keyword = keyword.lower()
+    if settings.KEYWORD_INDEX_ENABLED and keyword_index.loaded:
+        if time.monotonic() - keyword_index.refreshed_at >= settings.KEYWORD_INDEX_REFRESH_SECONDS:
+            try:
+                refresh_keyword_index(db)
+            except SQLAlchemyError:
+                # Serve what the index has; the next lookup tries again
+                logger.exception("Failed to refresh keyword index")
+        if prefix:
+            return keyword_index.lookup_prefix(keyword, settings.KEYWORD_INDEX_MAX_PREFIX_TERMS)
+        return keyword_index.lookup(keyword), False
+
+    if prefix:
+        condition = "relevan_keyword LIKE :keyword"
+        keyword = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    else:
+        condition = "relevan_keyword = :keyword"
+    statement = text(f"""
+        SELECT DISTINCT project_id
+        FROM keyword_projects
+        WHERE {condition}
+    """)
+    rows_by_shard = shard_router.scatter(db, lambda shard_db: shard_db.execute(statement, {"keyword": keyword}).fetchall())
+    return sorted({r[0] for rows in rows_by_shard for r in rows}), False
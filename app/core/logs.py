@@ -0,0 +1,193 @@
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.core.config import settings
+from app.core.tracing import current_span
+
+# Id of the request being handled, attached to every record logged while serving it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the request (and trace) id and sample INFO-and-below records per request.
+
+    Runs on the caller's thread, before the record is queued. Sampling is
+    keyed on the request id so a request's records are kept or dropped
+    together; warnings and errors are always kept.
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        record.request_id = request_id
+        active_span = current_span.get()
+        if active_span is not None:
+            record.trace_id = active_span.trace_id
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1.0:
+            return True
+        key = request_id or record.getMessage()
+        if zlib.crc32(key.encode()) / 0xFFFFFFFF < self.sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller: when the queue is full the record is dropped."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now: args may not be safe to touch
+        # from the listener thread once the request has moved on
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_handler: Optional[DroppingQueueHandler] = None
+_filter: Optional[RequestContextFilter] = None
+_listener: Optional[QueueListener] = None
+
+def setup_logging(stream=None) -> None:
+    """Send all logging, uvicorn's included, through a bounded queue to stdout (or ``stream``).
+
+    Request handlers only format and enqueue; a listener thread does the
+    write, so a slow stdout never stalls the event loop.
+    """
+    global _handler, _filter, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_JSON else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+    ))
+
+    _handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    _filter = RequestContextFilter(settings.LOG_INFO_SAMPLE_RATE)
+    _handler.addFilter(_filter)
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Stop the listener after it has written everything already queued."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def logging_stats() -> dict:
+    return {
+        "enqueued": _handler.enqueued if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "sampled_out": _filter.sampled_out if _filter else 0,
+        "queue_depth": _handler.queue.qsize() if _handler else 0,
+    }
+
+access_logger = logging.getLogger("app.access")
+
+class RequestIdMiddleware:
+    """Assign each HTTP request an id and log one access line when it completes.
+
+    An incoming ``X-Request-ID`` header is reused so ids can be followed
+    across services; the id is echoed back on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if settings.LOG_ACCESS:
+                access_logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    },
+                )
+            request_id_var.reset(token)
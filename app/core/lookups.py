@@ -0,0 +1,56 @@
+from typing import Optional
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.project import Project, UserProject, GlobalAccess
+
+# The lookups nearly every request runs, as lambda statements over Core
+# columns. A lambda statement is built and its cache key computed once per
+# call site; later calls only swap in the closure's values as bound
+# parameters, skipping query construction, ORM entity loading (including the
+# joined eager loads on Project/User) and SQL compilation. Results are plain
+# rows with attribute access, not ORM instances, so nothing here can be used
+# to mutate: load the mapped object when a write needs one.
+
+_users = User.__table__
+_projects = Project.__table__
+_user_projects = UserProject.__table__
+_global_accesses = GlobalAccess.__table__
+
+_USER_COLUMNS = (
+    _users.c.id,
+    _users.c.name,
+    _users.c.email,
+    _users.c.hashed_password,
+    _users.c.is_active,
+    _users.c.is_verified,
+    _users.c.token_version,
+    _users.c.created_at,
+    _users.c.updated_at,
+)
+
+def get_user_by_id(db: Session, user_id: int) -> Optional[Row]:
+    return db.execute(lambda_stmt(lambda: select(*_USER_COLUMNS).where(_users.c.id == user_id))).first()
+
+def get_user_by_email(db: Session, email: str) -> Optional[Row]:
+    return db.execute(lambda_stmt(lambda: select(*_USER_COLUMNS).where(_users.c.email == email))).first()
+
+def get_owned_project(db: Session, project_id: int, owner_id: int) -> Optional[Row]:
+    return db.execute(lambda_stmt(
+        lambda: select(_projects).where(_projects.c.id == project_id, _projects.c.owner_id == owner_id)
+    )).first()
+
+def get_global_grant(db: Session, owner_id: int, user_id: int) -> Optional[Row]:
+    return db.execute(lambda_stmt(
+        lambda: select(_global_accesses).where(
+            _global_accesses.c.owner_id == owner_id, _global_accesses.c.user_id == user_id
+        )
+    )).first()
+
+def get_project_grant(db: Session, project_id: int, user_id: int) -> Optional[Row]:
+    return db.execute(lambda_stmt(
+        lambda: select(_user_projects).where(
+            _user_projects.c.project_id == project_id, _user_projects.c.user_id == user_id
+        )
+    )).first()
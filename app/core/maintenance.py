@@ -0,0 +1,297 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import and_, delete, func, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, close_shard_sessions
+from app.core.sharding import shard_router
+from app.core.keywords import delete_project_keywords
+from app.models.maintenance import MaintenanceLease
+from app.models.project import Project, UserProject, GlobalAccess
+from app.models.token import OneTimeToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    interval_seconds: int
+    # (db, batch_size, dry_run) -> rows affected, or rows that would be in a dry run
+    run: Callable[[Session, int, bool], int]
+    runs: int = 0
+    failures: int = 0
+    rows_total: int = 0
+    last_rows: Optional[int] = None
+    last_duration_ms: Optional[float] = None
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "failures": self.failures,
+            "rows_total": self.rows_total,
+            "last_rows": self.last_rows,
+            "last_duration_ms": self.last_duration_ms,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_error": self.last_error,
+        }
+
+def _run_batches(db: Session, select_batch, apply_batch, count, batch_size: int, dry_run: bool) -> int:
+    """Apply ``apply_batch`` to successive batches from ``select_batch``.
+
+    ``apply_batch`` returns the rows it changed. Each batch is committed on its
+    own and followed by a throttle pause, and a run stops after
+    MAINTENANCE_MAX_BATCHES so one pass never holds locks or saturates the
+    database for long. In dry-run mode only ``count(limit)`` runs, bounded by
+    the batches a real run would take, so it reports what one run would do.
+    """
+    if dry_run:
+        return count(batch_size * settings.MAINTENANCE_MAX_BATCHES)
+    affected = 0
+    for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+        batch = select_batch(batch_size)
+        if not batch:
+            break
+        affected += apply_batch(batch)
+        db.commit()
+        if len(batch) < batch_size:
+            break
+        time.sleep(settings.MAINTENANCE_THROTTLE_SECONDS)
+    return affected
+
+def _count_up_to(db: Session, statement, limit: int) -> int:
+    """Count the rows of ``statement``, stopping at ``limit``."""
+    return db.execute(select(func.count()).select_from(statement.limit(limit).subquery())).scalar()
+
+def purge_expired_one_time_tokens(db: Session, batch_size: int, dry_run: bool) -> int:
+    condition = OneTimeToken.expires_at < datetime.utcnow()
+    return _run_batches(
+        db,
+        lambda n: db.execute(select(OneTimeToken.id).where(condition).limit(n)).scalars().all(),
+        lambda ids: db.execute(delete(OneTimeToken).where(OneTimeToken.id.in_(ids))).rowcount,
+        lambda limit: _count_up_to(db, select(OneTimeToken.id).where(condition), limit),
+        batch_size,
+        dry_run
+    )
+
+def clear_expired_legacy_reset_tokens(db: Session, batch_size: int, dry_run: bool) -> int:
+    condition = and_(User.reset_password_token.isnot(None), User.reset_token_expires < datetime.utcnow())
+    return _run_batches(
+        db,
+        lambda n: db.execute(select(User.id).where(condition).limit(n)).scalars().all(),
+        lambda ids: db.execute(
+            update(User).where(User.id.in_(ids)).values(reset_password_token=None, reset_token_expires=None)
+        ).rowcount,
+        lambda limit: _count_up_to(db, select(User.id).where(condition), limit),
+        batch_size,
+        dry_run
+    )
+
+def _referenced_user_ids(db: Session, user_ids: List[int]) -> Set[int]:
+    """Those of ``user_ids`` that own projects or give or hold grants, on any shard."""
+    def query(shard_db: Session) -> Set[int]:
+        referenced = set()
+        for column in (Project.owner_id, UserProject.user_id, GlobalAccess.owner_id, GlobalAccess.user_id):
+            referenced.update(shard_db.execute(select(column).where(column.in_(user_ids)).distinct()).scalars())
+        return referenced
+    return set().union(*shard_router.scatter(db, query))
+
+def purge_stale_unverified_accounts(db: Session, batch_size: int, dry_run: bool) -> int:
+    """Delete never-verified accounts past the grace period that own and hold nothing.
+
+    Accounts waiting to confirm a changed email are unverified too, but have
+    verified_at set and are never matched.
+
+    Projects and grants can be on any shard, so candidates are read from
+    users in id order and checked against every shard a batch at a time. The
+    deletes repeat the account condition, so an account verified after it was
+    selected is kept.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.MAINTENANCE_UNVERIFIED_ACCOUNT_DAYS)
+    # verified_at, not is_verified: an email change clears is_verified on established accounts
+    condition = and_(User.verified_at.is_(None), User.is_verified.is_(False), User.created_at < cutoff)
+    last_id = 0
+
+    def select_batch(n):
+        nonlocal last_id
+        purgeable = []
+        while len(purgeable) < n:
+            candidates = db.execute(
+                select(User.id).where(condition, User.id > last_id).order_by(User.id).limit(n)
+            ).scalars().all()
+            if not candidates:
+                break
+            last_id = candidates[-1]
+            referenced = _referenced_user_ids(db, candidates)
+            purgeable += [user_id for user_id in candidates if user_id not in referenced]
+        return purgeable
+
+    def count(limit):
+        # The same scan a real run makes, without the deletes
+        total = 0
+        for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+            batch = select_batch(batch_size)
+            total += len(batch)
+            if len(batch) < batch_size:
+                break
+        return min(total, limit)
+
+    def apply_batch(ids):
+        users = User.__table__
+        still_stale = and_(
+            users.c.id.in_(ids), users.c.verified_at.is_(None), users.c.is_verified.is_(False),
+            users.c.created_at < cutoff
+        )
+        db.execute(delete(OneTimeToken).where(OneTimeToken.user_id.in_(select(users.c.id).where(still_stale))))
+        return db.execute(delete(users).where(still_stale)).rowcount
+
+    return _run_batches(db, select_batch, apply_batch, count, batch_size, dry_run)
+
+def purge_orphaned_keywords(db: Session, batch_size: int, dry_run: bool) -> int:
+    """Delete keyword_projects rows whose project no longer exists.
+
+    Batches are counted in projects and the result, dry runs included, in
+    keyword rows. Rows go through delete_project_keywords so the change log
+    and keyword index see the removals. Keywords and projects share a shard,
+    so each shard is cleaned on its own.
+    """
+    orphans = """
+        FROM keyword_projects kp
+        WHERE NOT EXISTS (SELECT 1 FROM projects p WHERE p.id = kp.project_id)
+    """
+    affected = 0
+    for shard in range(shard_router.count):
+        shard_db = shard_router.session_for_shard(db, shard)
+
+        def apply_batch(pairs):
+            return sum(delete_project_keywords(shard_db, project_id, owner_id) for project_id, owner_id in pairs)
+
+        affected += _run_batches(
+            shard_db,
+            lambda n: shard_db.execute(
+                text(f"SELECT DISTINCT kp.project_id, kp.owner_id {orphans} LIMIT :n"), {"n": n}
+            ).fetchall(),
+            apply_batch,
+            lambda limit: shard_db.execute(text(f"""
+                SELECT COUNT(*) FROM keyword_projects k
+                JOIN (SELECT DISTINCT kp.project_id, kp.owner_id {orphans} LIMIT :limit) o
+                    ON o.project_id = k.project_id AND o.owner_id = k.owner_id
+            """), {"limit": limit}).scalar(),
+            batch_size,
+            dry_run
+        )
+    return affected
+
+class MaintenanceScheduler:
+    """In-process periodic job runner, coordinated across workers by DB leases."""
+
+    def __init__(self, jobs: List[MaintenanceJob]):
+        self.jobs: Dict[str, MaintenanceJob] = {job.name: job for job in jobs}
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(settings.MAINTENANCE_TICK_SECONDS):
+            for job in self.jobs.values():
+                if self._stop.is_set():
+                    return
+                self.run_job(job)
+
+    def _acquire_lease(self, db: Session, job: MaintenanceJob) -> bool:
+        now = datetime.utcnow()
+        # Held for the run itself; a worker that dies mid-run loses it after this
+        expires_at = now + timedelta(seconds=settings.MAINTENANCE_LEASE_SECONDS)
+        taken = db.execute(
+            update(MaintenanceLease)
+            .where(MaintenanceLease.name == job.name, MaintenanceLease.expires_at < now)
+            .values(holder=self.holder, expires_at=expires_at)
+        ).rowcount
+        if taken:
+            db.commit()
+            return True
+        db.rollback()
+        if db.get(MaintenanceLease, job.name) is not None:
+            return False
+        try:
+            db.add(MaintenanceLease(name=job.name, holder=self.holder, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    def _schedule_next(self, db: Session, job: MaintenanceJob) -> None:
+        db.execute(
+            update(MaintenanceLease)
+            .where(MaintenanceLease.name == job.name, MaintenanceLease.holder == self.holder)
+            .values(expires_at=datetime.utcnow() + timedelta(seconds=job.interval_seconds))
+        )
+        db.commit()
+
+    def run_job(self, job: MaintenanceJob, force: bool = False) -> Optional[int]:
+        """Run ``job`` if its lease is free (or ``force``); return rows affected."""
+        db = SessionLocal()
+        try:
+            if not force and not self._acquire_lease(db, job):
+                return None
+            job.last_started_at = datetime.utcnow()
+            start = time.perf_counter()
+            try:
+                rows = job.run(db, settings.MAINTENANCE_BATCH_SIZE, settings.MAINTENANCE_DRY_RUN)
+                job.last_error = None
+            except Exception as e:
+                db.rollback()
+                job.failures += 1
+                job.last_error = str(e)
+                logger.exception("Maintenance job %s failed", job.name, extra={"job": job.name})
+                rows = None
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            job.last_rows = rows
+            if rows and not settings.MAINTENANCE_DRY_RUN:
+                job.rows_total += rows
+            if not force:
+                self._schedule_next(db, job)
+            return rows
+        finally:
+            close_shard_sessions(db)
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.MAINTENANCE_ENABLED,
+            "dry_run": settings.MAINTENANCE_DRY_RUN,
+            "jobs": {name: job.stats() for name, job in self.jobs.items()},
+        }
+
+maintenance_scheduler = MaintenanceScheduler([
+    MaintenanceJob("expired_one_time_tokens", settings.MAINTENANCE_INTERVAL_SECONDS, purge_expired_one_time_tokens),
+    MaintenanceJob("expired_legacy_reset_tokens", settings.MAINTENANCE_INTERVAL_SECONDS, clear_expired_legacy_reset_tokens),
+    MaintenanceJob("stale_unverified_accounts", settings.MAINTENANCE_INTERVAL_SECONDS, purge_stale_unverified_accounts),
+    MaintenanceJob("orphaned_keywords", settings.MAINTENANCE_INTERVAL_SECONDS, purge_orphaned_keywords),
+])
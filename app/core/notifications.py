@@ -0,0 +1,185 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import run_after_commit
+
+try:
+    import redis
+except ImportError:  # Only needed with NOTIFY_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Change notifications for the server-sent events stream. Mutations publish
+# "this changed" events for the users whose view they affect, once their
+# transaction commits; every open stream of those users gets the event and
+# the client refetches, instead of polling /project/projects.
+#
+# Streams are held by one worker each, so events go through a backend that
+# reaches every worker: LocalBackend when there is a single worker, or
+# RedisBackend (pub/sub on NOTIFY_REDIS_CHANNEL) across workers and hosts.
+# Delivery is best effort: events published while a client is reconnecting
+# are not replayed, so clients refetch once after every (re)connect.
+
+Deliver = Callable[[Iterable[int], dict], None]
+
+class NotificationBackend(ABC):
+    """Carries published events to ``deliver`` in every worker, this one included."""
+
+    def start(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+
+    @abstractmethod
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        """Send ``event`` for ``user_ids`` to every worker's ``deliver``."""
+
+    def stop(self) -> None:
+        pass
+
+class LocalBackend(NotificationBackend):
+    """Single worker: deliver right away, in process."""
+
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        self.deliver(user_ids, event)
+
+class RedisBackend(NotificationBackend):
+    """Publish to a Redis channel every worker subscribes to, this one included."""
+
+    def __init__(self, url: str, channel: str):
+        if redis is None:
+            raise RuntimeError("NOTIFY_BACKEND=redis needs the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, deliver: Deliver) -> None:
+        super().start(deliver)
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _on_message(self, message) -> None:
+        try:
+            payload = json.loads(message["data"])
+            self.deliver(payload["user_ids"], payload["event"])
+        except Exception:
+            logger.exception("Dropped malformed notification")
+
+    def publish(self, user_ids: Iterable[int], event: dict) -> None:
+        try:
+            self.client.publish(self.channel, json.dumps({"user_ids": list(user_ids), "event": event}))
+        except Exception:
+            # The change is committed either way; clients catch up on their next fetch
+            logger.exception("Failed to publish %s notification", event["event"])
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+class NotificationHub:
+    """Open streams by user id; each stream is a bounded asyncio queue on its event loop."""
+
+    def __init__(self, queue_size: int, max_streams: int):
+        self.queue_size = queue_size
+        self.max_streams = max_streams
+        self._streams: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self._backend: Optional[NotificationBackend] = None
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._backend is not None:
+                return
+            if settings.NOTIFY_BACKEND == "redis":
+                backend = RedisBackend(settings.NOTIFY_REDIS_URL, settings.NOTIFY_REDIS_CHANNEL)
+            elif settings.NOTIFY_BACKEND == "local":
+                backend = LocalBackend()
+            else:
+                raise RuntimeError(f"Unknown NOTIFY_BACKEND {settings.NOTIFY_BACKEND!r}: use 'local' or 'redis'")
+            backend.start(self._deliver)
+            self._backend = backend
+
+    def stop(self) -> None:
+        with self._lock:
+            backend, self._backend = self._backend, None
+        if backend is not None:
+            backend.stop()
+
+    def subscribe(self, user_id: int) -> Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]:
+        """Open a stream for ``user_id``, or return None when MAX_STREAMS are open. Call from the event loop."""
+        if self._backend is None:
+            self.start()
+        stream = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            if sum(len(streams) for streams in self._streams.values()) >= self.max_streams:
+                self.rejected += 1
+                return None
+            self._streams.setdefault(user_id, set()).add(stream)
+        return stream
+
+    def unsubscribe(self, user_id: int, stream: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]) -> None:
+        with self._lock:
+            streams = self._streams.get(user_id)
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del self._streams[user_id]
+
+    def publish(self, user_ids: Iterable[int], event: str, **data) -> None:
+        if self._backend is None:
+            self.start()
+        self.published += 1
+        self._backend.publish(sorted(set(user_ids)), {"event": event, **data})
+
+    def _deliver(self, user_ids: Iterable[int], event: dict) -> None:
+        # Called from any thread: hand the event to each stream's own loop
+        with self._lock:
+            streams = [stream for user_id in user_ids for stream in self._streams.get(user_id, ())]
+        for loop, queue in streams:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, {**event, "id": next(self._ids)})
+            except RuntimeError:
+                pass  # The loop closed; its streams are going away with it
+
+    def _put(self, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            # The client already has events waiting, each of which makes it refetch
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": settings.NOTIFY_BACKEND,
+                "streams": sum(len(streams) for streams in self._streams.values()),
+                "users": len(self._streams),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+            }
+
+notification_hub = NotificationHub(settings.NOTIFY_QUEUE_SIZE, settings.NOTIFY_MAX_STREAMS)
+
+def notify_after_commit(db: Session, user_ids: Iterable[int], event: str, **data) -> None:
+    """Notify the users' open streams of ``event`` once ``db`` commits."""
+    if not settings.NOTIFY_ENABLED:
+        return
+    user_ids = set(user_ids)
+    run_after_commit(db, lambda: notification_hub.publish(user_ids, event, **data))
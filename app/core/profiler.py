@@ -0,0 +1,195 @@
+import hashlib
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+from app.core.config import settings
+
+# On-demand sampling profiler for single requests. A request opts in with a
+# token signed by PROFILER_SECRET, in the X-Profile-Token header or the
+# profile_token query parameter:
+#
+#     <expires unix time>.<hex HMAC-SHA256 of "<expires>:<METHOD>:<path>">
+#
+# so a token only works for one method and path and only until it expires
+# (scripts/sign_profile_request.py makes them). Profiles are written in the
+# collapsed-stack format that flamegraph.pl, speedscope and inferno read.
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+PROFILE_TOKEN_PARAM = "profile_token"
+
+def sign_profile_request(method: str, path: str, expires: int, secret: Optional[str] = None) -> str:
+    secret = secret if secret is not None else settings.PROFILER_SECRET
+    signature = hmac.new(secret.encode(), f"{expires}:{method.upper()}:{path}".encode(), hashlib.sha256)
+    return f"{expires}.{signature.hexdigest()}"
+
+def verify_profile_token(token: str, method: str, path: str) -> bool:
+    if not settings.PROFILER_SECRET:
+        return False
+    expires, _, _ = token.partition(".")
+    try:
+        if int(expires) < time.time():
+            return False
+    except ValueError:
+        return False
+    return hmac.compare_digest(token, sign_profile_request(method, path, int(expires)))
+
+class ProfileRateLimiter:
+    """Allow at most ``per_minute`` profiles per rolling minute and one at a time."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._started = []
+        self._lock = threading.Lock()
+        self._active = False
+        self.granted = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._started = [t for t in self._started if t > now - 60]
+            if self._active or len(self._started) >= self.per_minute:
+                self.rejected += 1
+                return False
+            self._started.append(now)
+            self._active = True
+            self.granted += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = False
+
+rate_limiter = ProfileRateLimiter(settings.PROFILER_MAX_PER_MINUTE)
+
+class StackSampler(threading.Thread):
+    """Sample every thread's stack and keep the ones running below ``anchor``.
+
+    ``anchor`` is the frame of the coroutine serving the request. While the
+    request's code runs, that frame is an ancestor of the running frame;
+    while the request is suspended, other requests' stacks do not contain it.
+    So samples belong to this request even on a shared event loop. Work the
+    request hands to the threadpool is not attributed.
+    """
+
+    def __init__(self, anchor, interval_seconds: float, max_seconds: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.anchor = anchor
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop_event = threading.Event()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval_seconds) and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None and frame is not self.anchor:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if frame is None or not stack:
+                    continue
+                self.stacks[";".join(self._label(code) for code in reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def profile_path(profile_id: str) -> str:
+    return os.path.join(settings.PROFILER_DIR, f"{profile_id}.folded")
+
+class ProfilerMiddleware:
+    """Profile requests that carry a valid signed profile token.
+
+    The profile is saved under PROFILER_DIR and its id returned in the
+    X-Profile-Id response header; X-Profile-Status says why a request with a
+    token was not profiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _token(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return value.decode("latin-1")
+        if PROFILE_TOKEN_PARAM.encode() in scope.get("query_string", b""):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_TOKEN_PARAM)
+            return values[0] if values else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        token = self._token(scope) if scope["type"] == "http" and settings.PROFILER_SECRET else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = []
+        if not verify_profile_token(token, scope["method"], scope["path"]):
+            headers.append((b"x-profile-status", b"invalid-token"))
+            await self.app(scope, receive, self._with_headers(send, headers))
+            return
+        if not rate_limiter.acquire():
+            headers.append((b"x-profile-status", b"rate-limited"))
+            await self.app(scope, receive, self._with_headers(send, headers))
+            return
+
+        profile_id = uuid.uuid4().hex
+        headers += [(b"x-profile-status", b"profiled"), (b"x-profile-id", profile_id.encode())]
+        sampler = StackSampler(sys._getframe(), settings.PROFILER_INTERVAL_MS / 1000, settings.PROFILER_MAX_SECONDS)
+        sampler.start()
+        try:
+            await self.app(scope, receive, self._with_headers(send, headers))
+        finally:
+            sampler.stop()
+            rate_limiter.release()
+            try:
+                os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+                with open(profile_path(profile_id), "w") as f:
+                    f.write(sampler.collapsed())
+                logger.info(
+                    "Profiled %s %s", scope["method"], scope["path"],
+                    extra={"profile_id": profile_id, "samples": sampler.samples}
+                )
+            except OSError:
+                logger.exception("Failed to store profile %s", profile_id)
+
+    @staticmethod
+    def _with_headers(send, headers):
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+        return send_with_headers
+
+def profiler_stats() -> dict:
+    return {
+        "enabled": bool(settings.PROFILER_SECRET),
+        "granted": rate_limiter.granted,
+        "rejected": rate_limiter.rejected,
+    }
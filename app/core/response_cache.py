@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import replica_engines, run_after_commit, stick_to_primary
+
+class ResponseCache:
+    """Per-user cache of serialized response bodies with TTL and LRU bounds.
+
+    Entries are stored under ``(user_id, key)`` and can carry extra tags (for
+    example ``"owner:<id>"``) so a write can drop every entry derived from an
+    owner's data without knowing which users read it.
+
+    Writers bump a generation counter on every invalidation. A reader takes
+    the generation before it starts reading and ``set`` refuses to store the
+    result if an invalidation happened in between, so a response built from
+    pre-write data can never be cached after the write's invalidation ran.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, bytes, Optional[str], Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[Tuple[int, str]]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_writes = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Return ``(body, etag)`` for a live entry, or None."""
+        cache_key = (user_id, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, body, etag, tags = entry
+            if expires_at < time.monotonic():
+                self._drop(cache_key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return body, etag
+
+    def set(
+        self,
+        user_id: int,
+        key: str,
+        body: bytes,
+        etag: Optional[str],
+        generation: int,
+        tags: Iterable[str] = ()
+    ) -> bool:
+        cache_key = (user_id, key)
+        tags = (f"user:{user_id}",) + tuple(tags)
+        with self._lock:
+            if generation != self._generation:
+                self.stale_writes += 1
+                return False
+            if cache_key in self._entries:
+                self._drop(cache_key)
+            self._entries[cache_key] = (time.monotonic() + self.ttl_seconds, body, etag, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, user_ids: Iterable[int] = (), owner_ids: Iterable[int] = ()) -> None:
+        tags = [f"user:{user_id}" for user_id in user_ids] + [f"owner:{owner_id}" for owner_id in owner_ids]
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for cache_key in list(self._keys_by_tag.get(tag, ())):
+                    self._drop(cache_key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _drop(self, cache_key: Tuple[int, str]) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return
+        for tag in entry[3]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.RESPONSE_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_writes": self.stale_writes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+def invalidate_after_commit(db: Session, user_ids: Iterable[int] = (), owner_ids: Iterable[int] = ()) -> None:
+    """Drop cached responses of the given users/owners once ``db`` commits.
+
+    The users are also pinned to the primary for a moment, so neither their
+    next read nor the cache refill it triggers can come from a lagging replica.
+    """
+    user_ids, owner_ids = set(user_ids), set(owner_ids)
+    if replica_engines:
+        run_after_commit(db, lambda: stick_to_primary(user_ids))
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return
+    run_after_commit(db, lambda: response_cache.invalidate(user_ids, owner_ids))
@@ -1,26 +1,100 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
+from typing import Dict, Optional, Tuple, Union
+from jose import JWTError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from passlib.hash import bcrypt
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, run_after_commit
+from app.core.keys import keyring
+from app.core.lookups import get_user_by_id
+from app.core.tracing import span
 from app.models.user import User
+from app.models.token import OneTimeToken, OneTimeTokenPurpose
+import hashlib
+import hmac
+import math
 import secrets
+import threading
+import time
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Filled in by calibrate_password_hashing() at startup
+password_hashing_stats: dict = {}
+
+def _time_bcrypt(rounds: int, samples: int = 3) -> float:
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def calibrate_password_hashing() -> dict:
+    """Pick the bcrypt cost that fits PASSWORD_HASH_TARGET_MS on this machine.
+
+    Each extra round doubles the cost, so the minimum cost is measured once and
+    the largest cost within budget is extrapolated, then measured to confirm.
+    Stored hashes outside [rounds, rounds + PASSWORD_REHASH_TOLERANCE] are
+    rehashed on the next successful login.
+    """
+    if settings.BCRYPT_ROUNDS:
+        rounds = settings.BCRYPT_ROUNDS
+        timings = {rounds: _time_bcrypt(rounds, samples=1)}
+    else:
+        target = settings.PASSWORD_HASH_TARGET_MS / 1000
+        base = _time_bcrypt(settings.BCRYPT_MIN_ROUNDS)
+        timings = {settings.BCRYPT_MIN_ROUNDS: base}
+        rounds = settings.BCRYPT_MIN_ROUNDS + max(0, int(math.log2(target / base))) if base > 0 else settings.BCRYPT_MIN_ROUNDS
+        rounds = min(rounds, settings.BCRYPT_MAX_ROUNDS)
+        while rounds > settings.BCRYPT_MIN_ROUNDS:
+            timings[rounds] = _time_bcrypt(rounds, samples=1)
+            if timings[rounds] <= target:
+                break
+            rounds -= 1
+
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds + settings.PASSWORD_REHASH_TOLERANCE
+    )
+    password_hashing_stats.clear()
+    password_hashing_stats.update({
+        "scheme": "bcrypt",
+        "rounds": rounds,
+        "target_ms": settings.PASSWORD_HASH_TARGET_MS,
+        "measured_ms": {r: round(t * 1000, 1) for r, t in sorted(timings.items())},
+    })
+    return password_hashing_stats
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with span("password.verify"):
+        return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one is off-policy."""
+    with span("password.verify"):
+        return pwd_context.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with span("password.hash", rounds=password_hashing_stats.get("rounds")):
+        return pwd_context.hash(password)
 
-def create_token(subject: Union[str, int], expires_delta: Optional[timedelta] = None, token_type: str = "access") -> str:
+def create_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    token_type: str = "access",
+    claims: Optional[dict] = None
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -29,56 +103,232 @@ def create_token(subject: Union[str, int], expires_delta: Optional[timedelta] =
     to_encode = {"exp": expire, "sub": str(subject)}
     if token_type == "refresh":
         to_encode["type"] = "refresh"
+    if claims:
+        to_encode.update(claims)
     
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = keyring.sign(to_encode)
     return encoded_jwt
 
-def create_access_token(subject: Union[str, int], expires_delta: Optional[timedelta] = None) -> str:
-    return create_token(subject, expires_delta, "access")
+def get_user_claims(user: User) -> dict:
+    """Signed claims that let get_current_principal skip the database.
+
+    Only issued in stateless mode; ``tv`` ties the token to the user's current
+    token_version so password/email changes and deactivation revoke it.
+    """
+    if not settings.STATELESS_AUTH:
+        return {}
+    return {
+        "email": user.email,
+        "act": bool(user.is_active),
+        "vrf": bool(user.is_verified),
+        "tv": user.token_version or 0,
+    }
+
+def create_access_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    user: Optional[User] = None
+) -> str:
+    claims = get_user_claims(user) if user is not None else None
+    return create_token(subject, expires_delta, "access", claims)
 
-def create_refresh_token(subject: Union[str, int], expires_delta: Optional[timedelta] = None) -> str:
+def create_refresh_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    user: Optional[User] = None
+) -> str:
     if not expires_delta:
         expires_delta = timedelta(days=7)  # Default 7 days for refresh token
-    return create_token(subject, expires_delta, "refresh")
+    claims = {"tv": get_user_claims(user)["tv"]} if user is not None and settings.STATELESS_AUTH else None
+    return create_token(subject, expires_delta, "refresh", claims)
 
-def verify_token(token: str) -> Optional[str]:
+def decode_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload.get("sub")
+        return keyring.decode(token)
     except JWTError:
         return None
 
-def generate_verification_token() -> str:
-    return secrets.token_urlsafe(32)
-
-def generate_password_reset_token() -> str:
-    return secrets.token_urlsafe(32)
-
 def is_token_expired(expiration_time: datetime) -> bool:
     return datetime.utcnow() > expiration_time
 
+def hash_one_time_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_one_time_token(db: Session, user_id: int, purpose: OneTimeTokenPurpose, expires_in: timedelta) -> str:
+    """Create a token for ``purpose``, replacing any earlier one, and return it in clear."""
+    db.execute(
+        delete(OneTimeToken).where(OneTimeToken.user_id == user_id, OneTimeToken.purpose == purpose)
+    )
+    token = secrets.token_urlsafe(32)
+    db.add(OneTimeToken(
+        user_id=user_id,
+        purpose=purpose,
+        token_hash=hash_one_time_token(token),
+        expires_at=datetime.utcnow() + expires_in
+    ))
+    return token
+
+def consume_one_time_token(db: Session, token: str, purpose: OneTimeTokenPurpose) -> Optional[int]:
+    """Delete a valid token and return its user id, or None if invalid or expired."""
+    token_hash = hash_one_time_token(token)
+    record = db.execute(
+        select(OneTimeToken).where(OneTimeToken.token_hash == token_hash)
+    ).scalar_one_or_none()
+    if (
+        record is None
+        or not hmac.compare_digest(record.token_hash, token_hash)
+        or record.purpose != purpose
+        or is_token_expired(record.expires_at)
+    ):
+        return None
+    db.delete(record)
+    return record.user_id
+
+class TokenVersionCache:
+    """Small TTL map of user id -> token_version.
+
+    Versions bumped by this worker are updated immediately; bumps from other
+    workers become visible once the cached entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._versions: Dict[int, Tuple[float, Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Optional[int]:
+        now = time.monotonic()
+        entry = self._versions.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        version = db.execute(
+            select(User.__table__.c.token_version).where(User.__table__.c.id == user_id)
+        ).scalar()
+        self.set(user_id, version)
+        return version
+
+    def set(self, user_id: int, version: Optional[int]) -> None:
+        with self._lock:
+            if len(self._versions) >= self.max_entries and user_id not in self._versions:
+                self._versions.clear()
+            self._versions[user_id] = (time.monotonic() + self.ttl_seconds, version)
+
+token_versions = TokenVersionCache(
+    settings.TOKEN_VERSION_CACHE_TTL_SECONDS, settings.TOKEN_VERSION_CACHE_MAX_ENTRIES
+)
+
+def bump_token_version(db: Session, user: User) -> None:
+    """Invalidate every token issued to ``user`` before this change."""
+    user.token_version = (user.token_version or 0) + 1
+    version = user.token_version
+    run_after_commit(db, lambda: token_versions.set(user.id, version))
+
+def require_service(x_service_key: Optional[str] = Header(None)) -> None:
+    """Dependency for internal endpoints: the caller must send one of SERVICE_API_KEYS as X-Service-Key."""
+    keys = [key.strip() for key in settings.SERVICE_API_KEYS.split(",") if key.strip()]
+    if not x_service_key or not any(hmac.compare_digest(x_service_key.encode(), key.encode()) for key in keys):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid service key is required"
+        )
+
+@dataclass
+class Principal:
+    """The authenticated caller, as needed by routes that only read identity."""
+    id: int
+    email: str
+    is_active: bool
+    is_verified: bool
+    token_version: int = 0
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _decode_subject(token: str) -> Tuple[int, dict]:
+    payload = decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
+    try:
+        return int(payload.get("sub")), payload
+    except (TypeError, ValueError):
+        raise _credentials_exception()
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    return authenticate(db, token)
+
+def authenticate(db: Session, token: str) -> Principal:
+    """The active caller a bearer token stands for; raises HTTPException (401, or 400 if inactive) otherwise."""
+    user_id, payload = _decode_subject(token)
+    # Lets the session recognise this caller's commits as their own writes
+    db.info["user_id"] = user_id
+
+    if settings.STATELESS_AUTH and "tv" in payload and "email" in payload:
+        # Stateless path: trust the signed claims once the version is current
+        if token_versions.get(db, user_id) != payload["tv"]:
+            raise _credentials_exception()
+        principal = Principal(
+            id=user_id,
+            email=payload["email"],
+            is_active=payload.get("act", False),
+            is_verified=payload.get("vrf", False),
+            token_version=payload["tv"],
+        )
+    else:
+        row = get_user_by_id(db, user_id)
+        if row is None or ("tv" in payload and payload["tv"] != row.token_version):
+            raise _credentials_exception()
+        principal = Principal(
+            id=row.id,
+            email=row.email,
+            is_active=row.is_active,
+            is_verified=row.is_verified,
+            token_version=row.token_version or 0,
+        )
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+
+    return principal
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> Row:
+    """The caller's users row (read-only); load the mapped User to modify it."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    payload = decode_token(token)
     try:
-        user_id = verify_token(token)
-        if user_id is None:
+        if payload is None or payload.get("sub") is None:
             raise credentials_exception
         # Convert user_id to integer since it's stored as string in the token
-        user_id = int(user_id)
+        user_id = int(payload["sub"])
     except (JWTError, ValueError):
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    db.info["user_id"] = user_id
+    user = get_user_by_id(db, user_id)
     if user is None:
         raise credentials_exception
+
+    # Tokens issued in stateless mode are revoked by bumping token_version
+    if "tv" in payload and payload["tv"] != (user.token_version or 0):
+        raise credentials_exception
     
     if not user.is_active:
         raise HTTPException(
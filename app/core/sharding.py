@@ -0,0 +1,227 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from fastapi import HTTPException
+from sqlalchemy import MetaData, Table, delete, inspect, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, shard_engines
+from app.models.keyword import KeywordChange, KeywordChangeSequence
+from app.models.project import Project, UserProject, GlobalAccess, OwnerVersion
+from app.models.shard import ProjectDirectory, ShardOverride
+
+# Owner-based sharding. Everything an owner has (projects, the grants they
+# gave, keyword rows and keyword change log) lives on one shard, chosen by
+# ``owner_id % shard count`` unless shard_overrides says otherwise. Users,
+# tokens and the two routing tables (project_directory, shard_overrides) stay
+# on the primary. Owner-scoped routes use the owner's shard; reads that span
+# owners, such as everything a user was granted, scatter to every shard in
+# parallel and merge. With a single shard, the primary, all of this reduces
+# to the request's own session.
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Tables kept on shards; keyword_projects is added by reflection, as it is not mapped here
+SHARDED_MODELS = (Project, UserProject, GlobalAccess, OwnerVersion, KeywordChange, KeywordChangeSequence)
+
+def shard_metadata(primary: Engine = engine) -> MetaData:
+    """The sharded tables, minus their foreign keys to users (which stays on the primary)."""
+    metadata = MetaData()
+    tables = [model.__table__ for model in SHARDED_MODELS]
+    if inspect(primary).has_table("keyword_projects"):
+        tables.append(Table("keyword_projects", MetaData(), autoload_with=primary))
+    for table in tables:
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] not in metadata.tables:
+                copy.constraints.discard(constraint)
+                copy.foreign_keys.difference_update(constraint.elements)
+                for column in constraint.columns:
+                    column.foreign_keys.difference_update(constraint.elements)
+    return metadata
+
+def create_shard_schemas() -> int:
+    """Create missing sharded tables on every shard other than the primary; return how many shards."""
+    shards = [shard_engine for shard_engine in shard_engines if shard_engine is not engine]
+    if shards:
+        metadata = shard_metadata()
+        for shard_engine in shards:
+            metadata.create_all(bind=shard_engine, checkfirst=True)
+    return len(shards)
+
+class ShardRouter:
+    """Maps owners to shard engines and hands out sessions on them.
+
+    Shard sessions are opened alongside the request session ``db`` and kept
+    in ``db.info``, so they commit, roll back and close with it (see
+    app/core/database.py). The shard on the primary engine is ``db`` itself.
+    """
+
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self._overrides: Dict[int, Tuple[int, bool]] = {}
+        self._overrides_loaded_at = float("-inf")
+        self._project_owners: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.scatters = 0
+        self.directory_hits = 0
+        self.directory_misses = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.engines)
+
+    def _load_overrides(self) -> None:
+        if time.monotonic() - self._overrides_loaded_at < settings.SHARD_PLACEMENT_REFRESH_SECONDS:
+            return
+        with self._lock:
+            if time.monotonic() - self._overrides_loaded_at < settings.SHARD_PLACEMENT_REFRESH_SECONDS:
+                return
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    select(ShardOverride.owner_id, ShardOverride.shard, ShardOverride.moving)
+                ).fetchall()
+            self._overrides = {row.owner_id: (row.shard, row.moving) for row in rows}
+            self._overrides_loaded_at = time.monotonic()
+
+    def placement(self, owner_id: int) -> Tuple[int, bool]:
+        """Return ``(shard, moving)`` for an owner."""
+        if self.count == 1:
+            return 0, False
+        self._load_overrides()
+        return self._overrides.get(owner_id, (owner_id % self.count, False))
+
+    def session_for_shard(self, db: Session, shard: int) -> Session:
+        shard_engine = self.engines[shard]
+        if shard_engine is engine:
+            return db
+        sessions = db.info.setdefault("shard_sessions", {})
+        if shard not in sessions:
+            sessions[shard] = SessionLocal(bind=shard_engine)
+        return sessions[shard]
+
+    def session(self, db: Session, owner_id: int, write: bool = False) -> Session:
+        """Session on the owner's shard.
+
+        Writes are refused with a 503 while the owner is being moved between
+        shards; reads keep going to the source shard until the move is done.
+        """
+        shard, moving = self.placement(owner_id)
+        if write and moving:
+            raise HTTPException(
+                status_code=503,
+                detail="Project data is being moved, retry shortly",
+                headers={"Retry-After": str(settings.SHARD_PLACEMENT_REFRESH_SECONDS)}
+            )
+        return self.session_for_shard(db, shard)
+
+    def project_owner(self, db: Session, project_id: int) -> Optional[int]:
+        # A project never changes owner, so directory entries can be cached for good
+        owner_id = self._project_owners.get(project_id)
+        if owner_id is not None:
+            self.directory_hits += 1
+            return owner_id
+        self.directory_misses += 1
+        owner_id = db.execute(
+            select(ProjectDirectory.owner_id).where(ProjectDirectory.id == project_id)
+        ).scalar()
+        if owner_id is not None:
+            self._remember_owner(project_id, owner_id)
+        return owner_id
+
+    def session_for_project(self, db: Session, project_id: int, write: bool = False) -> Optional[Session]:
+        """Session on the shard holding ``project_id``, or None if no such project was ever created."""
+        if self.count == 1:
+            return db
+        owner_id = self.project_owner(db, project_id)
+        if owner_id is None:
+            return None
+        return self.session(db, owner_id, write)
+
+    def _remember_owner(self, project_id: int, owner_id: int) -> None:
+        with self._lock:
+            self._project_owners[project_id] = owner_id
+            if len(self._project_owners) > settings.SHARD_DIRECTORY_CACHE_MAX_ENTRIES:
+                self._project_owners.popitem(last=False)
+
+    def allocate_project_ids(self, owner_id: int, count: int) -> List[int]:
+        """Reserve ``count`` new project ids for an owner.
+
+        Committed right away, in a transaction of its own: a directory entry
+        whose project was never written is harmless (lookups by that id find
+        no project), while a project without one could not be found by id.
+        """
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            ids = [
+                conn.execute(
+                    insert(ProjectDirectory).values(owner_id=owner_id, created_at=now)
+                ).inserted_primary_key[0]
+                for _ in range(count)
+            ]
+        for project_id in ids:
+            self._remember_owner(project_id, owner_id)
+        return ids
+
+    def forget_project(self, db: Session, project_id: int) -> None:
+        """Drop a deleted project's directory entry, in ``db``'s transaction."""
+        db.execute(delete(ProjectDirectory).where(ProjectDirectory.id == project_id))
+        with self._lock:
+            self._project_owners.pop(project_id, None)
+
+    def scatter(self, db: Session, query: Callable[[Session], T]) -> List[T]:
+        """Run ``query`` against every shard in parallel and return the results in shard order.
+
+        The shard on the primary engine is queried through ``db`` on the
+        calling thread (so replica routing applies); the others each get a
+        short-lived session on a worker thread, inside a copy of the caller's
+        context so their SQL spans join the request's trace. An owner caught
+        mid-move can appear on two shards: merge results by id.
+        """
+        if self.count == 1:
+            return [query(db)]
+        self.scatters += 1
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.SHARD_SCATTER_WORKERS, thread_name_prefix="shard-scatter"
+                    )
+        futures = {
+            shard: self._executor.submit(contextvars.copy_context().run, self._query_shard, shard_engine, query)
+            for shard, shard_engine in enumerate(self.engines)
+            if shard_engine is not engine
+        }
+        return [
+            futures[shard].result() if shard in futures else query(db)
+            for shard in range(self.count)
+        ]
+
+    @staticmethod
+    def _query_shard(shard_engine: Engine, query: Callable[[Session], T]) -> T:
+        shard_db = SessionLocal(bind=shard_engine)
+        try:
+            return query(shard_db)
+        finally:
+            shard_db.close()
+
+    def stats(self) -> dict:
+        return {
+            "shards": self.count,
+            "overrides": len(self._overrides),
+            "moving": sum(1 for _, moving in self._overrides.values() if moving),
+            "scatters": self.scatters,
+            "directory_cache_hits": self.directory_hits,
+            "directory_cache_misses": self.directory_misses,
+        }
+
+shard_router = ShardRouter(shard_engines)
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+# Single-flight coalescing for read routes. Concurrent GET requests that are
+# the same request (path, query string, credentials, If-None-Match) share
+# one execution: the first runs through the application, the others wait
+# for it and get a copy of its response. Nothing is kept once the first
+# finishes; this only removes duplicate work that overlaps in time, such as
+# a dashboard and its other tabs loading at once.
+#
+# Requests are grouped by the whole Authorization header rather than the
+# user it names, so a request never gets a response produced for different
+# credentials (say a revoked token of the same user).
+
+class Flight:
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.status = 0
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+        self.complete = False
+        self.followers = 0
+
+class SingleFlight:
+    """In-flight executions by request key."""
+
+    def __init__(self):
+        self._flights: Dict[Tuple, Flight] = {}
+        self._lock = threading.Lock()
+        self.executions: Counter = Counter()
+        self.coalesced: Counter = Counter()
+        self.retries = 0
+
+    def join(self, key: Tuple) -> Tuple[Flight, bool]:
+        """Return the flight for ``key`` and whether the caller leads it (and must ``land`` it)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def land(self, key: Tuple, path: str) -> None:
+        with self._lock:
+            flight = self._flights.pop(key)
+            self.executions[path] += 1
+            if flight.complete:
+                self.coalesced[path] += flight.followers
+            else:
+                # The leader failed or was cancelled: its followers run on their own
+                self.retries += flight.followers
+        flight.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.SINGLE_FLIGHT_ENABLED,
+                "in_flight": len(self._flights),
+                "executions": dict(self.executions),
+                "saved_executions": dict(self.coalesced),
+                "saved_total": sum(self.coalesced.values()),
+                "retries": self.retries,
+            }
+
+single_flight = SingleFlight()
+
+class SingleFlightMiddleware:
+    """Coalesce concurrent identical GET requests on ``paths``."""
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    def _key(self, scope) -> Optional[Tuple]:
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization")
+        if authorization is None:
+            return None  # Answered with a 401 anyway
+        return (
+            scope["path"],
+            scope.get("query_string", b""),
+            hashlib.sha256(authorization).digest(),
+            headers.get(b"if-none-match"),
+        )
+
+    async def __call__(self, scope, receive, send):
+        key = None
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and scope["path"] in self.paths
+            and settings.SINGLE_FLIGHT_ENABLED
+        ):
+            key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        while True:
+            flight, leader = single_flight.join(key)
+            if leader:
+                break
+            await flight.done.wait()
+            if flight.complete:
+                await send({"type": "http.response.start", "status": flight.status, "headers": flight.headers})
+                await send({"type": "http.response.body", "body": flight.body})
+                return
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                flight.status = message["status"]
+                flight.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                flight.body += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+            flight.complete = flight.status > 0
+        finally:
+            single_flight.land(key, scope["path"])
@@ -0,0 +1,298 @@
+import ipaddress
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# Minimal tracing in the shape of OpenTelemetry: spans carry W3C trace and
+# span ids, requests join an upstream trace through the ``traceparent``
+# header, and finished spans are exported in batches by a background thread.
+# Spans are only recorded inside a sampled request, so unsampled requests pay
+# for one context variable lookup per instrumented call.
+
+logger = logging.getLogger(__name__)
+
+SQL_STATEMENT_MAX_LENGTH = 1000
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    name: str
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, object] = field(default_factory=dict)
+    status: str = "OK"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+class SpanExporter:
+    """Batches finished spans onto a bounded queue and writes them from a background thread.
+
+    Spans go to TRACE_EXPORT_FILE as JSON lines and/or are POSTed as a JSON
+    array to TRACE_EXPORT_URL. A full queue drops spans rather than blocking.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int = 512, interval_seconds: float = 2.0):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def submit(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch, flushed = self._next_batch()
+            if batch:
+                self._export(batch)
+            if flushed is not None:
+                flushed.set()
+
+    def _next_batch(self) -> Tuple[List[Span], Optional[threading.Event]]:
+        batch = []
+        deadline = time.monotonic() + self.interval_seconds
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until every span submitted so far has been exported."""
+        if self._thread is None:
+            return
+        flushed = threading.Event()
+        try:
+            self._queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return
+        flushed.wait(timeout)
+
+    def _export(self, batch: List[Span]) -> None:
+        spans = [span.to_dict() for span in batch]
+        try:
+            if settings.TRACE_EXPORT_FILE:
+                with self._lock, open(settings.TRACE_EXPORT_FILE, "a") as f:
+                    f.writelines(json.dumps(span, default=str) + "\n" for span in spans)
+            if settings.TRACE_EXPORT_URL:
+                request = urllib.request.Request(
+                    settings.TRACE_EXPORT_URL,
+                    data=json.dumps(spans, default=str).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            self.exported += len(spans)
+        except Exception:
+            self.failures += 1
+            logger.exception("Failed to export %d spans", len(spans))
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": settings.TRACE_SAMPLE_RATE,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "queued": self._queue.qsize(),
+        }
+
+exporter = SpanExporter(settings.TRACE_MAX_QUEUE)
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child span of the current span; does nothing outside a sampled trace."""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace_id, _new_id(64), parent.span_id, name, attributes=attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = "ERROR"
+        child.set_attribute("exception.type", type(e).__name__)
+        raise
+    finally:
+        current_span.reset(token)
+        child.end_ns = time.time_ns()
+        exporter.submit(child)
+
+def parse_traceparent(header: str):
+    """Return ``(trace_id, parent_span_id, sampled)`` from a W3C traceparent, or None."""
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, parent_id, flags = parts[1].lower(), parts[2].lower(), parts[3]
+    try:
+        if len(trace_id) != 32 or len(parent_id) != 16 or int(trace_id, 16) == 0 or int(parent_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return trace_id, parent_id, sampled
+
+trusted_networks = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in settings.TRACE_TRUSTED_NETWORKS.split(",")
+    if network.strip()
+]
+
+def _is_trusted(scope) -> bool:
+    """Whether the request comes directly from one of TRACE_TRUSTED_NETWORKS."""
+    client = scope.get("client")
+    if not trusted_networks or not client:
+        return False
+    try:
+        address = ipaddress.ip_address(client[0])
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_networks)
+
+class TracingMiddleware:
+    """Open a root span per HTTP request and propagate it via ``traceparent``.
+
+    A request that arrives with a traceparent joins that trace. Only callers
+    in TRACE_TRUSTED_NETWORKS choose whether it is sampled, so anyone else
+    cannot force tracing (and its cost) onto every request they send;
+    otherwise TRACE_SAMPLE_RATE decides.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = _new_id(128), None
+        if incoming is None or not _is_trusted(scope):
+            sampled = random.random() < settings.TRACE_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(trace_id, _new_id(64), parent_id, f"HTTP {scope['method']}", attributes={
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        traceparent = f"00-{root.trace_id}-{root.span_id}-01".encode()
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "ERROR"
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent)]
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            root.status = "ERROR"
+            root.set_attribute("exception.type", type(e).__name__)
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"HTTP {scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            root.end_ns = time.time_ns()
+            exporter.submit(root)
+
+# One child span per SQL statement, on every engine (primary and replicas)
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span.get()
+    if parent is None or context is None:
+        return
+    context._trace_span = Span(parent.trace_id, _new_id(64), parent.span_id, "db.query", attributes={
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:SQL_STATEMENT_MAX_LENGTH],
+        "db.executemany": executemany,
+    })
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is None:
+        return
+    context._trace_span = None
+    sql_span.end_ns = time.time_ns()
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        sql_span.set_attribute("db.rowcount", cursor.rowcount)
+    exporter.submit(sql_span)
+
+@event.listens_for(Engine, "handle_error")
+def _fail_sql_span(exception_context):
+    context = exception_context.execution_context
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is None:
+        return
+    context._trace_span = None
+    sql_span.status = "ERROR"
+    sql_span.set_attribute("exception.type", type(exception_context.original_exception).__name__)
+    sql_span.end_ns = time.time_ns()
+    exporter.submit(sql_span)
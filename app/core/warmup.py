@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.orm import configure_mappers
+from app.core import lookups
+from app.core.config import settings
+from app.core.database import SessionLocal, close_shard_sessions, engine, replica_engines, shard_engines
+from app.core.security import create_access_token, decode_token, get_password_hash, verify_password
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Startup warmup: pay the lazy first-use costs (pool connections, statement
+# compilation, bcrypt backend, JWT keys, OpenAPI schema) before the instance
+# reports ready, instead of on the first real requests.
+
+class WarmupState:
+    def __init__(self):
+        self.done = threading.Event()
+        self.started_at = None
+        self.steps = {}
+        self.errors = {}
+
+    def stats(self) -> dict:
+        return {
+            "done": self.done.is_set(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "steps_ms": dict(self.steps),
+            "errors": dict(self.errors),
+        }
+
+warmup_state = WarmupState()
+
+def _open_connections() -> None:
+    # Check out connections concurrently so the pool really opens that many,
+    # then return them to be kept idle. Beyond pool_size they would be discarded.
+    for pool_engine in [engine] + replica_engines + [e for e in shard_engines if e is not engine]:
+        if not hasattr(pool_engine.pool, "size"):
+            continue  # Pools that do not keep idle connections
+        wanted = min(settings.WARMUP_DB_CONNECTIONS, pool_engine.pool.size())
+        connections = [pool_engine.connect() for _ in range(wanted)]
+        for connection in connections:
+            connection.close()
+
+def _compile_statements() -> None:
+    # Lookups with an id/email that cannot exist: cheap to run, and running
+    # them fills the compiled statement cache the hot routes hit
+    from app.routes.project import build_project_detail, build_project_list, get_project_list_version
+    from app.schemas.project import ProjectDetailRequest
+
+    configure_mappers()
+    users = User.__table__
+    db = SessionLocal()
+    try:
+        lookups.get_user_by_id(db, -1)
+        lookups.get_user_by_email(db, "")
+        db.execute(
+            select(users.c.id, users.c.email, users.c.is_active, users.c.is_verified, users.c.token_version)
+            .where(users.c.id == -1)
+        ).first()
+        lookups.get_owned_project(db, -1, -1)
+        lookups.get_project_grant(db, -1, -1)
+        lookups.get_global_grant(db, -1, -1)
+        get_project_list_version(db, -1)
+        build_project_list(db, -1)
+        try:
+            build_project_detail(db, ProjectDetailRequest(project_id=-1), -1)
+        except HTTPException:
+            pass
+    finally:
+        close_shard_sessions(db)
+        db.close()
+
+def _exercise_security() -> None:
+    verify_password("warmup", get_password_hash("warmup"))
+    decode_token(create_access_token(0))
+
+def run_warmup(app) -> None:
+    warmup_state.started_at = datetime.utcnow()
+    for name, step in (
+        ("db_connections", _open_connections),
+        ("statements", _compile_statements),
+        ("hashing_and_jwt", _exercise_security),
+        ("openapi", app.openapi),
+    ):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            # Not fatal: readiness still checks the database on every probe
+            warmup_state.errors[name] = str(e)
+            logger.exception("Warmup step %s failed", name)
+        warmup_state.steps[name] = round((time.perf_counter() - start) * 1000, 1)
+    warmup_state.done.set()
+    logger.info("Warmup finished", extra={"warmup_ms": warmup_state.steps})
+
+def start_warmup(app) -> None:
+    """Warm up in the background so liveness answers while readiness waits."""
+    if not settings.WARMUP_ENABLED:
+        warmup_state.done.set()
+        return
+    threading.Thread(target=run_warmup, args=(app,), name="warmup", daemon=True).start()
+
+def check_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
@@ -0,0 +1,61 @@
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.engine import Engine
+from app.migrations import (
+    v0001_baseline,
+    v0002_users_token_version,
+    v0003_access_indexes,
+    v0004_shard_routing,
+    v0005_audit_events,
+    v0006_keyword_change_sequence,
+    v0007_owner_versions,
+    v0008_users_verified_at
+)
+
+logger = logging.getLogger(__name__)
+
+# Ordered list of (version, name, upgrade). Append only: never renumber or
+# edit a migration once it has shipped, add a new one instead.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "baseline", v0001_baseline.upgrade),
+    (2, "users_token_version", v0002_users_token_version.upgrade),
+    (3, "access_indexes", v0003_access_indexes.upgrade),
+    (4, "shard_routing", v0004_shard_routing.upgrade),
+    (5, "audit_events", v0005_audit_events.upgrade),
+    (6, "keyword_change_sequence", v0006_keyword_change_sequence.upgrade),
+    (7, "owner_versions", v0007_owner_versions.upgrade),
+    (8, "users_verified_at", v0008_users_verified_at.upgrade),
+]
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def applied_versions(engine: Engine) -> List[int]:
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return list(conn.execute(select(schema_migrations.c.version)).scalars())
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order, each in its own transaction.
+
+    Returns the versions applied. Migrations check before they change
+    anything, so a database built by ``create_all`` migrates cleanly.
+    """
+    applied = set(applied_versions(engine))
+    ran = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(insert(schema_migrations).values(version=version, name=name, applied_at=datetime.utcnow()))
+        logger.info("Applied migration %04d %s", version, name)
+        ran.append(version)
+    return ran
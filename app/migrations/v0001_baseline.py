@@ -0,0 +1,12 @@
+from sqlalchemy.engine import Connection
+from app.core.database import Base
+
+def upgrade(conn: Connection) -> None:
+    """Create every table the models define that does not exist yet.
+
+    Databases created earlier by ``Base.metadata.create_all`` already have
+    these tables, so on them this only adds tables introduced since.
+    """
+    import app.models.user, app.models.project, app.models.keyword  # noqa: F401
+    import app.models.token, app.models.maintenance  # noqa: F401
+    Base.metadata.create_all(bind=conn, checkfirst=True)
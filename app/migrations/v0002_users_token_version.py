@@ -0,0 +1,8 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+def upgrade(conn: Connection) -> None:
+    """Add users.token_version to databases created before it existed."""
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "token_version" not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
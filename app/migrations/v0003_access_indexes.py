@@ -0,0 +1,43 @@
+from sqlalchemy import Index, MetaData, Table, Text, inspect, text
+from sqlalchemy.engine import Connection
+from app.models.project import Project, UserProject, GlobalAccess
+
+def _assert_unique(conn: Connection, table: str, columns: str) -> None:
+    duplicates = conn.execute(text(f"""
+        SELECT {columns}, COUNT(*) AS copies
+        FROM {table}
+        GROUP BY {columns}
+        HAVING COUNT(*) > 1
+    """)).fetchall()
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add unique index on {table} ({columns}): {len(duplicates)} duplicate groups, "
+            f"for example {tuple(duplicates[0])}. Remove the duplicates and rerun."
+        )
+
+def upgrade(conn: Connection) -> None:
+    """Composite and unique indexes for the lookups the project and auth routes run.
+
+    Unique indexes refuse to build over duplicate rows; those are reported
+    instead of being resolved here, since which grant or project to keep is
+    not ours to guess.
+    """
+    for model, unique_columns in (
+        (Project, "owner_id, name"),
+        (UserProject, "project_id, user_id"),
+        (GlobalAccess, "owner_id, user_id"),
+    ):
+        for index in model.__table__.indexes:
+            if index.unique and not inspect(conn).has_index(model.__tablename__, index.name):
+                _assert_unique(conn, model.__tablename__, unique_columns)
+            index.create(bind=conn, checkfirst=True)
+
+    # keyword_projects is not mapped by a model here, so index it by reflection
+    if inspect(conn).has_table("keyword_projects"):
+        keyword_projects = Table("keyword_projects", MetaData(), autoload_with=conn)
+        keyword_length = {"relevan_keyword": 191} if isinstance(keyword_projects.c.relevan_keyword.type, Text) else None
+        for index in (
+            Index("ix_keyword_projects_project_id_owner_id", keyword_projects.c.project_id, keyword_projects.c.owner_id),
+            Index("ix_keyword_projects_relevan_keyword", keyword_projects.c.relevan_keyword, mysql_length=keyword_length),
+        ):
+            index.create(bind=conn, checkfirst=True)
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.models.shard import ProjectDirectory, ShardOverride
+
+def upgrade(conn: Connection) -> None:
+    """Routing tables for owner sharding, with a directory entry for every existing project.
+
+    Existing projects all live on the primary at this point, so the backfill
+    reads them from there; new project ids are allocated after the highest
+    backfilled one.
+    """
+    ProjectDirectory.__table__.create(bind=conn, checkfirst=True)
+    ShardOverride.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text("""
+        INSERT INTO project_directory (id, owner_id, created_at)
+        SELECT p.id, p.owner_id, p.created_at
+        FROM projects p
+        WHERE NOT EXISTS (SELECT 1 FROM project_directory d WHERE d.id = p.id)
+    """))
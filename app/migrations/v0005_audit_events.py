@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+from app.models.audit import AuditEvent
+
+def upgrade(conn: Connection) -> None:
+    """Audit log table with its (owner_id, created_at) and (actor_id, created_at) indexes."""
+    AuditEvent.__table__.create(bind=conn, checkfirst=True)
+    for index in AuditEvent.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
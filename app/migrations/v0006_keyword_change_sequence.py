@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+from app.models.keyword import KeywordChangeSequence
+
+def upgrade(conn: Connection) -> None:
+    """Sequence row for commit-ordered change log ids.
+
+    Left empty: the first commit that writes to the change log seeds it from
+    the highest existing id, which also covers shards that never ran this.
+    """
+    KeywordChangeSequence.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,9 @@
+from sqlalchemy.engine import Connection
+from app.models.project import OwnerVersion
+
+def upgrade(conn: Connection) -> None:
+    """Per-owner version counters behind the project list ETag.
+
+    Left empty: an owner without a row reads as version 0 until their next write.
+    """
+    OwnerVersion.__table__.create(bind=conn, checkfirst=True)
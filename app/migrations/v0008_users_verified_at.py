@@ -0,0 +1,20 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+def upgrade(conn: Connection) -> None:
+    """Add users.verified_at, set when an account first verifies its email.
+
+    is_verified is cleared again by an email change, so only verified_at
+    tells a never-verified account apart. Existing rows are backfilled
+    conservatively: verified accounts, and unverified ones whose
+    token_version moved (they changed email or password at some point), get
+    their updated_at. A few never-verified accounts that reset a password
+    are kept by the stale account purge as a result.
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "verified_at" not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN verified_at DATETIME NULL"))
+        conn.execute(text("""
+            UPDATE users SET verified_at = COALESCE(updated_at, created_at)
+            WHERE is_verified = 1 OR token_version > 0
+        """))
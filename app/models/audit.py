@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from datetime import datetime
+from app.core.database import Base
+
+class AuditEvent(Base):
+    """Who changed access or keywords on whose projects, written in batches by app/core/audit.py.
+
+    Lives on the primary whatever the shard layout, so one query covers every owner.
+    """
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_owner_id_created_at", "owner_id", "created_at"),
+        Index("ix_audit_events_actor_id_created_at", "actor_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    action = Column(String(50), nullable=False)
+    actor_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=True)
+    target_user_id = Column(Integer, nullable=True)
+    details = Column(JSON, nullable=True)
+    request_id = Column(String(128), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
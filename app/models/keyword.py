@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+class KeywordChangeOp(str, enum.Enum):
+    ADD = "add"
+    REMOVE = "remove"
+
+class KeywordChange(Base):
+    """Append-only log of keyword_projects mutations.
+
+    The id doubles as the cursor served by the change feed. It is taken from
+    keyword_change_sequence when the writing transaction commits, so ids
+    become visible in increasing order (see app/core/keywords.py).
+    """
+    __tablename__ = "keyword_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, nullable=False, index=True)
+    owner_id = Column(Integer, nullable=False)
+    keyword = Column(String(255), nullable=False)
+    op = Column(Enum(KeywordChangeOp), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class KeywordChangeSequence(Base):
+    """The last keyword_changes id handed out on this database, in its single row (id 1)."""
+    __tablename__ = "keyword_change_sequence"
+
+    id = Column(Integer, primary_key=True)
+    last_id = Column(Integer, nullable=False)
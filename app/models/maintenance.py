@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+class MaintenanceLease(Base):
+    """Per-job lease so only one worker runs a maintenance job at a time.
+
+    ``expires_at`` doubles as the job's next due time: the holder pushes it
+    out by the job interval after a run.
+    """
+    __tablename__ = "maintenance_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,6 +19,9 @@ class ProjectRole(str, enum.Enum):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("uq_projects_owner_id_name", "owner_id", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -33,6 +36,10 @@ class Project(Base):
 
 class UserProject(Base):
     __tablename__ = "user_projects"
+    __table_args__ = (
+        Index("uq_user_projects_project_id_user_id", "project_id", "user_id", unique=True),
+        Index("ix_user_projects_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -47,6 +54,10 @@ class UserProject(Base):
 
 class GlobalAccess(Base):
     __tablename__ = "global_accesses"
+    __table_args__ = (
+        Index("uq_global_accesses_owner_id_user_id", "owner_id", "user_id", unique=True),
+        Index("ix_global_accesses_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -58,3 +69,14 @@ class GlobalAccess(Base):
     # Relationships
     owner = relationship("User", foreign_keys=[owner_id], back_populates="granted_accesses", lazy="joined")
     user = relationship("User", foreign_keys=[user_id], back_populates="received_accesses", lazy="joined")
+
+class OwnerVersion(Base):
+    """Per-owner counter, advanced by every change to the owner's projects, keywords or grants.
+
+    Project list ETags are built from the versions of the owners a user sees
+    (see get_project_list_version in app/routes/project.py).
+    """
+    __tablename__ = "owner_versions"
+
+    owner_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
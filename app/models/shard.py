@@ -0,0 +1,30 @@
+from sqlalchemy import Boolean, Column, Integer, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+# Both tables live on the primary, next to users, whatever the shard layout.
+
+class ProjectDirectory(Base):
+    """Project id allocator and project -> owner map.
+
+    Project ids are allocated here so they stay unique across shards, and
+    routes addressed by project id look up the owner here to find the shard.
+    """
+    __tablename__ = "project_directory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ShardOverride(Base):
+    """Owners placed on a shard other than their default ``owner_id % shard count``.
+
+    ``moving`` is set while scripts/rebalance_shards.py copies the owner's
+    data; writes for that owner are refused until the move finishes.
+    """
+    __tablename__ = "shard_overrides"
+
+    owner_id = Column(Integer, primary_key=True)
+    shard = Column(Integer, nullable=False)
+    moving = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+class OneTimeTokenPurpose(str, enum.Enum):
+    EMAIL_VERIFICATION = "email_verification"
+    PASSWORD_RESET = "password_reset"
+
+class OneTimeToken(Base):
+    """Single-use email verification / password reset token.
+
+    Only the SHA-256 of the token is stored; the unique index on it makes the
+    lookup a point query instead of a scan over users.
+    """
+    __tablename__ = "one_time_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    purpose = Column(Enum(OneTimeTokenPurpose), nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
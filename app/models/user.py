@@ -13,9 +13,14 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
+    # First successful email verification; kept when an email change clears is_verified
+    verified_at = Column(DateTime, nullable=True)
+    # Legacy token columns, superseded by one_time_tokens (see scripts/migrate_one_time_tokens.py)
     verification_token = Column(String(255), nullable=True)
     reset_password_token = Column(String(255), nullable=True)
     reset_token_expires = Column(DateTime, nullable=True)
+    # Bumped on password/email change or deactivation to revoke issued tokens
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,8 +1,15 @@
 from fastapi import APIRouter
 from app.routes.auth import router as auth_router
-from app.routes.project import router as project_router
+from app.routes.project import router as project_router, service_router as project_service_router
+from app.routes.metrics import router as metrics_router
+from app.routes.audit import router as audit_router
+from app.routes.notifications import router as notifications_router
 
 api_router = APIRouter()
 
 api_router.include_router(auth_router, prefix="/auth", tags=["authentication"])
 api_router.include_router(project_router, tags=["project"])  # Remove prefix since it's already set in project_router
+api_router.include_router(project_service_router, tags=["project"])
+api_router.include_router(metrics_router, tags=["metrics"])
+api_router.include_router(audit_router, tags=["audit"])
+api_router.include_router(notifications_router, tags=["notifications"])
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db, read_only
+from app.core.security import get_current_principal, Principal
+from app.models.audit import AuditEvent
+from app.schemas.audit import AuditEventListResponse
+
+router = APIRouter(
+    prefix="/audit",
+    tags=["audit"],
+    dependencies=[Depends(get_current_principal)]
+)
+
+def _parse_cursor(cursor: str):
+    created_at, _, event_id = cursor.rpartition("_")
+    try:
+        return datetime.fromisoformat(created_at), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/events", response_model=AuditEventListResponse)
+@read_only
+async def list_audit_events(
+    owner_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    # Newest first. Callers see events on their own projects and their own actions,
+    # so every query is narrowed by one of the (owner_id|actor_id, created_at) indexes.
+    if owner_id is None and actor_id is None:
+        owner_id = current_user.id
+    if current_user.id not in (owner_id, actor_id):
+        raise HTTPException(
+            status_code=403,
+            detail="You can only read events on your own projects or actions you performed"
+        )
+    limit = max(1, min(limit, settings.AUDIT_QUERY_MAX_LIMIT))
+
+    events = AuditEvent.__table__
+    query = select(events)
+    if owner_id is not None:
+        query = query.where(events.c.owner_id == owner_id)
+    if actor_id is not None:
+        query = query.where(events.c.actor_id == actor_id)
+    if since is not None:
+        query = query.where(events.c.created_at >= since)
+    if until is not None:
+        query = query.where(events.c.created_at < until)
+    if cursor:
+        created_at, event_id = _parse_cursor(cursor)
+        query = query.where(or_(
+            events.c.created_at < created_at,
+            and_(events.c.created_at == created_at, events.c.id < event_id)
+        ))
+    rows = db.execute(
+        query.order_by(events.c.created_at.desc(), events.c.id.desc()).limit(limit)
+    ).fetchall()
+
+    return AuditEventListResponse(
+        events=rows,
+        next_cursor=f"{rows[-1].created_at.isoformat()}_{rows[-1].id}" if len(rows) == limit else None
+    )
@@ -1,25 +1,37 @@
+import logging
+import time
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from jose import jwt, JWTError
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from jose import JWTError
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, read_only
 from app.core.config import settings
+from app.core.keys import keyring
+from app.core.etag import make_etag, etag_matches, set_etag, not_modified
+from app.core.lookups import get_user_by_email
+from app.core.response_cache import invalidate_after_commit
 from app.core.security import (
     verify_password, get_password_hash, create_access_token, create_refresh_token,
-    verify_token, generate_verification_token, generate_password_reset_token,
-    is_token_expired, get_current_user
+    get_current_user, bump_token_version, decode_token,
+    verify_and_update_password, issue_one_time_token, consume_one_time_token, require_service
 )
 from utils.send_email import send_verification_email, send_reset_password_email
 from app.schemas.user import (
     UserCreate, UserLogin, UserChangePassword, UserForgotPassword,
     UserResetPassword, UserVerifyEmail, Token, User, UserResponse,
-    LoginResponse, UserChangeEmail
+    LoginResponse, UserChangeEmail, TokenIntrospectRequest, TokenIntrospection,
+    TokenIntrospectResponse
 )
 from app.models.user import User as UserModel
+from app.models.token import OneTimeTokenPurpose
 from typing import Optional
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     tags=["authentication"]
 )
@@ -37,20 +49,24 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     db_user = UserModel(
         name=user.name,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
-        verification_token=generate_verification_token()
+        hashed_password=get_password_hash(user.password)
     )
     db.add(db_user)
+    db.flush()
+    verification_token = issue_one_time_token(
+        db, db_user.id, OneTimeTokenPurpose.EMAIL_VERIFICATION,
+        timedelta(hours=settings.VERIFICATION_TOKEN_EXPIRE_HOURS)
+    )
     db.commit()
     db.refresh(db_user)
     
     # Send verification email with frontend verification page
-    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={db_user.verification_token}"
+    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
     try:
         send_verification_email(user.email, verification_url)
-    except Exception as e:
+    except Exception:
         # If email sending fails, still create the user but log the error
-        print(f"Failed to send verification email: {str(e)}")
+        logger.exception("Failed to send verification email")
     
     return UserResponse(
         status="success",
@@ -61,13 +77,19 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=LoginResponse)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     # Authenticate user
-    user = db.query(UserModel).filter(UserModel.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = get_user_by_email(db, form_data.username)
+    verified, new_hash = verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently move the stored hash to the current cost policy
+    if new_hash:
+        db.execute(update(UserModel).where(UserModel.id == user.id).values(hashed_password=new_hash))
+        db.commit()
     
     # Check if user is verified (if verification is required)
     if not user.is_verified:
@@ -77,8 +99,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     
     return LoginResponse(
-        access_token=create_access_token(user.id),
-        refresh_token=create_refresh_token(user.id),
+        access_token=create_access_token(user.id, user=user),
+        refresh_token=create_refresh_token(user.id, user=user),
         token_type="bearer",
         user=user
     )
@@ -86,7 +108,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 @router.post("/refresh-token", response_model=Token)
 async def refresh_token(token: str, db: Session = Depends(get_db)):
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = keyring.decode(token)
         if payload.get("type") != "refresh":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -111,10 +133,17 @@ async def refresh_token(token: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+
+    # Refresh tokens issued before a password/email change or deactivation are revoked
+    if "tv" in payload and payload["tv"] != (user.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
     
     return Token(
-        access_token=create_access_token(user_id),
-        refresh_token=create_refresh_token(user_id),
+        access_token=create_access_token(user_id, user=user),
+        refresh_token=create_refresh_token(user_id, user=user),
         token_type="bearer"
     )
 
@@ -123,13 +152,87 @@ from fastapi.security import HTTPBearer
 security = HTTPBearer()
 
 @router.get("/me", response_model=UserResponse, dependencies=[Depends(security)])
-async def get_current_user_info(current_user: UserModel = Depends(get_current_user)):
+@read_only
+async def get_current_user_info(
+    request: Request,
+    response: Response,
+    current_user: Row = Depends(get_current_user)
+):
+    # Versioned by the row the response is built from, so a 304 is answered
+    # before building it. updated_at alone has whole-second precision on
+    # MySQL and misses a second change within the same second, hence the
+    # fields themselves.
+    etag = make_etag(
+        "me", current_user.id, current_user.token_version, current_user.updated_at,
+        current_user.name, current_user.email, current_user.is_active, current_user.is_verified
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     return UserResponse(
         status="success",
         message="User information retrieved successfully",
         data=current_user
     )
 
+@router.post("/introspect", response_model=TokenIntrospectResponse, dependencies=[Depends(require_service)])
+async def introspect_tokens(
+    request: TokenIntrospectRequest,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    if len(request.tokens) > settings.INTROSPECT_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.INTROSPECT_MAX_TOKENS} tokens per request"
+        )
+
+    # Verify signatures and expiry locally, then resolve every subject at once.
+    # Only access tokens are active: a refresh token must not pass for one.
+    payloads = [decode_token(token) for token in request.tokens]
+    payloads = [payload if payload and payload.get("type", "access") == "access" else None for payload in payloads]
+    subjects = set()
+    for payload in payloads:
+        try:
+            subjects.add(int(payload["sub"]))
+        except (TypeError, KeyError, ValueError):
+            pass
+
+    users = UserModel.__table__
+    rows = db.execute(
+        select(users.c.id, users.c.is_active, users.c.token_version).where(users.c.id.in_(subjects))
+    ).fetchall() if subjects else []
+    users_by_id = {row.id: row for row in rows}
+
+    now = int(time.time())
+    results = []
+    max_age = None
+    for payload in payloads:
+        try:
+            user = users_by_id.get(int(payload["sub"]))
+        except (TypeError, KeyError, ValueError):
+            user = None
+        if user is None or ("tv" in payload and payload["tv"] != user.token_version):
+            results.append(TokenIntrospection(active=False))
+            continue
+
+        active = bool(user.is_active)
+        results.append(TokenIntrospection(
+            active=active,
+            sub=user.id,
+            exp=payload.get("exp"),
+            token_type="access",
+            is_active=active
+        ))
+        if active and payload.get("exp"):
+            remaining = max(0, payload["exp"] - now)
+            max_age = remaining if max_age is None else min(max_age, remaining)
+
+    # Gateways may reuse these verdicts until the earliest active token expires
+    response.headers["Cache-Control"] = f"private, max-age={max_age or 0}"
+    return TokenIntrospectResponse(results=results)
+
 @router.post("/forgot-password", response_model=UserResponse)
 async def forgot_password(user_data: UserForgotPassword, db: Session = Depends(get_db)):
     user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
@@ -140,17 +243,18 @@ async def forgot_password(user_data: UserForgotPassword, db: Session = Depends(g
         )
     
     # Generate and save reset token
-    reset_token = generate_password_reset_token()
-    user.reset_password_token = reset_token
-    user.reset_token_expires = datetime.utcnow() + timedelta(hours=24)
+    reset_token = issue_one_time_token(
+        db, user.id, OneTimeTokenPurpose.PASSWORD_RESET,
+        timedelta(hours=settings.RESET_TOKEN_EXPIRE_HOURS)
+    )
     db.commit()
     
     # Send reset password email
     reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
     try:
         send_reset_password_email(user_data.email, reset_url)
-    except Exception as e:
-        print(f"Failed to send password reset email: {str(e)}")
+    except Exception:
+        logger.exception("Failed to send password reset email")
     
     return UserResponse(
         status="success",
@@ -159,11 +263,10 @@ async def forgot_password(user_data: UserForgotPassword, db: Session = Depends(g
 
 @router.post("/reset-password", response_model=UserResponse)
 async def reset_password(reset_data: UserResetPassword, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(
-        UserModel.reset_password_token == reset_data.token
-    ).first()
+    user_id = consume_one_time_token(db, reset_data.token, OneTimeTokenPurpose.PASSWORD_RESET)
+    user = db.query(UserModel).filter(UserModel.id == user_id).first() if user_id else None
     
-    if not user or is_token_expired(user.reset_token_expires):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired reset token"
@@ -171,8 +274,7 @@ async def reset_password(reset_data: UserResetPassword, db: Session = Depends(ge
     
     # Update password
     user.hashed_password = get_password_hash(reset_data.new_password)
-    user.reset_password_token = None
-    user.reset_token_expires = None
+    bump_token_version(db, user)
     db.commit()
     
     return UserResponse(
@@ -183,7 +285,7 @@ async def reset_password(reset_data: UserResetPassword, db: Session = Depends(ge
 @router.post("/change-password", response_model=UserResponse)
 async def change_password(
     password_data: UserChangePassword,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Row = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     if not verify_password(password_data.current_password, current_user.hashed_password):
@@ -192,7 +294,9 @@ async def change_password(
             detail="Incorrect current password"
         )
     
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    user = db.get(UserModel, current_user.id)
+    user.hashed_password = get_password_hash(password_data.new_password)
+    bump_token_version(db, user)
     db.commit()
     
     return UserResponse(
@@ -202,9 +306,8 @@ async def change_password(
 
 @router.get("/verify-email", response_model=UserResponse)
 async def verify_email(token: str, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(
-        UserModel.verification_token == token
-    ).first()
+    user_id = consume_one_time_token(db, token, OneTimeTokenPurpose.EMAIL_VERIFICATION)
+    user = db.query(UserModel).filter(UserModel.id == user_id).first() if user_id else None
     
     if not user:
         raise HTTPException(
@@ -213,7 +316,8 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
         )
     
     user.is_verified = True
-    user.verification_token = None
+    if user.verified_at is None:
+        user.verified_at = datetime.utcnow()
     db.commit()
     
     return UserResponse(
@@ -224,7 +328,7 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
 @router.post("/change-email", response_model=UserResponse)
 async def change_email(
     email_data: UserChangeEmail,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Row = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     # Verify current email matches
@@ -252,20 +356,27 @@ async def change_email(
         )
     
     # Update email and reset verification status
-    current_user.email = email_data.new_email
-    current_user.is_verified = False
-    current_user.verification_token = generate_verification_token()
+    user = db.get(UserModel, current_user.id)
+    user.email = email_data.new_email
+    user.is_verified = False
+    bump_token_version(db, user)
+    # Project details embed the owner's email, whoever they were cached for
+    invalidate_after_commit(db, [user.id], owner_ids=[user.id])
+    verification_token = issue_one_time_token(
+        db, user.id, OneTimeTokenPurpose.EMAIL_VERIFICATION,
+        timedelta(hours=settings.VERIFICATION_TOKEN_EXPIRE_HOURS)
+    )
     db.commit()
     
     # Send verification email
-    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={current_user.verification_token}"
+    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
     try:
         send_verification_email(email_data.new_email, verification_url)
-    except Exception as e:
-        print(f"Failed to send verification email: {str(e)}")
+    except Exception:
+        logger.exception("Failed to send verification email")
     
     return UserResponse(
         status="success",
         message="Email updated successfully. Please check your new email for verification.",
-        data=current_user
+        data=user
     )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.warmup import check_database, warmup_state
+
+router = APIRouter(tags=["health"])
+
+@router.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving; says nothing about dependencies
+    return {"status": "ok"}
+
+@router.get("/readyz")
+def readyz():
+    # Readiness: warmup has finished and the primary database answers
+    if not warmup_state.done.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": warmup_state.stats()})
+    try:
+        check_database()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "database_unavailable", "detail": str(e)})
+    return {"status": "ready", "warmup": warmup_state.stats()}
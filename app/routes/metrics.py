@@ -0,0 +1,54 @@
+import os
+import re
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import FileResponse
+from app.core.response_cache import response_cache
+from app.core.security import password_hashing_stats, require_service
+from app.core.keyword_index import keyword_index
+from app.core.maintenance import maintenance_scheduler
+from app.core.logs import logging_stats
+from app.core.tracing import exporter
+from app.core.profiler import profile_path, profiler_stats, verify_profile_token
+from app.core.warmup import warmup_state
+from app.core.sharding import shard_router
+from app.core.idempotency import idempotency_store
+from app.core.singleflight import single_flight
+from app.core.audit import audit_log
+from app.core.notifications import notification_hub
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+@router.get("", dependencies=[Depends(require_service)])
+async def get_metrics():
+    # In-process counters of this worker
+    return {
+        "response_cache": response_cache.stats(),
+        "password_hashing": password_hashing_stats,
+        "maintenance": maintenance_scheduler.stats(),
+        "logging": logging_stats(),
+        "tracing": exporter.stats(),
+        "profiler": profiler_stats(),
+        "warmup": warmup_state.stats(),
+        "sharding": shard_router.stats(),
+        "keyword_index": keyword_index.stats(),
+        "idempotency": idempotency_store.stats(),
+        "single_flight": single_flight.stats(),
+        "audit": audit_log.stats(),
+        "notifications": notification_hub.stats()
+    }
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    request: Request,
+    x_profile_token: str = Header(...)
+):
+    # Same signed token scheme as profiling itself, signed for this path
+    if not verify_profile_token(x_profile_token, "GET", request.url.path):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+    if not re.fullmatch(r"[0-9a-f]{32}", profile_id) or not os.path.exists(profile_path(profile_id)):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(profile_path(profile_id), media_type="text/plain", filename=f"{profile_id}.folded")
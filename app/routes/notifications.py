@@ -0,0 +1,68 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.notifications import notification_hub
+from app.core.security import get_current_principal, Principal
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"]
+)
+
+@router.get("/stream")
+async def stream_notifications(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Server-sent events telling the caller when their projects or access change.
+
+    Events: project_created, project_deleted, keywords_updated,
+    access_granted and access_revoked, with the owner and project ids as
+    JSON data. Refetch /project/projects on an event and after every
+    (re)connect, instead of polling.
+    """
+    if not settings.NOTIFY_ENABLED:
+        raise HTTPException(status_code=404, detail="Notifications are disabled")
+    # The stream outlives the authentication lookup: return the connection to the pool now
+    db.close()
+
+    stream = notification_hub.subscribe(current_user.id)
+    if stream is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open notification streams",
+            headers={"Retry-After": str(settings.NOTIFY_HEARTBEAT_SECONDS)}
+        )
+    return StreamingResponse(
+        _events(current_user.id, stream),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _events(user_id: int, stream) -> AsyncIterator[str]:
+    _, queue = stream
+    # Streams end after a while so clients reconnect, and authenticate again, with a current token
+    closes_at = time.monotonic() + settings.NOTIFY_MAX_STREAM_SECONDS
+    try:
+        yield "retry: 5000\n: connected\n\n"
+        while True:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), min(settings.NOTIFY_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                # Comment lines keep idle connections open through proxies
+                yield ": keepalive\n\n"
+                continue
+            event = dict(event)
+            yield f"id: {event.pop('id')}\nevent: {event.pop('event')}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        notification_hub.unsubscribe(user_id, stream)
@@ -1,9 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List
-from app.core.database import get_db
-from app.core.security import get_current_user
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from app.core.database import get_db, read_only
+from app.core.sharding import shard_router
+from app.core.security import get_current_principal, require_service, Principal
+from app.core.config import settings
+from app.core.etag import make_etag, etag_matches, json_response, not_modified
+from app.core.access import bump_owner_version, can_edit_project_keywords, get_affected_user_ids
+from app.core.keyword_import import FORMATS as KEYWORD_IMPORT_FORMATS, detect_format, import_keywords
+from app.core.lookups import (
+    get_user_by_id,
+    get_user_by_email,
+    get_owned_project,
+    get_global_grant,
+    get_project_grant
+)
+from app.core.response_cache import response_cache, invalidate_after_commit
+from app.core.audit import record_audit_event
+from app.core.notifications import notify_after_commit
+from app.core.keywords import (
+    get_project_keywords,
+    insert_project_keywords,
+    delete_project_keywords,
+    replace_project_keywords,
+    find_projects_by_keyword,
+    get_keyword_changes
+)
 from app.models.user import User
 from app.models.project import Project, UserProject, GlobalAccess, ProjectRole, GlobalRole
 from app.schemas.project import (
@@ -24,94 +48,139 @@ from app.schemas.project import (
     GlobalAccessListItem,
     IndividualAccessListResponse,
     IndividualAccessListItem,
-    ProjectUpdateKeywords
+    ProjectUpdateKeywords,
+    KeywordLookupResponse,
+    KeywordChangesResponse,
+    KeywordImportResponse
 )
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam, delete, insert, select, update
 from datetime import datetime
 
 
 router = APIRouter(
     prefix="/project",
     tags=["project"],
-    dependencies=[Depends(get_current_user)]  # Add authentication for all project routes
+    dependencies=[Depends(get_current_principal)]  # Add authentication for all project routes
+)
+
+# Internal endpoints for other services, authenticated with a service key instead of a user token
+service_router = APIRouter(
+    prefix="/project",
+    tags=["project"],
+    dependencies=[Depends(require_service)]
 )
 
 @router.post("/detail", response_model=ProjectDetailResponse)
+@read_only
 async def get_project_detail(
     request: ProjectDetailRequest,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    # Get user by email
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get project by name and find access details
-    project = db.query(Project).filter(
-        and_(
-            Project.name == request.project_name,
-            Project.owner_id == user.id
+    if request.project_id is None and not (request.email and request.project_name):
+        raise HTTPException(status_code=422, detail="Provide project_id, or email and project_name")
+
+    user_id = current_user.id
+    cache_key = f"detail:{request.project_id}:{request.email}:{request.project_name}"
+    cached = response_cache.get(user_id, cache_key) if settings.RESPONSE_CACHE_ENABLED else None
+    if cached:
+        return json_response(cached[0])
+
+    generation = response_cache.generation()
+    # Start a fresh snapshot so everything read below is at least as new as `generation`
+    db.rollback()
+
+    detail = build_project_detail(db, request, user_id)
+    content = detail.model_dump_json().encode()
+    if settings.RESPONSE_CACHE_ENABLED:
+        # Tagged with the owner so any change to the owner's projects or grants drops it
+        response_cache.set(user_id, cache_key, content, None, generation, tags=[f"owner:{detail.owner_id}"])
+    return json_response(content)
+
+def build_project_detail(db: Session, request: ProjectDetailRequest, caller_id: int) -> ProjectDetailResponse:
+    """Resolve the project and the caller's role in one shard query, keywords in a second.
+
+    The role is always the caller's. ``request.email`` only names the owner in
+    a lookup by project name, as it did before lookups by ``project_id``; a
+    lookup by id ignores it. Users live on the primary, so the owner is looked
+    up there.
+    """
+    projects = Project.__table__
+    user_projects = UserProject.__table__
+    global_accesses = GlobalAccess.__table__
+
+    named_owner = None
+    if request.project_id is not None:
+        shard_db = shard_router.session_for_project(db, request.project_id)
+        if shard_db is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        condition = projects.c.id == request.project_id
+    else:
+        named_owner = get_user_by_email(db, request.email)
+        if named_owner is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        shard_db = shard_router.session(db, named_owner.id)
+        condition = and_(projects.c.name == request.project_name, projects.c.owner_id == named_owner.id)
+
+    row = shard_db.execute(
+        select(
+            projects.c.id,
+            projects.c.name,
+            projects.c.language,
+            projects.c.owner_id,
+            projects.c.created_at,
+            projects.c.updated_at,
+            user_projects.c.role.label("individual_role"),
+            global_accesses.c.role.label("global_role")
+        )
+        .select_from(
+            projects
+            .outerjoin(user_projects, and_(
+                user_projects.c.project_id == projects.c.id,
+                user_projects.c.user_id == caller_id
+            ))
+            .outerjoin(global_accesses, and_(
+                global_accesses.c.owner_id == projects.c.owner_id,
+                global_accesses.c.user_id == caller_id
+            ))
         )
+        .where(condition)
+        .limit(1)
     ).first()
 
-    if not project:
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    owner = named_owner or get_user_by_id(db, row.owner_id)
+    if owner is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Get project owner details
-    owner = db.query(User).filter(User.id == project.owner_id).first()
-    
     # Get keywords
-    keywords = db.execute(
-        text("""
-            SELECT relevan_keyword 
-            FROM keyword_projects 
-            WHERE project_id = :project_id 
-            AND owner_id = :owner_id
-        """),
-        {"project_id": project.id, "owner_id": project.owner_id}
-    ).fetchall()
+    keywords = get_project_keywords(shard_db, row.id, row.owner_id)
     
     # Check access type and role
     access_type = "owner"
     role = None
     global_role = None
     
-    if project.owner_id != user.id:
-        # Check individual access
-        individual_access = db.query(UserProject).filter(
-            and_(
-                UserProject.project_id == project.id,
-                UserProject.user_id == user.id
-            )
-        ).first()
-        
-        if individual_access:
+    if row.owner_id != caller_id:
+        if row.individual_role is not None:
             access_type = "individual"
-            role = individual_access.role
+            role = row.individual_role
+        elif row.global_role is not None:
+            access_type = "global"
+            global_role = row.global_role
+            role = ProjectRole.FULL_ACCESS if row.global_role == GlobalRole.ADMINISTRATOR else ProjectRole.PREVIEW_ONLY
         else:
-            # Check global access
-            global_access = db.query(GlobalAccess).filter(
-                and_(
-                    GlobalAccess.owner_id == project.owner_id,
-                    GlobalAccess.user_id == user.id
-                )
-            ).first()
-            
-            if global_access:
-                access_type = "global"
-                global_role = global_access.role
-                role = ProjectRole.FULL_ACCESS if global_access.role == GlobalRole.ADMINISTRATOR else ProjectRole.PREVIEW_ONLY
-            else:
-                raise HTTPException(status_code=403, detail="No access to this project")
+            raise HTTPException(status_code=403, detail="No access to this project")
 
     return ProjectDetailResponse(
-        name=project.name,
-        language=project.language,
-        id=project.id,
-        owner_id=project.owner_id,
-        created_at=project.created_at,
-        updated_at=project.updated_at,
-        keywords=[k[0] for k in keywords] if keywords else None,
+        name=row.name,
+        language=row.language,
+        id=row.id,
+        owner_id=row.owner_id,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        keywords=keywords or None,
         role=role,
         access_type=access_type,
         owner_email=owner.email,
@@ -138,7 +207,7 @@ async def get_project_detail(
 )
 async def create_onboarding(
     request: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Handle "All language" case by converting to "indonesia"
@@ -151,245 +220,299 @@ async def create_onboarding(
     except Exception as e:
         raise HTTPException(status_code=422, detail=str(e))
   
+    shard_db = shard_router.session(db, current_user.id, write=True)
+    projects_table = Project.__table__
+
     # Check for duplicate project names
+    existing_names = set(shard_db.execute(
+        select(projects_table.c.name).where(
+            projects_table.c.owner_id == current_user.id,
+            projects_table.c.name.in_(request.projects)
+        )
+    ).scalars())
     for project_name in request.projects:
-        existing_project = db.query(Project).filter(
-            Project.owner_id == current_user.id,
-            Project.name == project_name
-        ).first()
-        if existing_project:
+        if project_name in existing_names:
             raise HTTPException(
                 status_code=400,
                 detail=f"Project with name '{project_name}' already exists for this user"
             )
 
-    # Create projects
-    projects = []
-    for project_name in request.projects:
-        project = Project(
-            name=project_name,
-            owner_id=current_user.id,
-            language=request.language
+    # Create projects, with ids from the directory so they are unique across shards
+    now = datetime.utcnow()
+    projects = [
+        {
+            "id": project_id,
+            "name": project_name,
+            "owner_id": current_user.id,
+            "language": request.language,
+            "created_at": now,
+            "updated_at": now
+        }
+        for project_id, project_name in zip(
+            shard_router.allocate_project_ids(current_user.id, len(request.projects)), request.projects
         )
-        db.add(project)
-        projects.append(project)
-    
-    db.commit()
-    for project in projects:
-        db.refresh(project)
+    ]
+
+    affected_user_ids = get_affected_user_ids(shard_db, current_user.id)
+    invalidate_after_commit(db, affected_user_ids, owner_ids=[current_user.id])
+    notify_after_commit(
+        db, affected_user_ids, "project_created",
+        owner_id=current_user.id, project_ids=[project["id"] for project in projects]
+    )
+    try:
+        bump_owner_version(shard_db, current_user.id)
+        if projects:
+            shard_db.execute(insert(projects_table), projects)
     
-    # Use provided keywords if available, otherwise generate them
-    if request.keywords:
-        # Save provided keywords to keyword_projects table
-        for project in projects:
-
-            all_keywords = request.keywords
-            all_keywords.append(project.name)
-            all_keywords = list(set([i.lower() for i in all_keywords]))
-
-            for keyword in all_keywords:
-                db.execute(
-                    text("""
-                        INSERT INTO keyword_projects (project_id, owner_id, relevan_keyword, project_name, created_at)
-                        VALUES (:project_id, :owner_id, :keyword, :project_name, :created_at)
-                    """),
-                    {
-                        "project_id": project.id,
-                        "owner_id": current_user.id,
-                        "keyword": keyword,
-                        "project_name": project.name,
-                        "created_at": project.created_at
-                    }
+        # Use provided keywords if available, otherwise generate them
+        if request.keywords:
+            # Save provided keywords to keyword_projects table
+            for project in projects:
+
+                all_keywords = request.keywords
+                all_keywords.append(project["name"])
+                all_keywords = list(set([i.lower() for i in all_keywords]))
+
+                insert_project_keywords(
+                    shard_db, project["id"], current_user.id, project["name"], all_keywords, project["created_at"]
                 )
             
-            project.keywords = all_keywords
+                project["keywords"] = all_keywords
         db.commit()
+    except IntegrityError:
+        # A concurrent request created one of these names after the check above
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Project with one of these names already exists for this user")
         
     return projects
 
 @router.post("/access/global", response_model=GlobalAccessResponse)
 async def create_global_access(
     access: GlobalAccessCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Check if user exists
-    user = db.query(User).filter(User.email == access.user_email).first()
+    user = get_user_by_email(db, access.user_email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Grants live on the granting owner's shard
+    shard_db = shard_router.session(db, current_user.id, write=True)
+
     # Check if access already exists
-    existing_access = db.query(GlobalAccess).filter(
-        GlobalAccess.owner_id == current_user.id,
-        GlobalAccess.user_id == user.id
-    ).first()
+    existing_access = get_global_grant(shard_db, current_user.id, user.id)
     
     if existing_access:
         raise HTTPException(status_code=400, detail="Access already exists")
     
-    global_access = GlobalAccess(
-        owner_id=current_user.id,
-        user_id=user.id,
-        role=access.role
+    now = datetime.utcnow()
+    global_access = {
+        "owner_id": current_user.id,
+        "user_id": user.id,
+        "role": access.role,
+        "created_at": now,
+        "updated_at": now
+    }
+    invalidate_after_commit(db, [user.id], owner_ids=[current_user.id])
+    record_audit_event(
+        db, "global_access.grant", current_user.id, current_user.id,
+        target_user_id=user.id, details={"role": access.role.value}
     )
-    db.add(global_access)
-    db.commit()
-    db.refresh(global_access)
+    notify_after_commit(db, [user.id, current_user.id], "access_granted", owner_id=current_user.id, project_id=None)
+    try:
+        bump_owner_version(shard_db, current_user.id)
+        result = shard_db.execute(insert(GlobalAccess.__table__).values(**global_access))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Access already exists")
     
-    return global_access
+    return {"id": result.inserted_primary_key[0], **global_access}
 
 @router.post("/access/project", response_model=ProjectAccess)
 async def create_project_access(
     access: ProjectAccessCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    shard_db = shard_router.session(db, current_user.id, write=True)
+
     # Check if project exists and user is owner
-    project = db.query(Project).filter(
-        Project.id == access.project_id,
-        Project.owner_id == current_user.id
-    ).first()
+    project = get_owned_project(shard_db, access.project_id, current_user.id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or you're not the owner")
     
     # Check if user exists
-    user = db.query(User).filter(User.email == access.user_email).first()
+    user = get_user_by_email(db, access.user_email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if access already exists
-    existing_access = db.query(UserProject).filter(
-        UserProject.project_id == access.project_id,
-        UserProject.user_id == user.id
-    ).first()
+    existing_access = get_project_grant(shard_db, access.project_id, user.id)
     
     if existing_access:
         raise HTTPException(status_code=400, detail="Access already exists")
     
-    project_access = UserProject(
-        project_id=access.project_id,
-        user_id=user.id,
-        role=access.role
+    now = datetime.utcnow()
+    project_access = {
+        "project_id": access.project_id,
+        "user_id": user.id,
+        "role": access.role,
+        "created_at": now,
+        "updated_at": now
+    }
+    invalidate_after_commit(db, [user.id], owner_ids=[current_user.id])
+    record_audit_event(
+        db, "project_access.grant", current_user.id, current_user.id,
+        project_id=access.project_id, target_user_id=user.id, details={"role": access.role.value}
     )
-    db.add(project_access)
-    db.commit()
-    db.refresh(project_access)
+    notify_after_commit(
+        db, [user.id, current_user.id], "access_granted", owner_id=current_user.id, project_id=access.project_id
+    )
+    try:
+        bump_owner_version(shard_db, current_user.id)
+        result = shard_db.execute(insert(UserProject.__table__).values(**project_access))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Access already exists")
     
-    return project_access
+    return {"id": result.inserted_primary_key[0], **project_access}
+
+def get_project_list_version(db: Session, user_id: int) -> tuple:
+    """Cheap fingerprint of everything list_projects reads for a user.
+
+    The list shows the data of the user and of every owner who granted the
+    user access, so it is versioned by those owners' owner_versions counters,
+    which every write to an owner's data advances. Owners without a row yet
+    count as version 0, so losing access to one still changes the result.
+    Every shard can hold grants to the user, so each contributes its own set.
+    """
+    statement = text("""
+        SELECT :user_id, COALESCE(MAX(version), 0)
+        FROM owner_versions WHERE owner_id = :user_id
+        UNION
+        SELECT ga.owner_id, COALESCE(v.version, 0)
+        FROM global_accesses ga LEFT JOIN owner_versions v ON v.owner_id = ga.owner_id
+        WHERE ga.user_id = :user_id
+        UNION
+        SELECT p.owner_id, COALESCE(v.version, 0)
+        FROM user_projects up
+        JOIN projects p ON p.id = up.project_id
+        LEFT JOIN owner_versions v ON v.owner_id = p.owner_id
+        WHERE up.user_id = :user_id
+    """)
+    return tuple(shard_router.scatter(
+        db, lambda shard_db: tuple(sorted(tuple(row) for row in shard_db.execute(statement, {"user_id": user_id})))
+    ))
 
 @router.get("/projects", response_model=ProjectListResponse)
+@read_only
 async def list_projects(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    user_id = current_user.id
+
+    # Serve from the per-user response cache when possible
+    cached = response_cache.get(user_id, "projects") if settings.RESPONSE_CACHE_ENABLED else None
+    if cached:
+        content, etag = cached
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return json_response(content, etag)
+
+    generation = response_cache.generation()
+    # Start a fresh snapshot so everything read below is at least as new as `generation`
+    db.rollback()
+
+    # Answer conditional polls before building the listing
+    etag = make_etag("projects", user_id, *get_project_list_version(db, user_id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    content = build_project_list(db, user_id).model_dump_json().encode()
+    if settings.RESPONSE_CACHE_ENABLED:
+        response_cache.set(user_id, "projects", content, etag, generation)
+    return json_response(content, etag)
+
+def _read_project_list(db: Session, user_id: int) -> dict:
+    """One shard's share of a user's project list: owned projects, projects
+    shared with the user individually and through global access, and their keywords."""
+    projects = Project.__table__
+    user_projects = UserProject.__table__
+    global_accesses = GlobalAccess.__table__
+
+    owned = db.execute(
+        select(projects).where(projects.c.owner_id == user_id).order_by(projects.c.id)
+    ).fetchall()
+    individual = db.execute(
+        select(projects, user_projects.c.role)
+        .join(user_projects, user_projects.c.project_id == projects.c.id)
+        .where(user_projects.c.user_id == user_id)
+        .order_by(user_projects.c.id)
+    ).fetchall()
+    shared = db.execute(
+        select(projects, global_accesses.c.role)
+        .join(global_accesses, global_accesses.c.owner_id == projects.c.owner_id)
+        .where(global_accesses.c.user_id == user_id)
+        .order_by(global_accesses.c.id, projects.c.id)
+    ).fetchall()
+
+    keywords = {}
+    project_ids = {row.id for rows in (owned, individual, shared) for row in rows}
+    if project_ids:
+        for project_id, keyword in db.execute(
+            text("""
+                SELECT project_id, relevan_keyword
+                FROM keyword_projects
+                WHERE project_id IN :project_ids
+            """).bindparams(bindparam("project_ids", expanding=True)),
+            {"project_ids": sorted(project_ids)}
+        ):
+            keywords.setdefault(project_id, []).append(keyword)
+    return {"owned": owned, "individual": individual, "global": shared, "keywords": keywords}
+
+def build_project_list(db: Session, user_id: int) -> ProjectListResponse:
+    shards = shard_router.scatter(db, lambda shard_db: _read_project_list(shard_db, user_id))
+    keywords = {}
+    for shard in shards:
+        keywords.update(shard["keywords"])
+
     # Get owned projects with keywords
-    owned_projects_query = db.query(Project).filter(
-        Project.owner_id == current_user.id
-    )
-    
     owned_projects = []
-    for project in owned_projects_query.all():
-        
-        # Get keywords for each project
-        keywords = db.execute(
-            text("""
-                SELECT relevan_keyword 
-                FROM keyword_projects 
-                WHERE project_id = :project_id 
-                AND owner_id = :owner_id
-            """),
-            {"project_id": project.id, "owner_id": current_user.id}
-        ).fetchall()
-        
-        # Convert keywords to list
-        project_keywords = [k[0] for k in keywords] if keywords else []
-        project_keywords.append(project.name)
-
-        # Create a dict with project attributes
-        project_dict = {
-            "id": project.id,
-            "name": project.name,
-            "owner_id": project.owner_id,
-            "language": project.language,
-            "created_at": project.created_at,
-            "updated_at": project.updated_at,
-            "keywords": project_keywords
-        }
-        owned_projects.append(project_dict)
-    
-    # Get projects with individual access
-    individual_accesses = db.query(UserProject).filter(
-        UserProject.user_id == current_user.id
-    ).all()
-    
-    # Get projects through global access
-    global_accesses = db.query(GlobalAccess).filter(
-        GlobalAccess.user_id == current_user.id
-    ).all()
-    
-    accessible_projects = []
-    added_project_ids = set()  # Track which projects have been added
-    
-    # Add individually accessible projects first
-    for access in individual_accesses:
-        project = access.project
-        if project.id not in added_project_ids:  # Only add if not already added
-            # Get keywords for the project
-            keywords = db.execute(
-                text("""
-                    SELECT relevan_keyword 
-                    FROM keyword_projects 
-                    WHERE project_id = :project_id 
-                    AND owner_id = :owner_id
-                """),
-                {"project_id": project.id, "owner_id": project.owner_id}
-            ).fetchall()
-            
-            # Convert keywords to list and set it on the project
-            project.keywords = [k[0] for k in keywords] if keywords else None
-            
-            accessible_projects.append(
-                ProjectAccessInfo(
-                    name=project.name,
-                    language=project.language,
-                    id=project.id,
-                    owner_id=project.owner_id,
-                    created_at=project.created_at,
-                    updated_at=project.updated_at,
-                    keywords=project.keywords,
-                    role=access.role,
-                    access_type="individual"
-                )
-            )
-            added_project_ids.add(project.id)
-    
+    owned_project_ids = set()
+    for shard in shards:
+        for project in shard["owned"]:
+            if project.id in owned_project_ids:
+                continue  # The owner is being moved and shows up on two shards
+            owned_project_ids.add(project.id)
+            owned_projects.append({
+                "id": project.id,
+                "name": project.name,
+                "owner_id": project.owner_id,
+                "language": project.language,
+                "created_at": project.created_at,
+                "updated_at": project.updated_at,
+                "keywords": keywords.get(project.id, []) + [project.name]
+            })
 
-    # Add globally accessible projects
-    for global_access in global_accesses:
-        owner_projects = db.query(Project).filter(
-            Project.owner_id == global_access.owner_id
-        ).all()
-        
-        for project in owner_projects:
-            # Skip if project already added through individual access
-            if project.id not in added_project_ids:
-                # Get keywords for the project
-                keywords = db.execute(
-                    text("""
-                        SELECT relevan_keyword 
-                        FROM keyword_projects 
-                        WHERE project_id = :project_id 
-                        AND owner_id = :owner_id
-                    """),
-                    {"project_id": project.id, "owner_id": project.owner_id}
-                ).fetchall()
-                
-                # Convert keywords to list and set it on the project
-                project.keywords = [k[0] for k in keywords] if keywords else None
-                
-                # Map global role to project role
-                project_role = ProjectRole.FULL_ACCESS if global_access.role == GlobalRole.ADMINISTRATOR else ProjectRole.PREVIEW_ONLY
-                
+    accessible_projects = []
+    added_project_ids = set(owned_project_ids)  # Track which projects have been added
+
+    # Add individually accessible projects first, then globally accessible ones
+    for access_type in ("individual", "global"):
+        for shard in shards:
+            for project in shard[access_type]:
+                if project.id in added_project_ids:
+                    continue
+                if access_type == "individual":
+                    role = project.role
+                else:
+                    # Map global role to project role
+                    role = ProjectRole.FULL_ACCESS if project.role == GlobalRole.ADMINISTRATOR else ProjectRole.PREVIEW_ONLY
                 accessible_projects.append(
                     ProjectAccessInfo(
                         name=project.name,
@@ -398,52 +521,49 @@ async def list_projects(
                         owner_id=project.owner_id,
                         created_at=project.created_at,
                         updated_at=project.updated_at,
-                        keywords=project.keywords,
-                        role=project_role,
-                        access_type="global"
+                        keywords=keywords.get(project.id),
+                        role=role,
+                        access_type=access_type
                     )
                 )
                 added_project_ids.add(project.id)
-    
-    list_owned_project_ids = [p["id"] for p in owned_projects]
+
     return ProjectListResponse(
         owned_projects=owned_projects,
-        accessible_projects=[i for i in accessible_projects if i.id not in list_owned_project_ids]
+        accessible_projects=accessible_projects
     )
 
 @router.delete("/remove")
 async def remove_project(
     request: ProjectDelete,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    shard_db = shard_router.session(db, current_user.id, write=True)
+
     # Check if project exists and user is owner
-    
-    project = db.query(Project).filter(
-        and_(
-            Project.id == request.project_id,
-            Project.owner_id == current_user.id
-        )
-    ).first()
+    project = get_owned_project(shard_db, request.project_id, current_user.id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or you're not the owner")
     
+    affected_user_ids = get_affected_user_ids(shard_db, current_user.id, project.id)
+    invalidate_after_commit(db, affected_user_ids, owner_ids=[current_user.id])
+    notify_after_commit(db, affected_user_ids, "project_deleted", owner_id=current_user.id, project_id=project.id)
+    bump_owner_version(shard_db, current_user.id)
+
     # Delete associated keywords
-    db.execute(
-        text("""
-            DELETE FROM keyword_projects 
-            WHERE project_id = :project_id 
-            AND owner_id = :owner_id
-        """),
-        {"project_id": project.id, "owner_id": current_user.id}
-    )
+    delete_project_keywords(shard_db, project.id, current_user.id)
     
     # Delete associated access records
-    db.query(UserProject).filter(UserProject.project_id == project.id).delete()
+    shard_db.execute(delete(UserProject).where(UserProject.project_id == project.id))
     
     # Delete the project
-    db.delete(project)
+    shard_db.execute(delete(Project).where(Project.id == project.id))
+    shard_router.forget_project(db, project.id)
+    record_audit_event(
+        db, "project.delete", current_user.id, current_user.id, project_id=project.id, details={"name": project.name}
+    )
     db.commit()
     
     return {"message": "Project successfully deleted"}
@@ -451,132 +571,152 @@ async def remove_project(
 @router.delete("/access/remove")
 async def remove_access(
     request: AccessDelete,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Get user by email
-    user = db.query(User).filter(User.email == request.user_email).first()
+    user = get_user_by_email(db, request.user_email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    shard_db = shard_router.session(db, current_user.id, write=True)
+
     if request.project_id:
         # Remove individual project access
-        project = db.query(Project).filter(
-            and_(
-                Project.id == request.project_id,
-                Project.owner_id == current_user.id
-            )
-        ).first()
+        project = get_owned_project(shard_db, request.project_id, current_user.id)
         
         if not project:
             raise HTTPException(status_code=404, detail="Project not found or you're not the owner")
         
-        access = db.query(UserProject).filter(
-            and_(
-                UserProject.project_id == request.project_id,
-                UserProject.user_id == user.id
-            )
-        ).first()
+        access = get_project_grant(shard_db, request.project_id, user.id)
         
         if not access:
             raise HTTPException(status_code=404, detail="Access not found")
         
-        db.delete(access)
+        shard_db.execute(delete(UserProject).where(UserProject.id == access.id))
+        bump_owner_version(shard_db, current_user.id)
+        invalidate_after_commit(db, [user.id], owner_ids=[current_user.id])
+        record_audit_event(
+            db, "project_access.revoke", current_user.id, current_user.id,
+            project_id=request.project_id, target_user_id=user.id, details={"role": access.role.value}
+        )
+        notify_after_commit(
+            db, [user.id, current_user.id], "access_revoked", owner_id=current_user.id, project_id=request.project_id
+        )
         db.commit()
         
         return {"message": "Project access successfully removed"}
     else:
         # Remove global access
-        access = db.query(GlobalAccess).filter(
-            and_(
-                GlobalAccess.owner_id == current_user.id,
-                GlobalAccess.user_id == user.id
-            )
-        ).first()
+        access = get_global_grant(shard_db, current_user.id, user.id)
         
         if not access:
             raise HTTPException(status_code=404, detail="Global access not found")
         
-        db.delete(access)
+        shard_db.execute(delete(GlobalAccess).where(GlobalAccess.id == access.id))
+        bump_owner_version(shard_db, current_user.id)
+        invalidate_after_commit(db, [user.id], owner_ids=[current_user.id])
+        record_audit_event(
+            db, "global_access.revoke", current_user.id, current_user.id,
+            target_user_id=user.id, details={"role": access.role.value}
+        )
+        notify_after_commit(
+            db, [user.id, current_user.id], "access_revoked", owner_id=current_user.id, project_id=None
+        )
         db.commit()
         
         return {"message": "Global access successfully removed"}
 
+def _get_users(db: Session, user_ids: set) -> dict:
+    """Names and emails of ``user_ids`` from the primary, by id."""
+    if not user_ids:
+        return {}
+    users = User.__table__
+    return {
+        row.id: row
+        for row in db.execute(
+            select(users.c.id, users.c.name, users.c.email).where(users.c.id.in_(sorted(user_ids)))
+        )
+    }
+
 @router.get("/access/global-access/list", response_model=GlobalAccessListResponse)
+@read_only
 async def list_global_access(
     owner_email: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    # Execute the query
-    result = db.execute(
-        text("""
-            select ga.*, owner_name, owner_email, user_name, user_email from global_accesses ga
-            join (select id, name owner_name, email owner_email from users) owner 
-            on ga.owner_id = owner.id
-            join (select id, name user_name, email user_email from users) user 
-            on ga.user_id = user.id
-            where owner_email = :owner_email
-        """),
-        {"owner_email": owner_email}
+    # The owner and grantees are on the primary, the grants on the owner's shard
+    owner = get_user_by_email(db, owner_email)
+    if owner is None:
+        return GlobalAccessListResponse(items=[])
+    global_accesses = GlobalAccess.__table__
+    grants = shard_router.session(db, owner.id).execute(
+        select(global_accesses.c.user_id, global_accesses.c.role)
+        .where(global_accesses.c.owner_id == owner.id)
+        .order_by(global_accesses.c.id)
     ).fetchall()
+    users = _get_users(db, {grant.user_id for grant in grants})
 
     # Transform the results into the response format
     items = [
         GlobalAccessListItem(
-            user_id = row.user_id,
-            user_name=row.user_name,
-            user_email=row.user_email,
-            owner_id=row.owner_id,
-            owner_name=row.owner_name,
-            owner_email=row.owner_email,
-            role=row.role.lower()  # Convert to lowercase to match enum
+            user_id = grant.user_id,
+            user_name=users[grant.user_id].name,
+            user_email=users[grant.user_id].email,
+            owner_id=owner.id,
+            owner_name=owner.name,
+            owner_email=owner.email,
+            role=grant.role
         )
-        for row in result
+        for grant in grants
+        if grant.user_id in users
     ]
 
     return GlobalAccessListResponse(items=items)
 
 @router.get("/access/individual-project-access/list", response_model=IndividualAccessListResponse)
+@read_only
 async def list_individual_project_access(
     owner_email: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    # Execute the query
-    result = db.execute(
-        text("""
-            select ga.user_id, ga.project_id, lower(ga.role) role, ga.created_at, ga.updated_at, user_name, user_email, project_name, p.language, 
-            p.owner_id, p.owner_name, p.owner_email
-
-            from user_projects ga
-            join (select id, name user_name, email user_email from users) user 
-            on ga.user_id = user.id
-            join (select projects.id, projects.name project_name, language, owner_id , users.name owner_name, users.email owner_email from projects
-                    join users 
-                    on users.id = projects.owner_id
-            ) p 
-            on p.id = ga.project_id
-            where p.owner_email = :owner_email
-        """),
-        {"owner_email": owner_email}
+    owner = get_user_by_email(db, owner_email)
+    if owner is None:
+        return IndividualAccessListResponse(items=[])
+    projects = Project.__table__
+    user_projects = UserProject.__table__
+    grants = shard_router.session(db, owner.id).execute(
+        select(
+            user_projects.c.user_id,
+            user_projects.c.project_id,
+            user_projects.c.role,
+            projects.c.name.label("project_name"),
+            projects.c.language
+        )
+        .join(projects, projects.c.id == user_projects.c.project_id)
+        .where(projects.c.owner_id == owner.id)
+        .order_by(user_projects.c.id)
     ).fetchall()
+    users = _get_users(db, {grant.user_id for grant in grants})
 
     # Transform the results into the response format
     items = [
         IndividualAccessListItem(
-            user_id=row.user_id,
-            project_id=row.project_id,
-            user_name=row.user_name,
-            user_email=row.user_email,
-            project_name=row.project_name,
-            language=row.language.lower(),  # Convert to lowercase to match enum
-            owner_id=row.owner_id,
-            owner_name=row.owner_name,
-            owner_email=row.owner_email,
-            role=row.role  # This should be FULL_ACCESS or PREVIEW_ONLY
+            user_id=grant.user_id,
+            project_id=grant.project_id,
+            user_name=users[grant.user_id].name,
+            user_email=users[grant.user_id].email,
+            project_name=grant.project_name,
+            language=grant.language,
+            owner_id=owner.id,
+            owner_name=owner.name,
+            owner_email=owner.email,
+            role=grant.role
         )
-        for row in result
+        for grant in grants
+        if grant.user_id in users
     ]
 
     return IndividualAccessListResponse(items=items)
@@ -584,121 +724,136 @@ async def list_individual_project_access(
 @router.put("/keywords", response_model=ProjectSchema)
 async def update_project_keywords(
     request: ProjectUpdateKeywords,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    project = db.query(Project).filter(Project.id == request.project_id).first()
+    shard_db = shard_router.session_for_project(db, request.project_id, write=True)
+    projects = Project.__table__
+    project = shard_db.execute(
+        select(projects).where(projects.c.id == request.project_id)
+    ).first() if shard_db is not None else None
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Check if the current user is the owner
-    is_owner = project.owner_id == current_user.id
-
-    # Check for individual full access if not the owner
-    has_individual_full_access = False
-    if not is_owner:
-        individual_access = db.query(UserProject).filter(
-            UserProject.project_id == project.id,
-            UserProject.user_id == current_user.id,
-            UserProject.role == ProjectRole.FULL_ACCESS
-        ).first()
-        if individual_access:
-            has_individual_full_access = True
-
-    # Check for global full access (administrator role) if not owner and no individual full access
-    has_global_full_access = False
-    if not is_owner and not has_individual_full_access:
-        global_access = db.query(GlobalAccess).filter(
-            GlobalAccess.owner_id == project.owner_id, # Check against project's owner
-            GlobalAccess.user_id == current_user.id,
-            GlobalAccess.role == GlobalRole.ADMINISTRATOR 
-        ).first()
-        if global_access:
-            has_global_full_access = True
-            
-    if not is_owner and not has_individual_full_access and not has_global_full_access:
+    if not can_edit_project_keywords(shard_db, project, current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to update keywords for this project")
 
-    # Delete existing keywords for the project
-    db.execute(
-        text("""
-            DELETE FROM keyword_projects 
-            WHERE project_id = :project_id AND owner_id = :owner_id
-        """),
-        {"project_id": project.id, "owner_id": project.owner_id} # Use project.owner_id here
-    )
+    affected_user_ids = get_affected_user_ids(shard_db, project.owner_id, project.id)
+    invalidate_after_commit(db, affected_user_ids, owner_ids=[project.owner_id])
+    notify_after_commit(db, affected_user_ids, "keywords_updated", owner_id=project.owner_id, project_id=project.id)
 
-    # Add new keywords
+    # Apply only the keyword rows that change, so the change log records real adds/removes
     all_keywords = list(set([k.lower() for k in request.keywords] + [project.name.lower()]))
+    updated_keywords = replace_project_keywords(
+        shard_db, project.id, project.owner_id, project.name, all_keywords # Use project.owner_id here
+    )
     
-    for keyword_text in all_keywords:
-        db.execute(
-            text("""
-                INSERT INTO keyword_projects (project_id, owner_id, relevan_keyword, project_name, created_at)
-                VALUES (:project_id, :owner_id, :keyword, :project_name, :created_at)
-            """),
-            {
-                "project_id": project.id,
-                "owner_id": project.owner_id, # Use project.owner_id here
-                "keyword": keyword_text,
-                "project_name": project.name,
-                "created_at": datetime.utcnow() 
-            }
-        )
-    
-    project.updated_at = datetime.utcnow()
-    db.add(project)
+    updated_at = datetime.utcnow()
+    shard_db.execute(update(projects).where(projects.c.id == project.id).values(updated_at=updated_at))
+    bump_owner_version(shard_db, project.owner_id)
+    record_audit_event(
+        db, "keywords.update", current_user.id, project.owner_id,
+        project_id=project.id, details={"keyword_count": len(updated_keywords)}
+    )
     db.commit()
-    db.refresh(project)
-
-    # Fetch keywords again to include in the response
-    updated_keywords_db = db.execute(
-        text("""
-            SELECT relevan_keyword 
-            FROM keyword_projects 
-            WHERE project_id = :project_id AND owner_id = :owner_id
-        """),
-        {"project_id": project.id, "owner_id": project.owner_id}
-    ).fetchall()
-    
-    project.keywords = [k[0] for k in updated_keywords_db] if updated_keywords_db else []
 
-    return project
+    return {**project._asdict(), "updated_at": updated_at, "keywords": updated_keywords}
+
+@router.post("/keywords/import", response_model=KeywordImportResponse)
+def import_project_keywords(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    # Bulk add/remove from a CSV or NDJSON file with project_id, keyword and op columns.
+    # A plain def, so a long import runs in the threadpool instead of blocking the event loop.
+    file_format = file_format or detect_format(file.filename, file.content_type)
+    if file_format not in KEYWORD_IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file format: upload a .csv or .ndjson file or pass format=csv|ndjson"
+        )
+    return import_keywords(db, current_user.id, file.file, file_format)
 
 @router.delete("/{project_id_to_delete}", status_code=200)
 async def delete_project_by_id(
     project_id_to_delete: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    shard_db = shard_router.session(db, current_user.id, write=True)
+
     # Check if project exists and current user is the owner
-    project = db.query(Project).filter(
-        Project.id == project_id_to_delete,
-        Project.owner_id == current_user.id
-    ).first()
+    project = get_owned_project(shard_db, project_id_to_delete, current_user.id)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found or you are not the owner")
 
+    affected_user_ids = get_affected_user_ids(shard_db, current_user.id, project.id)
+    invalidate_after_commit(db, affected_user_ids, owner_ids=[current_user.id])
+    notify_after_commit(db, affected_user_ids, "project_deleted", owner_id=current_user.id, project_id=project.id)
+    bump_owner_version(shard_db, current_user.id)
+
     # Delete associated keywords from keyword_projects table
-    db.execute(
-        text("""
-            DELETE FROM keyword_projects 
-            WHERE project_id = :project_id AND owner_id = :owner_id
-        """),
-        {"project_id": project.id, "owner_id": current_user.id}
-    )
+    delete_project_keywords(shard_db, project.id, current_user.id)
 
     # Delete associated access records from user_projects table
-    db.query(UserProject).filter(UserProject.project_id == project.id).delete()
+    shard_db.execute(delete(UserProject).where(UserProject.project_id == project.id))
     
     # Note: GlobalAccess records are not directly tied to a single project deletion by ID,
     # they are tied to an owner. If an owner is deleted, their global access grants would be handled elsewhere.
     # Deleting a project should not affect global access rules set by its owner for other users across other projects.
 
     # Delete the project itself
-    db.delete(project)
+    shard_db.execute(delete(Project).where(Project.id == project.id))
+    shard_router.forget_project(db, project.id)
+    record_audit_event(
+        db, "project.delete", current_user.id, current_user.id, project_id=project.id, details={"name": project.name}
+    )
     db.commit()
 
     return {"message": f"Project with ID {project_id_to_delete} successfully deleted"}
+
+@service_router.get("/keywords/changes", response_model=KeywordChangesResponse)
+async def list_keyword_changes(
+    since: int = 0,
+    limit: int = 1000,
+    shard: int = 0,
+    db: Session = Depends(get_db)
+):
+    # Incremental feed for downstream ingestion: resume from the last cursor seen.
+    # Each shard keeps its own change log, so consumers follow one cursor per shard.
+    if not 0 <= shard < shard_router.count:
+        raise HTTPException(status_code=400, detail=f"Shard must be between 0 and {shard_router.count - 1}")
+    limit = max(1, min(limit, settings.KEYWORD_CHANGES_MAX_BATCH))
+    changes = get_keyword_changes(shard_router.session_for_shard(db, shard), since, limit)
+
+    return KeywordChangesResponse(
+        changes=changes,
+        next_cursor=changes[-1].id if changes else since,
+        has_more=len(changes) == limit,
+        shard=shard,
+        shard_count=shard_router.count
+    )
+
+@service_router.get("/keywords/lookup", response_model=KeywordLookupResponse)
+async def lookup_keyword_projects(
+    keyword: str,
+    prefix: bool = False,
+    db: Session = Depends(get_db)
+):
+    # Reverse lookup across all owners, served from the in-memory keyword index.
+    # It spans every tenant, so it is for services only, never for user tokens.
+    keyword = keyword.strip().lower()
+    if not keyword:
+        raise HTTPException(status_code=400, detail="Keyword must not be empty")
+
+    project_ids, truncated = find_projects_by_keyword(db, keyword, prefix)
+    return KeywordLookupResponse(
+        keyword=keyword,
+        prefix=prefix,
+        project_ids=project_ids,
+        truncated=truncated
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from app.core.config import settings
+from app.core.keys import keyring
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["well-known"]
+)
+
+@router.get("/jwks.json")
+async def get_jwks():
+    # Public keys for verifying our tokens locally; serialized once at startup
+    return Response(
+        content=keyring.jwks_json(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_SECONDS}"}
+    )
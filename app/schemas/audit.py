@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class AuditEvent(BaseModel):
+    id: int
+    action: str
+    actor_id: int
+    owner_id: int
+    project_id: Optional[int] = None
+    target_user_id: Optional[int] = None
+    details: Optional[dict] = None
+    request_id: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AuditEventListResponse(BaseModel):
+    events: List[AuditEvent]
+    next_cursor: Optional[str] = None  # Pass back as ``cursor`` for the next (older) page
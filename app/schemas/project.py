@@ -54,6 +54,53 @@ class ProjectUpdateKeywords(BaseModel):
     project_id: int
     keywords: List[str]
 
+class KeywordLookupResponse(BaseModel):
+    keyword: str
+    prefix: bool
+    project_ids: List[int]
+    # True when the prefix matched more than KEYWORD_INDEX_MAX_PREFIX_TERMS keywords
+    # and only the projects of the first ones are listed
+    truncated: bool = False
+
+class KeywordChangeOp(str, Enum):
+    ADD = "add"
+    REMOVE = "remove"
+
+class KeywordChange(BaseModel):
+    id: int
+    project_id: int
+    owner_id: int
+    keyword: str
+    op: KeywordChangeOp
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class KeywordChangesResponse(BaseModel):
+    changes: List[KeywordChange]
+    next_cursor: int
+    has_more: bool
+    shard: int = 0
+    shard_count: int = 1
+
+class KeywordImportError(BaseModel):
+    row: int  # 1-based, counting data rows only
+    project_id: Optional[int] = None
+    keyword: Optional[str] = None
+    error: str
+
+class KeywordImportResponse(BaseModel):
+    rows: int
+    added: int
+    removed: int
+    unchanged: int
+    duplicates: int
+    failed: int
+    projects: int
+    errors: List[KeywordImportError]
+    errors_truncated: bool
+
 # Access Management Schemas
 class GlobalAccessCreate(BaseModel):
     user_email: str
@@ -105,8 +152,10 @@ class ProjectListResponse(BaseModel):
         from_attributes = True
 
 class ProjectDetailRequest(BaseModel):
-    email: str
-    project_name: str
+    # Look up by project_id, or by owner email + project name
+    email: Optional[str] = None
+    project_name: Optional[str] = None
+    project_id: Optional[int] = None
 
 class ProjectDetailResponse(BaseModel):
     name: str
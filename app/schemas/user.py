@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -40,6 +40,19 @@ class TokenPayload(BaseModel):
     sub: int
     exp: datetime
 
+class TokenIntrospectRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1)
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    sub: Optional[int] = None
+    exp: Optional[int] = None
+    token_type: Optional[str] = None
+    is_active: Optional[bool] = None
+
+class TokenIntrospectResponse(BaseModel):
+    results: List[TokenIntrospection]
+
 class User(UserBase):
     id: int
     name: str
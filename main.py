@@ -1,7 +1,26 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import api_router
+from app.routes.well_known import router as well_known_router
+from app.routes.health import router as health_router
 from app.core.config import settings
+from app.core.database import SessionLocal, close_shard_sessions
+from app.core.sharding import shard_router
+from app.core.keyword_index import keyword_index
+from app.core.security import calibrate_password_hashing
+from app.core.maintenance import maintenance_scheduler
+from app.core.logs import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.core.tracing import TracingMiddleware, exporter
+from app.core.profiler import ProfilerMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.singleflight import SingleFlightMiddleware
+from app.core.warmup import start_warmup
+from app.core.audit import audit_log
+from app.core.notifications import notification_hub
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Auth API",
@@ -28,6 +47,19 @@ security_scheme = {
 app.openapi_components = {"securitySchemes": security_scheme}
 app.openapi_security = [{"Bearer": []}]
 
+# Middleware added later wraps what was added before, so the first one added
+# is innermost. SingleFlight and Idempotency come first: the responses they
+# share or store then carry only the route's own headers, and CORS (added
+# after them) sets each caller's headers for its own Origin.
+app.add_middleware(SingleFlightMiddleware, paths=[
+    "/api/v1/project/projects",
+    "/api/v1/auth/me",
+])
+app.add_middleware(IdempotencyMiddleware, paths=[
+    "/api/v1/project/onboarding",
+    "/api/v1/project/access/global",
+    "/api/v1/project/access/project",
+])
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +68,80 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Inside the rest, so profiles start at the application rather than the middleware stack
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(RequestIdMiddleware)
+# Outermost, so the access log line is written inside the request's trace
+app.add_middleware(TracingMiddleware)
 
 # Include routers
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(well_known_router)
+app.include_router(health_router)
+
+@app.on_event("startup")
+def calibrate_hashing():
+    # Size the bcrypt cost to this machine before the first login
+    stats = calibrate_password_hashing()
+    logger.info(
+        "Password hashing: bcrypt rounds=%s (target %sms, measured %s)",
+        stats["rounds"], stats["target_ms"], stats["measured_ms"],
+        extra={"bcrypt": stats}
+    )
+
+@app.on_event("startup")
+def load_keyword_index():
+    # Build the keyword -> project reverse index before serving lookups
+    if not settings.KEYWORD_INDEX_ENABLED:
+        return
+    db = SessionLocal()
+    try:
+        keyword_index.load([shard_router.session_for_shard(db, shard) for shard in range(shard_router.count)])
+    except Exception:
+        # Lookups fall back to querying keyword_projects until the index is loaded
+        logger.exception("Failed to load keyword index")
+    finally:
+        close_shard_sessions(db)
+        db.close()
+
+@app.on_event("startup")
+def start_maintenance():
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_scheduler.start()
+
+@app.on_event("startup")
+def start_notifications():
+    # Connect the cross-worker backend before streams subscribe. A missing
+    # redis package or an unknown NOTIFY_BACKEND fails startup here.
+    if settings.NOTIFY_ENABLED:
+        notification_hub.start()
+
+@app.on_event("startup")
+def warmup():
+    # Registered after the other startup hooks so it warms the final configuration
+    start_warmup(app)
+
+@app.on_event("shutdown")
+def stop_maintenance():
+    maintenance_scheduler.stop()
+
+@app.on_event("shutdown")
+def stop_notifications():
+    notification_hub.stop()
+
+@app.on_event("shutdown")
+def flush_audit():
+    # Write the queued audit events before the process exits
+    audit_log.flush()
+
+@app.on_event("shutdown")
+def flush_spans():
+    exporter.flush()
+
+@app.on_event("shutdown")
+def flush_logs():
+    # Registered last so shutdown messages from the handlers above are written
+    shutdown_logging()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,76 @@
+import argparse
+import random
+import string
+import sys
+import os
+import time
+import tracemalloc
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.keyword_index import KeywordIndex
+
+def synthetic_rows(rows: int, projects: int, vocabulary: int, seed: int):
+    """Yield (keyword, project_id) pairs with a Zipf-like keyword distribution."""
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(vocabulary)
+    ]
+    for _ in range(rows):
+        # Squaring a uniform sample skews towards the head of the vocabulary
+        word = words[int(vocabulary * rng.random() ** 2)]
+        yield word, rng.randint(1, projects)
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def bench(rows: int, projects: int, vocabulary: int, lookups: int, seed: int):
+    index = KeywordIndex()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index.build(synthetic_rows(rows, projects, vocabulary, seed))
+    build_seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = index.stats()
+    print(f"rows={rows:,} terms={stats['terms']:,} postings={stats['postings']:,}")
+    print(f"build: {build_seconds:.1f}s, resident index: {current / 2**20:.1f} MiB, peak during build: {peak / 2**20:.1f} MiB")
+
+    rng = random.Random(seed + 1)
+    terms = index._terms
+    for label, fn, make_query in (
+        ("exact", index.lookup, lambda: rng.choice(terms)),
+        ("prefix(3)", lambda query: index.lookup_prefix(query)[0], lambda: rng.choice(terms)[:3]),
+    ):
+        samples = []
+        results = 0
+        for _ in range(lookups):
+            query = make_query()
+            start = time.perf_counter()
+            results += len(fn(query))
+            samples.append(time.perf_counter() - start)
+        print(
+            f"{label}: p50={percentile(samples, 50) * 1e6:.1f}us "
+            f"p99={percentile(samples, 99) * 1e6:.1f}us "
+            f"avg results={results / lookups:.1f}"
+        )
+
+    start = time.perf_counter()
+    for i in range(lookups):
+        index.add(projects + i, [terms[i % len(terms)]])
+    print(f"incremental add: {(time.perf_counter() - start) / lookups * 1e6:.1f}us/op")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory keyword index")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--projects", type=int, default=200_000)
+    parser.add_argument("--vocabulary", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    bench(args.rows, args.projects, args.vocabulary, args.lookups, args.seed)
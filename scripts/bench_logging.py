@@ -0,0 +1,82 @@
+import argparse
+import io
+import logging
+import sys
+import os
+import time
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logs import JsonFormatter, RequestContextFilter, request_id_var, setup_logging, shutdown_logging
+
+class SlowStream(io.StringIO):
+    """A stdout stand-in that takes ``delay`` seconds per write, like a busy pipe or log collector."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, s):
+        if self.delay:
+            time.sleep(self.delay)
+        return len(s)
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def simulate_request(logger, i):
+    # Roughly what one request logs: a couple of debug/info lines and the access line
+    token = request_id_var.set(f"req-{i}")
+    try:
+        logger.info("Loaded %d projects", 12, extra={"user_id": i})
+        logger.info("GET /api/v1/project/projects 200", extra={"status": 200, "duration_ms": 3.2})
+    finally:
+        request_id_var.reset(token)
+
+def bench(label, logger, requests):
+    samples = []
+    for i in range(requests):
+        start = time.perf_counter()
+        simulate_request(logger, i)
+        samples.append(time.perf_counter() - start)
+    print(
+        f"{label}: mean={sum(samples) / len(samples) * 1e6:.1f}us "
+        f"p50={percentile(samples, 50) * 1e6:.1f}us p99={percentile(samples, 99) * 1e6:.1f}us per request"
+    )
+
+def reset_root():
+    root = logging.getLogger()
+    root.handlers = []
+    return root
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request caller-side cost of logging, synchronous vs queued")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--write-delay-us", type=float, default=50, help="Simulated cost of one stdout write")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="LOG_INFO_SAMPLE_RATE for the sampled run")
+    args = parser.parse_args()
+    delay = args.write_delay_us / 1e6
+    logger = logging.getLogger("bench")
+
+    root = reset_root()
+    root.setLevel(logging.INFO)
+    handler = logging.StreamHandler(SlowStream(delay))
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(RequestContextFilter(1.0))
+    root.addHandler(handler)
+    bench("synchronous JSON", logger, args.requests)
+
+    from app.core import logs
+    from app.core.config import settings
+    for label, rate in (("queued JSON", 1.0), (f"queued JSON, sampled {args.sample_rate}", args.sample_rate)):
+        reset_root()
+        settings.LOG_INFO_SAMPLE_RATE = rate
+        settings.LOG_QUEUE_SIZE = args.requests * 2
+        setup_logging(SlowStream(delay))
+        bench(label, logger, args.requests)
+        start = time.perf_counter()
+        shutdown_logging()
+        stats = logs.logging_stats()
+        print(f"  listener drained in {time.perf_counter() - start:.2f}s, {stats}")
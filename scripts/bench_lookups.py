@@ -0,0 +1,86 @@
+import argparse
+import sys
+import os
+import time
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.core import lookups
+from app.models.user import User
+from app.models.project import Project, GlobalAccess, Language, GlobalRole
+import app.models.keyword, app.models.token, app.models.maintenance  # noqa: F401
+
+# Python-side cost per lookup against an in-memory SQLite database, where the
+# query itself is a few microseconds, so the numbers are dominated by
+# statement construction, compilation-cache lookups and result loading.
+
+def setup(rows: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "hashed_password": "x",
+             "is_active": True, "is_verified": True, "token_version": 0}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Project.__table__), [
+            {"id": i, "name": f"Project {i}", "owner_id": i, "language": Language.ENGLISH}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(GlobalAccess.__table__), [
+            {"owner_id": i, "user_id": i % rows + 1, "role": GlobalRole.STANDARD}
+            for i in range(1, rows + 1)
+        ])
+    return sessionmaker(bind=engine)()
+
+def bench(label, fn, iterations, rows):
+    for i in range(100):
+        fn(i % rows + 1)
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i % rows + 1)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-lookup overhead: ORM query vs Core select vs cached lambda statement")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=1_000)
+    args = parser.parse_args()
+    db = setup(args.rows)
+    users = User.__table__
+    projects = Project.__table__
+    grants = GlobalAccess.__table__
+
+    cases = [
+        ("user by id", (
+            lambda i: db.query(User).filter(User.id == i).first(),
+            lambda i: db.execute(select(users).where(users.c.id == i)).first(),
+            lambda i: lookups.get_user_by_id(db, i),
+        )),
+        ("user by email", (
+            lambda i: db.query(User).filter(User.email == f"user{i}@example.com").first(),
+            lambda i: db.execute(select(users).where(users.c.email == f"user{i}@example.com")).first(),
+            lambda i: lookups.get_user_by_email(db, f"user{i}@example.com"),
+        )),
+        ("project by id+owner", (
+            lambda i: db.query(Project).filter(Project.id == i, Project.owner_id == i).first(),
+            lambda i: db.execute(select(projects).where(projects.c.id == i, projects.c.owner_id == i)).first(),
+            lambda i: lookups.get_owned_project(db, i, i),
+        )),
+        ("grant by owner+user", (
+            lambda i: db.query(GlobalAccess).filter(GlobalAccess.owner_id == i, GlobalAccess.user_id == i % args.rows + 1).first(),
+            lambda i: db.execute(select(grants).where(grants.c.owner_id == i, grants.c.user_id == i % args.rows + 1)).first(),
+            lambda i: lookups.get_global_grant(db, i, i % args.rows + 1),
+        )),
+    ]
+    print(f"{'lookup':<22}{'ORM query':>12}{'Core select':>14}{'lambda_stmt':>14}")
+    for name, (orm, core, cached) in cases:
+        db.expunge_all()
+        results = [bench(label, fn, args.iterations, args.rows) for label, fn in (("orm", orm), ("core", core), ("lambda", cached))]
+        print(f"{name:<22}" + "".join(f"{us:>12.1f}us" for us in results))
+        db.expunge_all()
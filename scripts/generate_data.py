@@ -0,0 +1,245 @@
+import argparse
+import random
+import string
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import MetaData, Table, func, inspect, insert, select
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.project import Project, UserProject, GlobalAccess, Language, ProjectRole, GlobalRole
+from app.models.shard import ProjectDirectory
+
+# Synthetic data for performance work. Rows get explicit ids above the current
+# maximum, and every chunk draws from its own seeded generator, so the same
+# arguments produce the same rows no matter how chunks are scheduled.
+#
+# Keywords are written straight into keyword_projects without change log
+# entries; restart the app afterwards so the keyword index reloads.
+#
+# Everything is written to the primary. With several shards configured, run
+# scripts/rebalance_shards.py rebalance afterwards to move owners to their shards.
+
+NOW = datetime(2024, 1, 1)
+
+def chunk_rng(seed: int, phase: str, chunk: int) -> random.Random:
+    return random.Random(f"{seed}:{phase}:{chunk}")
+
+def chunks(start: int, stop: int, size: int):
+    for chunk_start in range(start, stop, size):
+        yield chunk_start, min(chunk_start + size, stop)
+
+def next_id(conn, table) -> int:
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+def timestamp(rng: random.Random) -> datetime:
+    return NOW - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.users = User.__table__
+        self.projects = Project.__table__
+        self.user_projects = UserProject.__table__
+        self.global_accesses = GlobalAccess.__table__
+        self.project_directory = ProjectDirectory.__table__
+        self.keyword_projects = None
+        if inspect(engine).has_table("keyword_projects"):
+            self.keyword_projects = Table("keyword_projects", MetaData(), autoload_with=engine)
+        # One bcrypt hash shared by every synthetic user
+        self.hashed_password = get_password_hash(args.password)
+        vocabulary_rng = random.Random(f"{args.seed}:vocabulary")
+        self.vocabulary = sorted({
+            "".join(vocabulary_rng.choices(string.ascii_lowercase, k=vocabulary_rng.randint(4, 12)))
+            for _ in range(args.vocabulary)
+        })
+
+    def plan(self):
+        """Decide how many projects each owner gets (Pareto-tailed)."""
+        with engine.connect() as conn:
+            self.first_user_id = next_id(conn, self.users)
+            # Project ids come from the directory, which may be ahead of projects
+            self.first_project_id = max(next_id(conn, self.projects), next_id(conn, self.project_directory))
+        rng = random.Random(f"{self.args.seed}:plan")
+        self.projects_per_user = [
+            min(self.args.max_projects, int(rng.paretovariate(self.args.project_alpha)) - 1)
+            for _ in range(self.args.users)
+        ]
+        # project_offsets[i] = index of user i's first project
+        self.project_offsets = [0] + list(accumulate(self.projects_per_user))
+        self.total_projects = self.project_offsets[-1]
+
+    def user_rows(self, start: int, stop: int):
+        rng = chunk_rng(self.args.seed, "users", start)
+        for i in range(start, stop):
+            user_id = self.first_user_id + i
+            created_at = timestamp(rng)
+            verified = rng.random() > 0.1
+            yield {
+                "id": user_id,
+                "name": f"Synthetic User {user_id}",
+                "email": f"user{user_id}@{self.args.email_domain}",
+                "hashed_password": self.hashed_password,
+                "is_active": rng.random() > 0.02,
+                "is_verified": verified,
+                "verified_at": created_at if verified else None,
+                "token_version": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def project_rows(self, start: int, stop: int):
+        rng = chunk_rng(self.args.seed, "projects", start)
+        for i in range(start, stop):
+            owner_id = self.first_user_id + i
+            for n in range(self.projects_per_user[i]):
+                created_at = timestamp(rng)
+                yield {
+                    "id": self.first_project_id + self.project_offsets[i] + n,
+                    "name": f"Project {owner_id}-{n}",
+                    "owner_id": owner_id,
+                    "language": rng.choice((Language.ENGLISH, Language.INDONESIA)),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+
+    def directory_rows(self, start: int, stop: int):
+        for row in self.project_rows(start, stop):
+            yield {"id": row["id"], "owner_id": row["owner_id"], "created_at": row["created_at"]}
+
+    def global_access_rows(self, start: int, stop: int):
+        rng = chunk_rng(self.args.seed, "global_accesses", start)
+        for i in range(start, stop):
+            if not self.projects_per_user[i]:
+                continue
+            owner_id = self.first_user_id + i
+            grants = min(self.args.users - 1, int(rng.expovariate(1 / self.args.global_grants)))
+            for user_id in self._sample_users(rng, grants, exclude=owner_id):
+                yield {
+                    "owner_id": owner_id,
+                    "user_id": user_id,
+                    "role": rng.choice(list(GlobalRole)),
+                    "created_at": NOW,
+                    "updated_at": NOW,
+                }
+
+    def project_access_rows(self, start: int, stop: int):
+        rng = chunk_rng(self.args.seed, "user_projects", start)
+        for i in range(start, stop):
+            owner_id = self.first_user_id + i
+            for n in range(self.projects_per_user[i]):
+                project_id = self.first_project_id + self.project_offsets[i] + n
+                grants = min(self.args.users - 1, int(rng.expovariate(1 / self.args.project_grants)))
+                for user_id in self._sample_users(rng, grants, exclude=owner_id):
+                    yield {
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "role": rng.choice(list(ProjectRole)),
+                        "created_at": NOW,
+                        "updated_at": NOW,
+                    }
+
+    def keyword_rows(self, start: int, stop: int):
+        rng = chunk_rng(self.args.seed, "keywords", start)
+        vocabulary = self.vocabulary
+        for i in range(start, stop):
+            owner_id = self.first_user_id + i
+            for n in range(self.projects_per_user[i]):
+                project_id = self.first_project_id + self.project_offsets[i] + n
+                project_name = f"Project {owner_id}-{n}"
+                count = min(len(vocabulary), int(rng.lognormvariate(0, 0.75) * self.args.keywords))
+                keywords = set()
+                while len(keywords) < count:
+                    # Squaring a uniform sample skews towards the head of the vocabulary
+                    keywords.add(vocabulary[int(len(vocabulary) * rng.random() ** 2)])
+                for keyword in sorted(keywords):
+                    yield {
+                        "project_id": project_id,
+                        "owner_id": owner_id,
+                        "relevan_keyword": keyword,
+                        "project_name": project_name,
+                        "created_at": NOW,
+                    }
+
+    def _sample_users(self, rng: random.Random, count: int, exclude: int):
+        picked = set()
+        while len(picked) < count:
+            user_id = self.first_user_id + rng.randrange(self.args.users)
+            if user_id != exclude:
+                picked.add(user_id)
+        return sorted(picked)
+
+    def write(self, table, make_rows) -> int:
+        """Insert the rows of every user chunk, ``--workers`` chunks at a time."""
+        def write_chunk(bounds):
+            written = 0
+            batch = []
+            with engine.begin() as conn:
+                for row in make_rows(*bounds):
+                    batch.append(row)
+                    if len(batch) >= self.args.batch_size:
+                        conn.execute(insert(table), batch)
+                        written += len(batch)
+                        batch = []
+                if batch:
+                    conn.execute(insert(table), batch)
+                    written += len(batch)
+            return written
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.workers) as pool:
+            written = sum(pool.map(write_chunk, chunks(0, self.args.users, self.args.chunk_users)))
+        seconds = time.perf_counter() - start
+        print(f"{table.name}: {written:,} rows in {seconds:.1f}s ({written / max(seconds, 1e-9):,.0f} rows/s)")
+        return written
+
+    def run(self) -> int:
+        self.plan()
+        print(
+            f"Generating {self.args.users:,} users and {self.total_projects:,} projects "
+            f"(user ids from {self.first_user_id}, project ids from {self.first_project_id})"
+        )
+        total = self.write(self.users, self.user_rows)
+        total += self.write(self.project_directory, self.directory_rows)
+        total += self.write(self.projects, self.project_rows)
+        total += self.write(self.global_accesses, self.global_access_rows)
+        total += self.write(self.user_projects, self.project_access_rows)
+        if self.keyword_projects is not None:
+            total += self.write(self.keyword_projects, self.keyword_rows)
+        else:
+            print("keyword_projects table not found, skipping keywords")
+        return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load deterministic synthetic users, projects, grants and keywords")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--project-alpha", type=float, default=1.2, help="Pareto shape of projects per owner; lower means a longer tail")
+    parser.add_argument("--max-projects", type=int, default=500)
+    parser.add_argument("--keywords", type=int, default=1_000, help="Median keywords per project")
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--global-grants", type=float, default=5, help="Mean global grants per project owner")
+    parser.add_argument("--project-grants", type=float, default=3, help="Mean individual grants per project")
+    parser.add_argument("--password", default="password123", help="Password of every synthetic user")
+    parser.add_argument("--email-domain", default="synthetic.example")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-users", type=int, default=500, help="Users per parallel chunk")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per multi-row INSERT")
+    args = parser.parse_args()
+
+    if engine.dialect.name == "sqlite" and args.workers > 1:
+        # SQLite has a single writer; parallel chunks would only contend for the lock
+        print("SQLite allows one writer at a time, using --workers 1")
+        args.workers = 1
+
+    start = time.perf_counter()
+    rows = Generator(args).run()
+    print(f"Done: {rows:,} rows in {time.perf_counter() - start:.1f}s")
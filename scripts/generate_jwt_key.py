@@ -0,0 +1,39 @@
+import argparse
+import os
+from datetime import datetime
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+def generate_key(algorithm: str):
+    if algorithm.startswith("RS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+    return ec.generate_private_key(curves[algorithm])
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key for the keyring in JWT_KEYS_DIR")
+    parser.add_argument("keys_dir")
+    parser.add_argument("--algorithm", default="RS256", choices=["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"])
+    parser.add_argument("--kid", default=None, help="Key id, defaults to a timestamp so newer keys sort last")
+    args = parser.parse_args()
+
+    kid = args.kid or datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    path = os.path.join(args.keys_dir, f"{kid}.pem")
+    if os.path.exists(path):
+        raise SystemExit(f"{path} already exists")
+
+    key = generate_key(args.algorithm)
+    os.makedirs(args.keys_dir, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    os.chmod(path, 0o600)
+    print(f"Wrote {path}")
+    print("Rotation: deploy with the new key present, then set JWT_ACTIVE_KID to it (or let it sort last).")
+    print("Keep retired keys until tokens signed with them expire; they can be reduced to public keys.")
+
+if __name__ == "__main__":
+    main()
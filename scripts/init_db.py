@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
+import logging
 import sys
 import os
 
@@ -8,16 +9,22 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.config import settings
-from app.core.security import get_password_hash, generate_verification_token
+from app.core.security import get_password_hash, issue_one_time_token
 from app.models.user import Base, User
 from app.models.project import Project, UserProject, GlobalAccess, Language, ProjectRole, GlobalRole
+from app.models.keyword import KeywordChange
+from app.models.token import OneTimeToken, OneTimeTokenPurpose
+from app.models.maintenance import MaintenanceLease
+from app.migrations.runner import run_migrations
+from app.core.sharding import create_shard_schemas, shard_router
 
 def init_db():
     # Create database engine
     engine = create_engine(settings.DATABASE_URL)
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create tables and indexes through the versioned migrations
+    run_migrations(engine)
+    create_shard_schemas()
     
     # Create a session
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -44,8 +51,7 @@ def init_db():
                 "email": "user@example.com",
                 "password": "user123",
                 "is_active": True,
-                "is_verified": False,
-                "verification_token": generate_verification_token()
+                "is_verified": False
             },
             {
                 "name": "Inactive User",
@@ -64,7 +70,7 @@ def init_db():
                 hashed_password=get_password_hash(user_data["password"]),
                 is_active=user_data["is_active"],
                 is_verified=user_data["is_verified"],
-                verification_token=user_data.get("verification_token"),
+                verified_at=datetime.utcnow() if user_data["is_verified"] else None,
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
@@ -75,6 +81,12 @@ def init_db():
         # Create test projects for admin user
         admin_user = db.query(User).filter(User.email == "admin@example.com").first()
         regular_user = db.query(User).filter(User.email == "user@example.com").first()
+
+        # Pending email verification for the regular user
+        issue_one_time_token(db, regular_user.id, OneTimeTokenPurpose.EMAIL_VERIFICATION, timedelta(hours=24))
+        # Commit before allocating project ids: the allocator writes on a
+        # connection of its own, which SQLite would block behind this write
+        db.commit()
         
         test_projects = [
             {
@@ -94,9 +106,11 @@ def init_db():
             }
         ]
         
-        # Add projects to database
+        # Add projects to database (on the primary; with several shards, run
+        # scripts/rebalance_shards.py rebalance afterwards)
         for project_data in test_projects:
             project = Project(
+                id=shard_router.allocate_project_ids(project_data["owner"].id, 1)[0],
                 name=project_data["name"],
                 owner_id=project_data["owner"].id,
                 language=project_data["language"],
@@ -136,6 +150,7 @@ def init_db():
         db.close()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("Initializing database...")
     init_db()
     print("Database initialization completed.")
@@ -0,0 +1,30 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.migrations.runner import MIGRATIONS, applied_versions, run_migrations
+from app.core.sharding import create_shard_schemas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they are applied")
+    args = parser.parse_args()
+    # The runner reports each migration it applies through its logger
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.status:
+        applied = set(applied_versions(engine))
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:04d} {name}: {'applied' if version in applied else 'pending'}")
+    else:
+        ran = run_migrations(engine)
+        print(f"{len(ran)} migration(s) applied." if ran else "Schema is up to date.")
+        # Shards other than the primary hold only the sharded tables, created from the current models
+        shards = create_shard_schemas()
+        if shards:
+            print(f"Sharded tables checked on {shards} shard(s).")
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+from app.core.database import engine, SessionLocal
+from app.core.security import hash_one_time_token
+from app.models.user import User
+from app.models.token import OneTimeToken, OneTimeTokenPurpose
+
+def migrate_one_time_tokens(batch_size: int = 1000):
+    """Move tokens from the legacy users columns into one_time_tokens.
+
+    Outstanding verification links keep working for another 24 hours and
+    reset links until their original expiry. The legacy columns are cleared.
+    """
+    OneTimeToken.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    migrated = 0
+    try:
+        while True:
+            users = db.execute(
+                select(User.id, User.verification_token, User.reset_password_token, User.reset_token_expires)
+                .where((User.verification_token.isnot(None)) | (User.reset_password_token.isnot(None)))
+                .limit(batch_size)
+            ).fetchall()
+            if not users:
+                break
+
+            now = datetime.utcnow()
+            for user in users:
+                if user.verification_token:
+                    db.add(OneTimeToken(
+                        user_id=user.id,
+                        purpose=OneTimeTokenPurpose.EMAIL_VERIFICATION,
+                        token_hash=hash_one_time_token(user.verification_token),
+                        expires_at=now + timedelta(hours=24)
+                    ))
+                if user.reset_password_token and user.reset_token_expires and user.reset_token_expires > now:
+                    db.add(OneTimeToken(
+                        user_id=user.id,
+                        purpose=OneTimeTokenPurpose.PASSWORD_RESET,
+                        token_hash=hash_one_time_token(user.reset_password_token),
+                        expires_at=user.reset_token_expires
+                    ))
+
+            db.execute(
+                update(User)
+                .where(User.id.in_([user.id for user in users]))
+                .values(verification_token=None, reset_password_token=None, reset_token_expires=None)
+            )
+            db.commit()
+            migrated += len(users)
+            print(f"Migrated tokens of {migrated} users")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Migrating one-time tokens...")
+    migrate_one_time_tokens()
+    print("One-time token migration completed.")
@@ -0,0 +1,195 @@
+import argparse
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select, union
+from app.core.config import settings
+from app.core.database import engine, shard_engines
+from app.core.sharding import shard_metadata
+from app.models.user import User  # noqa: F401 (the project models' relationships need it)
+from app.models.shard import ShardOverride
+
+# Moves owners between shards. Run it with the same DATABASE_URL and
+# DATABASE_SHARD_URLS as the app, one run at a time.
+#
+#   status                     owners and projects per shard, misplaced owners
+#   pin                        before changing the shard list: run with the new
+#                              list, before the app gets it, to keep every owner
+#                              where it is
+#   move --owner ID --to N     move one owner (a hot spot) and pin it there
+#   rebalance [--unpin]        move owners whose rows are not on their assigned
+#                              shard there (e.g. after bulk loads into the primary)
+#                              and finish interrupted moves; --unpin also moves
+#                              pinned owners back to owner_id % shards
+#
+# A move marks the owner as moving (the app answers its writes with 503),
+# waits for every worker to notice, copies the owner's rows in one target
+# transaction, switches the placement, waits again and deletes the source
+# rows. Keyword change log entries stay on the source shard as history.
+
+def owners_by_shard(tables):
+    located = {}
+    for shard, shard_engine in enumerate(shard_engines):
+        with shard_engine.connect() as conn:
+            for (owner_id,) in conn.execute(union(
+                select(tables["projects"].c.owner_id),
+                select(tables["global_accesses"].c.owner_id)
+            )):
+                located.setdefault(owner_id, set()).add(shard)
+    return located
+
+def load_overrides():
+    """owner id -> (shard, moving)"""
+    with engine.connect() as conn:
+        return {row.owner_id: (row.shard, row.moving) for row in conn.execute(select(ShardOverride))}
+
+def default_shard(owner_id: int) -> int:
+    return owner_id % len(shard_engines)
+
+def set_placement(owner_id: int, shard: int, moving: bool = False) -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(ShardOverride).where(ShardOverride.owner_id == owner_id))
+        if moving or shard != default_shard(owner_id):
+            conn.execute(insert(ShardOverride).values(
+                owner_id=owner_id, shard=shard, moving=moving, updated_at=datetime.utcnow()
+            ))
+
+def owner_rows(tables, owner_id: int):
+    """(table, where clause) pairs covering everything an owner has on a shard."""
+    projects = tables["projects"]
+    project_ids = select(projects.c.id).where(projects.c.owner_id == owner_id).scalar_subquery()
+    pairs = [
+        (projects, projects.c.owner_id == owner_id),
+        (tables["user_projects"], tables["user_projects"].c.project_id.in_(project_ids)),
+        (tables["global_accesses"], tables["global_accesses"].c.owner_id == owner_id),
+        (tables["owner_versions"], tables["owner_versions"].c.owner_id == owner_id),
+    ]
+    if "keyword_projects" in tables:
+        pairs.append((tables["keyword_projects"], tables["keyword_projects"].c.owner_id == owner_id))
+    return pairs
+
+def delete_owner(tables, owner_id: int, shard: int) -> None:
+    with shard_engines[shard].begin() as conn:
+        # Children first
+        for table, condition in reversed(owner_rows(tables, owner_id)):
+            conn.execute(delete(table).where(condition))
+
+def move_owner(tables, owner_id: int, source: int, target: int, settle: float, batch_size: int) -> int:
+    print(f"owner {owner_id}: shard {source} -> {target}")
+    set_placement(owner_id, source, moving=True)
+    time.sleep(settle)
+
+    copied = 0
+    with shard_engines[source].connect() as src, shard_engines[target].begin() as dst:
+        # Clear what an interrupted earlier attempt left
+        for table, condition in reversed(owner_rows(tables, owner_id)):
+            dst.execute(delete(table).where(condition))
+        for table, condition in owner_rows(tables, owner_id):
+            # Project ids are global; other ids are per shard, so the target assigns new ones
+            columns = [c for c in table.c if table.name == "projects" or c.name != "id"]
+            result = src.execution_options(stream_results=True).execute(select(*columns).where(condition))
+            for rows in result.partitions(batch_size):
+                dst.execute(insert(table), [row._asdict() for row in rows])
+                copied += len(rows)
+
+    set_placement(owner_id, target)
+    time.sleep(settle)
+    delete_owner(tables, owner_id, source)
+    print(f"owner {owner_id}: {copied} rows moved")
+    return copied
+
+def status(tables) -> None:
+    located = owners_by_shard(tables)
+    overrides = load_overrides()
+    for shard, shard_engine in enumerate(shard_engines):
+        with shard_engine.connect() as conn:
+            projects = conn.execute(select(tables["projects"].c.id)).fetchall()
+        owners = sum(1 for shards in located.values() if shard in shards)
+        print(f"shard {shard}: {owners} owners, {len(projects)} projects")
+    misplaced = [o for o, shards in located.items() if shards != {overrides.get(o, (default_shard(o),))[0]}]
+    print(f"{len(overrides)} pinned owners, {len(misplaced)} owners not on their assigned shard")
+
+def pin(tables) -> None:
+    located = owners_by_shard(tables)
+    pinned = 0
+    for owner_id, shards in sorted(located.items()):
+        if len(shards) > 1:
+            print(f"owner {owner_id} is on shards {sorted(shards)}; finish its move first")
+            continue
+        (shard,) = shards
+        if shard != default_shard(owner_id):
+            set_placement(owner_id, shard)
+            pinned += 1
+    print(f"{pinned} owners pinned")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and rebalance owner shards")
+    parser.add_argument("command", choices=["status", "pin", "move", "rebalance"])
+    parser.add_argument("--owner", type=int, help="Owner to move (move)")
+    parser.add_argument("--to", type=int, help="Target shard (move)")
+    parser.add_argument("--limit", type=int, default=None, help="Owners to move at most (rebalance)")
+    parser.add_argument("--unpin", action="store_true", help="Also move pinned owners to their default shard (rebalance)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the moves (rebalance)")
+    parser.add_argument(
+        "--settle", type=float, default=settings.SHARD_PLACEMENT_REFRESH_SECONDS + 2,
+        help="Seconds to wait for workers to pick up a placement change"
+    )
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per multi-row INSERT")
+    args = parser.parse_args()
+
+    tables = shard_metadata().tables
+    if args.command == "status":
+        status(tables)
+    elif args.command == "pin":
+        pin(tables)
+    elif args.command == "move":
+        if args.owner is None or args.to is None or not 0 <= args.to < len(shard_engines):
+            parser.error(f"move needs --owner and --to between 0 and {len(shard_engines) - 1}")
+        shards = owners_by_shard(tables).get(args.owner, set())
+        if len(shards) != 1:
+            print(f"owner {args.owner} has rows on shards {sorted(shards)}; run rebalance first")
+            sys.exit(1)
+        (source,) = shards
+        if source == args.to:
+            set_placement(args.owner, args.to)
+            print(f"owner {args.owner} is already on shard {args.to}")
+        else:
+            move_owner(tables, args.owner, source, args.to, args.settle, args.batch_size)
+    else:
+        overrides = load_overrides()
+        moved = 0
+        for owner_id, shards in sorted(owners_by_shard(tables).items()):
+            if args.limit is not None and moved >= args.limit:
+                break
+            assigned, moving = overrides.get(owner_id, (default_shard(owner_id), False))
+            target = default_shard(owner_id) if args.unpin and not moving else assigned
+            if shards == {assigned} and target == assigned and not moving:
+                continue
+            if assigned in shards and len(shards) > 1:
+                # An interrupted move. Copies are atomic, so the assigned shard
+                # has the complete rows; the others hold leftovers.
+                print(f"owner {owner_id}: removing leftovers from shards {sorted(shards - {assigned})}")
+                if not args.dry_run:
+                    for shard in shards - {assigned}:
+                        delete_owner(tables, owner_id, shard)
+                    set_placement(owner_id, assigned)
+                shards = {assigned}
+            if len(shards) > 1:
+                print(f"owner {owner_id} has rows on shards {sorted(shards)}, none assigned; resolve by hand")
+                continue
+            (source,) = shards
+            if source == target:
+                if moving and not args.dry_run:
+                    set_placement(owner_id, target)
+                continue
+            moved += 1
+            if args.dry_run:
+                print(f"owner {owner_id}: shard {source} -> {target}")
+            else:
+                move_owner(tables, owner_id, source, target, args.settle, args.batch_size)
+        print(f"{moved} owners {'to move' if args.dry_run else 'moved'}")
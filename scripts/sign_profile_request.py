@@ -0,0 +1,23 @@
+import argparse
+import sys
+import os
+import time
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.profiler import sign_profile_request
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sign a profile token for one request (send it as X-Profile-Token or ?profile_token=)"
+    )
+    parser.add_argument("method", help="HTTP method, e.g. GET")
+    parser.add_argument("path", help="Request path without query string, e.g. /api/v1/project/projects")
+    parser.add_argument("--ttl", type=int, default=300, help="Seconds the token stays valid")
+    parser.add_argument("--secret", default=None, help="Defaults to PROFILER_SECRET")
+    args = parser.parse_args()
+    secret = args.secret if args.secret is not None else os.getenv("PROFILER_SECRET", "")
+    if not secret:
+        sys.exit("PROFILER_SECRET is not set")
+    print(sign_profile_request(args.method, args.path, int(time.time()) + args.ttl, secret))
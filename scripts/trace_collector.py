@@ -0,0 +1,46 @@
+import argparse
+import json
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stand-in for a trace collector: point TRACE_EXPORT_URL at it. It appends
+# received spans to a JSON lines file and prints, per finished request, where
+# the time went.
+
+spans_by_trace = defaultdict(list)
+
+def summarize(trace):
+    root = next(s for s in trace if s["parent_span_id"] is None or s["name"].startswith("HTTP "))
+    totals = defaultdict(lambda: [0, 0.0])
+    for span in trace:
+        if span is not root:
+            totals[span["name"]][0] += 1
+            totals[span["name"]][1] += span["duration_ms"]
+    breakdown = ", ".join(f"{name} x{count} {ms:.1f}ms" for name, (count, ms) in sorted(totals.items(), key=lambda t: -t[1][1]))
+    print(f"{root['trace_id']} {root['name']} {root['duration_ms']:.1f}ms [{breakdown}]", flush=True)
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    output = None
+
+    def do_POST(self):
+        spans = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with open(self.output, "a") as f:
+            f.writelines(json.dumps(span) + "\n" for span in spans)
+        for span in spans:
+            spans_by_trace[span["trace_id"]].append(span)
+            if span["name"].startswith("HTTP "):
+                summarize(spans_by_trace.pop(span["trace_id"]))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receive exported spans and print a per-request breakdown")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="spans.jsonl")
+    args = parser.parse_args()
+    CollectorHandler.output = args.output
+    print(f"Collecting spans on http://localhost:{args.port}/ into {args.output}")
+    ThreadingHTTPServer(("", args.port), CollectorHandler).serve_forever()
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+import uuid
+import pytest
+
+# Add the parent directory to Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read once at import, so the environment has to be in place first
+DATA_DIR = tempfile.mkdtemp(prefix="tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{DATA_DIR}/primary.db",
+    DATABASE_SHARD_URLS="",
+    DATABASE_REPLICA_URLS="",
+    BCRYPT_ROUNDS="4",
+    WARMUP_ENABLED="false",
+    MAINTENANCE_ENABLED="false",
+    LOG_ACCESS="false",
+    LOG_LEVEL="WARNING",
+    SERVICE_API_KEYS="old-service-key,test-service-key",
+    EMAIL_SENDER="",
+)
+
+from sqlalchemy import text
+from app.core.database import engine
+from app.migrations.runner import run_migrations
+from app.core.sharding import create_shard_schemas
+
+# keyword_projects predates the models and migrations; create it the way production has it
+KEYWORD_PROJECTS_DDL = """
+    CREATE TABLE keyword_projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INT,
+        owner_id INT,
+        relevan_keyword VARCHAR(255),
+        project_name VARCHAR(255),
+        created_at DATETIME
+    )
+"""
+
+with engine.begin() as conn:
+    conn.execute(text(KEYWORD_PROJECTS_DDL))
+run_migrations(engine)
+create_shard_schemas()
+
+PASSWORD = "password123"
+SERVICE_KEY = "test-service-key"
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def service_headers():
+    return {"X-Service-Key": SERVICE_KEY}
+
+@pytest.fixture
+def register(client):
+    """Register a verified user and return ``(email, headers)`` with a bearer token for it."""
+    def register(name: str = "user"):
+        email = f"{name}-{uuid.uuid4().hex[:8]}@example.com"
+        response = client.post("/api/v1/auth/register", json={"email": email, "name": name, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE users SET is_verified = 1, verified_at = CURRENT_TIMESTAMP WHERE email = :email"),
+                {"email": email}
+            )
+        response = client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return email, {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return register
@@ -0,0 +1,76 @@
+import asyncio
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from tests.conftest import PASSWORD
+
+def _onboard(client, headers, key, name="Idempotent"):
+    return client.post(
+        "/api/v1/project/onboarding",
+        json={"projects": [name], "language": "english"},
+        headers={**headers, "Idempotency-Key": key}
+    )
+
+def test_retry_replays_the_first_response(client, register):
+    _, headers = register("idem")
+    first = _onboard(client, headers, "retry")
+    assert first.status_code == 200, first.text
+
+    retry = _onboard(client, headers, "retry")
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+def test_revoked_token_gets_no_replay(client, register, monkeypatch):
+    # Tokens carry the token_version they were issued at only in stateless mode
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    _, headers = register("idem")
+    assert _onboard(client, headers, "revoked").status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/change-password",
+        json={"current_password": PASSWORD, "new_password": "another-password"},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    retry = _onboard(client, headers, "revoked")
+    assert retry.status_code == 401
+    assert "idempotent-replayed" not in retry.headers
+
+def test_deactivated_user_gets_no_replay(client, register):
+    email, headers = register("idem")
+    assert _onboard(client, headers, "inactive").status_code == 200
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE users SET is_active = 0 WHERE email = :email"), {"email": email})
+
+    retry = _onboard(client, headers, "inactive")
+    assert retry.status_code == 400
+    assert "idempotent-replayed" not in retry.headers
+
+def test_keys_are_scoped_to_the_caller(client, register):
+    _, first = register("idem")
+    _, second = register("idem")
+    assert _onboard(client, first, "shared", "Mine").status_code == 200
+
+    response = _onboard(client, second, "shared", "Mine")
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+def test_authentication_runs_off_the_event_loop(client, register, monkeypatch):
+    from app.core import idempotency
+    _, headers = register("idem")
+    on_loop = []
+
+    def authenticate(db, token):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return real_authenticate(db, token)
+
+    real_authenticate = idempotency.authenticate
+    monkeypatch.setattr(idempotency, "authenticate", authenticate)
+    assert _onboard(client, headers, "threaded").status_code == 200
+    assert on_loop == [False]
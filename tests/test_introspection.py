@@ -0,0 +1,26 @@
+from tests.conftest import PASSWORD
+
+def _login(client, email):
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_introspection_requires_a_service_key(client, register):
+    email, headers = register("introspect")
+    token = headers["Authorization"].split()[1]
+    assert client.post("/api/v1/auth/introspect", json={"tokens": [token]}).status_code == 403
+    assert client.post("/api/v1/auth/introspect", json={"tokens": [token]}, headers=headers).status_code == 403
+
+def test_only_access_tokens_are_active(client, register, service_headers):
+    email, _ = register("introspect")
+    tokens = _login(client, email)
+    response = client.post(
+        "/api/v1/auth/introspect",
+        json={"tokens": [tokens["access_token"], tokens["refresh_token"], "not-a-token"]},
+        headers=service_headers
+    )
+    assert response.status_code == 200
+    access, refresh, garbage = response.json()["results"]
+    assert access["active"] is True and access["token_type"] == "access"
+    assert refresh == {"active": False, "sub": None, "exp": None, "token_type": None, "is_active": None}
+    assert garbage["active"] is False
@@ -0,0 +1,94 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from app.core.database import SessionLocal, run_after_commit
+from app.core.keywords import _record_changes
+from app.models.keyword import KeywordChange, KeywordChangeOp
+
+def _stage(db, project_id, *keywords):
+    _record_changes(db, project_id, 1, list(keywords), KeywordChangeOp.ADD, datetime.utcnow())
+
+def _feed(client, headers, since, limit=1000):
+    response = client.get("/api/v1/project/keywords/changes", params={"since": since, "limit": limit}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _last_id():
+    with SessionLocal() as db:
+        return db.execute(select(func.coalesce(func.max(KeywordChange.id), 0))).scalar()
+
+def test_feed_requires_a_service_key(client, register, service_headers):
+    _, user_headers = register("feed")
+    assert client.get("/api/v1/project/keywords/changes").status_code == 403
+    assert client.get("/api/v1/project/keywords/changes", headers=user_headers).status_code == 403
+    assert client.get("/api/v1/project/keywords/changes", headers={"X-Service-Key": "wrong"}).status_code == 403
+    assert client.get("/api/v1/project/keywords/changes", headers=service_headers).status_code == 200
+    # Every configured key is accepted, so keys can be rotated
+    assert client.get("/api/v1/project/keywords/changes", headers={"X-Service-Key": "old-service-key"}).status_code == 200
+
+def test_ids_follow_commit_order_so_a_cursor_never_skips(client, service_headers):
+    cursor = _last_id()
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # ``first`` starts writing before ``second`` but commits after it
+        _stage(first, 101, "slow-a", "slow-b")
+        _stage(second, 102, "fast")
+        second.commit()
+
+        page = _feed(client, service_headers, cursor)
+        assert [c["keyword"] for c in page["changes"]] == ["fast"]
+        cursor = page["next_cursor"]
+
+        first.commit()
+        page = _feed(client, service_headers, cursor)
+        assert [c["keyword"] for c in page["changes"]] == ["slow-a", "slow-b"]
+        assert all(c["id"] > cursor for c in page["changes"])
+    finally:
+        first.close()
+        second.close()
+
+def test_paging_with_the_cursor(client, service_headers):
+    cursor = start = _last_id()
+    with SessionLocal() as db:
+        for i in range(5):
+            _stage(db, 200 + i, f"page-{i}")
+            db.commit()
+
+    seen = []
+    while True:
+        page = _feed(client, service_headers, cursor, limit=2)
+        seen.extend(page["changes"])
+        assert page["next_cursor"] == (page["changes"][-1]["id"] if page["changes"] else cursor)
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    assert [c["keyword"] for c in seen] == [f"page-{i}" for i in range(5)]
+    assert [c["id"] for c in seen] == list(range(start + 1, start + 6))
+    assert _feed(client, service_headers, cursor)["changes"] == []
+
+def test_rolled_back_changes_are_not_logged():
+    start = _last_id()
+    with SessionLocal() as db:
+        _stage(db, 300, "rolled-back")
+        db.rollback()
+        _stage(db, 301, "kept")
+        db.commit()
+        keywords = db.execute(select(KeywordChange.keyword).where(KeywordChange.id > start)).scalars().all()
+    assert keywords == ["kept"]
+
+def test_savepoint_rollback_keeps_the_outer_transaction_pending_work():
+    ran = []
+    start = _last_id()
+    with SessionLocal() as db:
+        run_after_commit(db, lambda: ran.append("callback"))
+        _stage(db, 400, "outer")
+        try:
+            with db.begin_nested():
+                raise ValueError
+        except ValueError:
+            pass
+        assert ran == []
+        db.commit()
+        keywords = db.execute(select(KeywordChange.keyword).where(KeywordChange.id > start)).scalars().all()
+    assert ran == ["callback"]
+    assert keywords == ["outer"]
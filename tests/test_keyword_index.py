@@ -0,0 +1,95 @@
+from datetime import datetime
+from app.core.database import SessionLocal
+from app.core.keyword_index import KeywordIndex, keyword_index
+from app.core.keywords import _record_changes, refresh_keyword_index
+from app.models.keyword import KeywordChange, KeywordChangeOp
+
+def test_add_is_idempotent_and_keeps_postings_sorted():
+    index = KeywordIndex()
+    index.add(5, ["alpha", "beta"])
+    index.add(2, ["alpha"])
+    index.add(5, ["alpha"])
+
+    assert index.lookup("alpha") == [2, 5]
+    assert index.lookup("beta") == [5]
+    assert index.lookup("gamma") == []
+    assert index.stats()["postings"] == 3
+
+def test_remove_drops_empty_terms():
+    index = KeywordIndex()
+    index.build([("alpha", 1), ("alpha", 2), ("beta", 1)])
+    index.remove(1, ["alpha", "beta", "missing"])
+    index.remove(3, ["alpha"])
+
+    assert index.lookup("alpha") == [2]
+    assert index.lookup("beta") == []
+    assert index.stats()["terms"] == 1
+    assert index.lookup_prefix("b") == ([], False)
+
+def test_lookup_prefix():
+    index = KeywordIndex()
+    index.build([("apple", 3), ("apricot", 1), ("banana", 2), ("ap", 4), ("apple", 1)])
+
+    assert index.lookup_prefix("ap") == ([1, 3, 4], False)
+    assert index.lookup_prefix("app") == ([1, 3], False)
+    assert index.lookup_prefix("c") == ([], False)
+
+def test_lookup_prefix_reports_truncation():
+    index = KeywordIndex()
+    index.build([("ab", 1), ("ac", 2), ("ad", 3)])
+
+    assert index.lookup_prefix("a", max_terms=2) == ([1, 2], True)
+    assert index.lookup_prefix("a", max_terms=3) == ([1, 2, 3], False)
+
+def test_apply_changes_advances_cursor_and_replays_harmlessly():
+    index = KeywordIndex()
+    changes = [
+        KeywordChange(id=1, project_id=7, owner_id=1, keyword="alpha", op=KeywordChangeOp.ADD),
+        KeywordChange(id=2, project_id=8, owner_id=1, keyword="alpha", op=KeywordChangeOp.ADD),
+        KeywordChange(id=3, project_id=7, owner_id=1, keyword="alpha", op=KeywordChangeOp.REMOVE),
+    ]
+    index.apply_changes(0, changes)
+    index.apply_changes(0, changes[2:])
+
+    assert index.lookup("alpha") == [8]
+    assert index.cursors == {0: 3}
+
+def test_refresh_applies_changes_written_by_other_workers(client):
+    # Another worker's write: the change log has it, this worker's index does not
+    db = SessionLocal()
+    try:
+        refresh_keyword_index(db)
+        now = datetime.utcnow()
+        _record_changes(db, 9001, 1, ["elsewhere"], KeywordChangeOp.ADD, now)
+        _record_changes(db, 9002, 1, ["elsewhere"], KeywordChangeOp.ADD, now)
+        _record_changes(db, 9001, 1, ["elsewhere"], KeywordChangeOp.REMOVE, now)
+        db.commit()
+        assert keyword_index.lookup("elsewhere") == []
+
+        assert refresh_keyword_index(db) == 3
+        assert keyword_index.lookup("elsewhere") == [9002]
+        assert refresh_keyword_index(db) == 0
+    finally:
+        db.close()
+
+def test_lookup_route_requires_a_service_key(client, register):
+    _, headers = register("lookup")
+    params = {"keyword": "anything"}
+    assert client.get("/api/v1/project/keywords/lookup", params=params).status_code == 403
+    assert client.get("/api/v1/project/keywords/lookup", params=params, headers=headers).status_code == 403
+
+def test_lookup_route_reports_truncation(client, register, service_headers, monkeypatch):
+    from app.core.config import settings
+    _, headers = register("lookup")
+    response = client.post(
+        "/api/v1/project/onboarding",
+        json={"projects": ["Truncation"], "language": "english", "keywords": ["trunc-one", "trunc-two"]},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    monkeypatch.setattr(settings, "KEYWORD_INDEX_MAX_PREFIX_TERMS", 1)
+    response = client.get("/api/v1/project/keywords/lookup", params={"keyword": "trunc-", "prefix": True}, headers=service_headers)
+    assert response.status_code == 200
+    assert response.json()["truncated"] is True
+    assert len(response.json()["project_ids"]) == 1
@@ -0,0 +1,113 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, text, update
+from app.core import maintenance
+from app.core.config import settings
+from app.core.database import SessionLocal, close_shard_sessions, engine
+from app.core.maintenance import purge_orphaned_keywords, purge_stale_unverified_accounts
+from app.models.user import User
+from tests.conftest import PASSWORD
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "MAINTENANCE_THROTTLE_SECONDS", 0)
+    monkeypatch.setattr(settings, "MAINTENANCE_MAX_BATCHES", 2)
+
+def _run(job, dry_run, batch_size=2):
+    with SessionLocal() as db:
+        try:
+            return job(db, batch_size, dry_run)
+        finally:
+            close_shard_sessions(db)
+
+def _add_orphaned_keywords(project_id, count):
+    with engine.begin() as conn:
+        for i in range(count):
+            conn.execute(
+                text("""
+                    INSERT INTO keyword_projects (project_id, owner_id, relevan_keyword, project_name, created_at)
+                    VALUES (:project_id, 1, :keyword, 'gone', :now)
+                """),
+                {"project_id": project_id, "keyword": f"orphan-{project_id}-{i}", "now": datetime.utcnow()}
+            )
+
+def _add_stale_user():
+    created_at = datetime.utcnow() - timedelta(days=settings.MAINTENANCE_UNVERIFIED_ACCOUNT_DAYS + 1)
+    with SessionLocal() as db:
+        user = User(
+            name="stale", email=f"stale-{uuid.uuid4().hex[:8]}@example.com", hashed_password="x",
+            is_verified=False, created_at=created_at
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+
+def _user_exists(user_id):
+    with SessionLocal() as db:
+        return db.execute(select(User.id).where(User.id == user_id)).first() is not None
+
+def test_orphaned_keywords_dry_run_counts_what_a_run_deletes():
+    _run(purge_orphaned_keywords, dry_run=False)
+    _add_orphaned_keywords(900001, 3)
+    _add_orphaned_keywords(900002, 1)
+
+    assert _run(purge_orphaned_keywords, dry_run=True) == 4
+    assert _run(purge_orphaned_keywords, dry_run=False) == 4
+    assert _run(purge_orphaned_keywords, dry_run=True) == 0
+
+def test_orphaned_keywords_dry_run_is_capped_like_a_run():
+    _run(purge_orphaned_keywords, dry_run=False)
+    # Five orphaned projects, but one run covers 2 batches of 1 project
+    for project_id in range(900011, 900016):
+        _add_orphaned_keywords(project_id, 2)
+
+    assert _run(purge_orphaned_keywords, dry_run=True, batch_size=1) == 4
+    assert _run(purge_orphaned_keywords, dry_run=False, batch_size=1) == 4
+    assert _run(purge_orphaned_keywords, dry_run=False) == 6
+
+def test_stale_accounts_dry_run_counts_what_a_run_deletes():
+    _run(purge_stale_unverified_accounts, dry_run=False)
+    user_ids = [_add_stale_user() for _ in range(5)]
+
+    assert _run(purge_stale_unverified_accounts, dry_run=True) == 4
+    assert _run(purge_stale_unverified_accounts, dry_run=False) == 4
+    assert _run(purge_stale_unverified_accounts, dry_run=True) == 1
+    assert _run(purge_stale_unverified_accounts, dry_run=False) == 1
+    assert not any(_user_exists(user_id) for user_id in user_ids)
+
+def test_account_verified_during_the_run_is_kept(monkeypatch):
+    _run(purge_stale_unverified_accounts, dry_run=False)
+    verified_id, stale_id = _add_stale_user(), _add_stale_user()
+    referenced_user_ids = maintenance._referenced_user_ids
+
+    def verify_between_select_and_delete(db, user_ids):
+        with engine.begin() as conn:
+            conn.execute(update(User.__table__).where(User.__table__.c.id == verified_id).values(is_verified=True))
+        return referenced_user_ids(db, user_ids)
+
+    monkeypatch.setattr(maintenance, "_referenced_user_ids", verify_between_select_and_delete)
+    assert _run(purge_stale_unverified_accounts, dry_run=False) == 1
+    assert _user_exists(verified_id)
+    assert not _user_exists(stale_id)
+
+def test_account_that_changed_email_is_kept(client, register):
+    _run(purge_stale_unverified_accounts, dry_run=False)
+    email, headers = register("changed")
+    response = client.post(
+        "/api/v1/auth/change-email",
+        json={"current_email": email, "new_email": f"new-{email}", "current_password": PASSWORD},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE users SET created_at = :created_at WHERE email = :email"),
+            {"created_at": datetime(2020, 1, 1), "email": f"new-{email}"}
+        )
+        user_id = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": f"new-{email}"}).scalar()
+
+    # Unverified again until the new address is confirmed, but not a stale signup
+    assert _run(purge_stale_unverified_accounts, dry_run=True) == 0
+    assert _run(purge_stale_unverified_accounts, dry_run=False) == 0
+    assert _user_exists(user_id)
@@ -0,0 +1,36 @@
+from sqlalchemy import text
+from app.core.database import engine
+from app.routes import auth
+
+def _me(client, headers, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get("/api/v1/auth/me", headers=headers)
+
+def test_revalidation_does_not_build_the_body(client, register, monkeypatch):
+    _, headers = register("me")
+    first = _me(client, headers)
+    assert first.status_code == 200
+
+    def fail(**kwargs):
+        raise AssertionError("built the response body for a 304")
+
+    monkeypatch.setattr(auth, "UserResponse", fail)
+    response = _me(client, headers, first.headers["etag"])
+    assert response.status_code == 304
+    assert response.headers["etag"] == first.headers["etag"]
+
+def test_change_within_the_same_second_changes_the_etag(client, register):
+    email, headers = register("me")
+    first = _me(client, headers)
+    # As on MySQL, where updated_at keeps whole seconds: the timestamp alone shows no change
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE users SET name = 'renamed', updated_at = :updated_at WHERE email = :email"),
+            {"updated_at": first.json()["data"]["updated_at"].replace("T", " "), "email": email}
+        )
+
+    response = _me(client, headers, first.headers["etag"])
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json()["data"]["name"] == "renamed"
@@ -0,0 +1,58 @@
+import asyncio
+import httpx
+from fastapi import Depends
+from app.core.database import get_db
+from app.core.security import get_current_user, oauth2_scheme
+from app.core.singleflight import single_flight
+
+# Responses shared by SingleFlight or replayed by Idempotency are produced for
+# one caller; CORS headers must still follow each caller's own Origin.
+
+FIRST, SECOND = "https://one.example.com", "https://two.example.com"
+
+def _from(origin):
+    # With a cookie, CORSMiddleware echoes the caller's Origin instead of "*"
+    return {"Origin": origin, "Cookie": "session=1"}
+
+def test_coalesced_responses_carry_each_callers_cors_headers(client, register):
+    from main import app
+    _, headers = register("cors")
+
+    async def slow_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+        # Keep the first request in flight while the second joins it
+        await asyncio.sleep(0.2)
+        return await get_current_user(token, db)
+
+    async def fetch_both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.get("/api/v1/auth/me", headers={**headers, **_from(origin)}) for origin in (FIRST, SECOND)
+            ))
+
+    saved = single_flight.stats()["saved_total"]
+    app.dependency_overrides[get_current_user] = slow_current_user
+    try:
+        first, second = asyncio.run(fetch_both())
+    finally:
+        del app.dependency_overrides[get_current_user]
+
+    assert single_flight.stats()["saved_total"] == saved + 1
+    assert first.status_code == second.status_code == 200
+    assert first.headers["access-control-allow-origin"] == FIRST
+    assert second.headers["access-control-allow-origin"] == SECOND
+
+def test_idempotent_replay_carries_the_retrying_callers_cors_headers(client, register):
+    _, headers = register("cors")
+    request = {"projects": ["Cross-origin"], "language": "english"}
+    first = client.post(
+        "/api/v1/project/onboarding", json=request, headers={**headers, "Idempotency-Key": "cors", **_from(FIRST)}
+    )
+    assert first.status_code == 200, first.text
+    assert first.headers["access-control-allow-origin"] == FIRST
+
+    replay = client.post(
+        "/api/v1/project/onboarding", json=request, headers={**headers, "Idempotency-Key": "cors", **_from(SECOND)}
+    )
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.headers["access-control-allow-origin"] == SECOND
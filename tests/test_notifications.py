@@ -0,0 +1,83 @@
+import asyncio
+import httpx
+import pytest
+from app.core import notifications
+from app.core.config import settings
+from app.core.notifications import NotificationBackend, NotificationHub, notification_hub
+
+def test_backend_must_implement_publish():
+    class Incomplete(NotificationBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_redis_backend_without_redis_fails_at_start(monkeypatch):
+    monkeypatch.setattr(notifications, "redis", None)
+    monkeypatch.setattr(settings, "NOTIFY_BACKEND", "redis")
+    with pytest.raises(RuntimeError, match="redis package"):
+        NotificationHub(10, 10).start()
+
+def test_unknown_backend_fails_at_start(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_BACKEND", "kafka")
+    with pytest.raises(RuntimeError, match="NOTIFY_BACKEND"):
+        NotificationHub(10, 10).start()
+
+def _user_id(client, headers):
+    return client.get("/api/v1/auth/me", headers=headers).json()["data"]["id"]
+
+def _grant(client, owner, grantee_email):
+    response = client.post(
+        "/api/v1/project/access/global", json={"user_email": grantee_email, "role": "observer"}, headers=owner
+    )
+    assert response.status_code == 200, response.text
+
+async def _next_event(queue, timeout=2):
+    return await asyncio.wait_for(queue.get(), timeout)
+
+def test_grant_notifies_only_the_affected_users(client, register):
+    owner_email, owner = register("owner")
+    grantee_email, grantee = register("grantee")
+    _, bystander = register("bystander")
+    owner_id, grantee_id, bystander_id = (_user_id(client, headers) for headers in (owner, grantee, bystander))
+
+    async def run():
+        streams = {user_id: notification_hub.subscribe(user_id) for user_id in (owner_id, grantee_id, bystander_id)}
+        try:
+            # The route runs on the test client's own loop; events come back through the backend
+            await asyncio.to_thread(_grant, client, owner, grantee_email)
+            events = {user_id: await _next_event(streams[user_id][1]) for user_id in (owner_id, grantee_id)}
+            await asyncio.sleep(0.1)
+            return events, streams[bystander_id][1].empty()
+        finally:
+            for user_id, stream in streams.items():
+                notification_hub.unsubscribe(user_id, stream)
+
+    assert isinstance(notification_hub._backend, notifications.LocalBackend)
+    events, bystander_idle = asyncio.run(run())
+    for event in events.values():
+        assert event["event"] == "access_granted"
+        assert event["owner_id"] == owner_id
+    assert bystander_idle
+
+def test_stream_delivers_events(client, register, monkeypatch):
+    from main import app
+    monkeypatch.setattr(settings, "NOTIFY_MAX_STREAM_SECONDS", 1)
+    owner_email, owner = register("owner")
+    grantee_email, grantee = register("grantee")
+    grantee_id = _user_id(client, grantee)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            # The stream ends after NOTIFY_MAX_STREAM_SECONDS, so the whole body can be read
+            stream = asyncio.create_task(http.get("/api/v1/notifications/stream", headers=grantee))
+            while grantee_id not in notification_hub._streams:
+                await asyncio.sleep(0.01)
+            await asyncio.to_thread(_grant, client, owner, grantee_email)
+            return await stream
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: access_granted\n" in response.text
@@ -0,0 +1,40 @@
+def _onboard(client, headers, name):
+    response = client.post(
+        "/api/v1/project/onboarding", json={"projects": [name], "language": "english"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()[0]["id"]
+
+def _detail(client, headers, **request):
+    return client.post("/api/v1/project/detail", json=request, headers=headers)
+
+def test_role_is_the_callers_whatever_email_is_passed(client, register):
+    owner_email, owner = register("owner")
+    grantee_email, grantee = register("grantee")
+    _, stranger = register("stranger")
+    project_id = _onboard(client, owner, "Detail")
+    assert client.post(
+        "/api/v1/project/access/global", json={"user_email": grantee_email, "role": "observer"}, headers=owner
+    ).status_code == 200
+
+    # Naming the owner does not lend the caller the owner's role
+    assert _detail(client, stranger, project_id=project_id, email=owner_email).status_code == 403
+    response = _detail(client, grantee, project_id=project_id, email=owner_email)
+    assert response.status_code == 200
+    assert response.json()["access_type"] == "global"
+    assert response.json()["role"] == "preview_only"
+
+    response = _detail(client, owner, project_id=project_id, email=grantee_email)
+    assert response.status_code == 200
+    assert response.json()["access_type"] == "owner"
+
+def test_lookup_by_owner_email_and_name(client, register):
+    owner_email, owner = register("owner")
+    _, stranger = register("stranger")
+    project_id = _onboard(client, owner, "By name")
+
+    response = _detail(client, owner, email=owner_email, project_name="By name")
+    assert response.status_code == 200
+    assert response.json()["id"] == project_id
+    assert response.json()["owner_email"] == owner_email
+    assert _detail(client, stranger, email=owner_email, project_name="By name").status_code == 403
@@ -0,0 +1,68 @@
+from sqlalchemy import text
+from app.core.database import engine
+
+def _list(client, headers, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get("/api/v1/project/projects", headers=headers)
+
+def _onboard(client, headers, name, keywords=("etag",)):
+    response = client.post(
+        "/api/v1/project/onboarding",
+        json={"projects": [name], "language": "english", "keywords": list(keywords)},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()[0]["id"]
+
+def test_unchanged_list_is_not_modified(client, register):
+    _, headers = register("etag")
+    _onboard(client, headers, "Unchanged")
+    etag = _list(client, headers).headers["etag"]
+
+    response = _list(client, headers, etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+def test_edit_within_the_same_second_changes_the_etag(client, register):
+    _, headers = register("etag")
+    project_id = _onboard(client, headers, "Same second")
+    first = _list(client, headers)
+    updated_at = first.json()["owned_projects"][0]["updated_at"]
+
+    response = client.put("/api/v1/project/keywords", json={"project_id": project_id, "keywords": ["changed"]}, headers=headers)
+    assert response.status_code == 200
+    # As on MySQL, where updated_at keeps whole seconds: the timestamp alone shows no change
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE projects SET updated_at = :updated_at WHERE id = :id"),
+            {"updated_at": updated_at.replace("T", " "), "id": project_id}
+        )
+
+    response = _list(client, headers, first.headers["etag"])
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert "changed" in response.json()["owned_projects"][0]["keywords"]
+
+def test_grantee_etag_follows_the_owner(client, register):
+    owner_email, owner = register("owner")
+    grantee_email, grantee = register("grantee")
+    project_id = _onboard(client, owner, "Shared")
+    assert client.post(
+        "/api/v1/project/access/global", json={"user_email": grantee_email, "role": "observer"}, headers=owner
+    ).status_code == 200
+    granted = _list(client, grantee)
+    assert [p["id"] for p in granted.json()["accessible_projects"]] == [project_id]
+
+    # A change to the owner's data
+    client.put("/api/v1/project/keywords", json={"project_id": project_id, "keywords": ["new"]}, headers=owner)
+    edited = _list(client, grantee, granted.headers["etag"])
+    assert edited.status_code == 200
+
+    # Losing access
+    assert client.request(
+        "DELETE", "/api/v1/project/access/remove", json={"user_email": grantee_email}, headers=owner
+    ).status_code == 200
+    revoked = _list(client, grantee, edited.headers["etag"])
+    assert revoked.status_code == 200
+    assert revoked.json()["accessible_projects"] == []
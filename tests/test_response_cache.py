@@ -0,0 +1,137 @@
+import pytest
+from app.core.response_cache import response_cache
+from tests.conftest import PASSWORD
+
+# Every mutation must drop the cached list and detail responses of every user
+# whose view it changes, or those users keep reading the old data until the TTL.
+
+@pytest.fixture
+def shared(client, register):
+    """An owner with one project, shared globally, individually, and a bystander, all with warm caches."""
+    users = {name: register(name) for name in ("owner", "global", "individual", "other")}
+    owner = users["owner"][1]
+    response = client.post(
+        "/api/v1/project/onboarding",
+        json={"projects": ["Cached"], "language": "english", "keywords": ["before"]},
+        headers=owner
+    )
+    assert response.status_code == 200, response.text
+    project_id = response.json()[0]["id"]
+    assert client.post(
+        "/api/v1/project/access/global", json={"user_email": users["global"][0], "role": "administrator"}, headers=owner
+    ).status_code == 200
+    assert client.post(
+        "/api/v1/project/access/project",
+        json={"user_email": users["individual"][0], "project_id": project_id, "role": "preview_only"},
+        headers=owner
+    ).status_code == 200
+
+    ids = {}
+    for name, (email, headers) in users.items():
+        ids[name] = client.get("/api/v1/auth/me", headers=headers).json()["data"]["id"]
+        assert client.get("/api/v1/project/projects", headers=headers).status_code == 200
+        if name != "other":
+            assert client.post("/api/v1/project/detail", json={"project_id": project_id}, headers=headers).status_code == 200
+    for name in ("owner", "global", "individual"):
+        assert _cached(ids[name], "projects") and _cached(ids[name], _detail_key(project_id))
+    return {"users": users, "ids": ids, "project_id": project_id}
+
+def _detail_key(project_id):
+    return f"detail:{project_id}:None:None"
+
+def _cached(user_id, key):
+    return response_cache.get(user_id, key) is not None
+
+def _grant_global(client, ctx):
+    return client.post(
+        "/api/v1/project/access/global",
+        json={"user_email": ctx["users"]["other"][0], "role": "observer"},
+        headers=ctx["users"]["owner"][1]
+    )
+
+def _grant_project(client, ctx):
+    return client.post(
+        "/api/v1/project/access/project",
+        json={"user_email": ctx["users"]["other"][0], "project_id": ctx["project_id"], "role": "full_access"},
+        headers=ctx["users"]["owner"][1]
+    )
+
+def _revoke_global(client, ctx):
+    return client.request(
+        "DELETE", "/api/v1/project/access/remove",
+        json={"user_email": ctx["users"]["global"][0]}, headers=ctx["users"]["owner"][1]
+    )
+
+def _revoke_project(client, ctx):
+    return client.request(
+        "DELETE", "/api/v1/project/access/remove",
+        json={"user_email": ctx["users"]["individual"][0], "project_id": ctx["project_id"]},
+        headers=ctx["users"]["owner"][1]
+    )
+
+def _update_keywords(client, ctx):
+    # By the global administrator, not the owner: the owner's caches must go too
+    return client.put(
+        "/api/v1/project/keywords",
+        json={"project_id": ctx["project_id"], "keywords": ["after"]},
+        headers=ctx["users"]["global"][1]
+    )
+
+def _delete_project(client, ctx):
+    return client.delete(f"/api/v1/project/{ctx['project_id']}", headers=ctx["users"]["owner"][1])
+
+@pytest.mark.parametrize("mutation, list_evicted", [
+    (_grant_global, ["other"]),
+    (_grant_project, ["other"]),
+    (_revoke_global, ["global"]),
+    (_revoke_project, ["individual"]),
+    (_update_keywords, ["owner", "global", "individual"]),
+    (_delete_project, ["owner", "global", "individual"]),
+])
+def test_mutation_evicts_every_affected_user(client, shared, mutation, list_evicted):
+    ids = shared["ids"]
+    assert client.get("/api/v1/project/projects", headers=shared["users"]["other"][1]).status_code == 200
+    response = mutation(client, shared)
+    assert response.status_code == 200, response.text
+
+    for name in list_evicted:
+        assert not _cached(ids[name], "projects"), f"{name}'s project list is still cached"
+    # Details are derived from the owner's data, so every one of them goes
+    for name in ("owner", "global", "individual"):
+        assert not _cached(ids[name], _detail_key(shared["project_id"])), f"{name}'s project detail is still cached"
+
+def test_fresh_responses_after_eviction(client, shared):
+    users = shared["users"]
+    assert _update_keywords(client, shared).status_code == 200
+    for name in ("owner", "global", "individual"):
+        listing = client.get("/api/v1/project/projects", headers=users[name][1]).json()
+        projects = listing["owned_projects"] + listing["accessible_projects"]
+        assert "after" in projects[0]["keywords"] and "before" not in projects[0]["keywords"]
+
+    assert _revoke_global(client, shared).status_code == 200
+    listing = client.get("/api/v1/project/projects", headers=users["global"][1]).json()
+    assert listing["accessible_projects"] == []
+
+def test_email_change_evicts_details_embedding_the_owner(client, shared):
+    users, ids = shared["users"], shared["ids"]
+    owner_email, owner = users["owner"]
+    new_email = "renamed-" + owner_email
+    response = client.post(
+        "/api/v1/auth/change-email",
+        json={"current_email": owner_email, "current_password": PASSWORD, "new_email": new_email},
+        headers=owner
+    )
+    assert response.status_code == 200, response.text
+
+    for name in ("owner", "global", "individual"):
+        assert not _cached(ids[name], _detail_key(shared["project_id"]))
+    detail = client.post("/api/v1/project/detail", json={"project_id": shared["project_id"]}, headers=users["global"][1])
+    assert detail.json()["owner_email"] == new_email
+
+def test_metrics_require_a_service_key(client, register, service_headers):
+    _, headers = register("metrics")
+    assert client.get("/api/v1/metrics").status_code == 403
+    assert client.get("/api/v1/metrics", headers=headers).status_code == 403
+    response = client.get("/api/v1/metrics", headers=service_headers)
+    assert response.status_code == 200
+    assert "response_cache" in response.json()
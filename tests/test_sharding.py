@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import uuid
+from collections import OrderedDict
+import pytest
+from sqlalchemy import create_engine, insert, select, text, update
+from app.core.config import settings
+from app.core.database import engine
+from app.core.sharding import shard_metadata, shard_router
+from app.models.project import Project
+from app.models.shard import ShardOverride
+from tests.conftest import DATA_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def shards(monkeypatch):
+    """Three shards: the primary and two more SQLite files."""
+    extra = [create_engine(f"sqlite:///{DATA_DIR}/shard-{uuid.uuid4().hex[:8]}.db") for _ in range(2)]
+    metadata = shard_metadata()
+    for shard_engine in extra:
+        metadata.create_all(bind=shard_engine)
+    monkeypatch.setattr(shard_router, "engines", [engine, *extra])
+    monkeypatch.setattr(shard_router, "_overrides", {})
+    monkeypatch.setattr(shard_router, "_overrides_loaded_at", float("-inf"))
+    monkeypatch.setattr(shard_router, "_project_owners", OrderedDict())
+    monkeypatch.setattr(settings, "SHARD_PLACEMENT_REFRESH_SECONDS", 0)
+    yield shard_router.engines
+    for shard_engine in extra:
+        shard_engine.dispose()
+
+def _user_id(email):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).scalar()
+
+def _onboard(client, headers, name):
+    return client.post(
+        "/api/v1/project/onboarding", json={"projects": [name], "language": "english"}, headers=headers
+    )
+
+def _shards_holding(shards, project_id):
+    found = []
+    for shard, shard_engine in enumerate(shards):
+        with shard_engine.connect() as conn:
+            if conn.execute(select(Project.id).where(Project.id == project_id)).first():
+                found.append(shard)
+    return found
+
+def _set_override(owner_id, shard, moving=False):
+    with engine.begin() as conn:
+        conn.execute(insert(ShardOverride.__table__).values(owner_id=owner_id, shard=shard, moving=moving))
+
+def test_projects_are_written_to_the_owners_shard(client, register, shards):
+    for name in ("first", "second", "third"):
+        email, headers = register(name)
+        response = _onboard(client, headers, f"Routed {name}")
+        assert response.status_code == 200, response.text
+        assert _shards_holding(shards, response.json()[0]["id"]) == [_user_id(email) % len(shards)]
+
+def test_granted_projects_are_gathered_from_every_shard(client, register, shards):
+    grantee_email, grantee = register("grantee")
+    owners = [register(f"owner{i}") for i in range(2)]
+    assert len({_user_id(email) % len(shards) for email, _ in owners}) == 2
+
+    project_ids = set()
+    for i, (_, owner) in enumerate(owners):
+        response = _onboard(client, owner, f"Scattered {i}")
+        project_ids.add(response.json()[0]["id"])
+        response = client.post(
+            "/api/v1/project/access/global", json={"user_email": grantee_email, "role": "observer"}, headers=owner
+        )
+        assert response.status_code == 200, response.text
+
+    response = client.get("/api/v1/project/projects", headers=grantee)
+    assert response.status_code == 200
+    assert {p["id"] for p in response.json()["accessible_projects"]} == project_ids
+
+def test_override_moves_an_owner_to_another_shard(client, register, shards):
+    email, headers = register("moved")
+    owner_id = _user_id(email)
+    target = (owner_id + 1) % len(shards)
+    _set_override(owner_id, target)
+
+    response = _onboard(client, headers, "Overridden")
+    assert response.status_code == 200, response.text
+    project_id = response.json()[0]["id"]
+    assert _shards_holding(shards, project_id) == [target]
+    # Routes addressed by project id find it through the directory
+    response = client.post("/api/v1/project/detail", json={"project_id": project_id}, headers=headers)
+    assert response.status_code == 200, response.text
+
+def test_writes_are_refused_while_an_owner_is_moving(client, register, shards):
+    email, headers = register("moving")
+    owner_id = _user_id(email)
+    _set_override(owner_id, owner_id % len(shards), moving=True)
+
+    response = _onboard(client, headers, "Mid-move")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    with engine.begin() as conn:
+        conn.execute(update(ShardOverride.__table__).where(ShardOverride.owner_id == owner_id).values(moving=False))
+    assert _onboard(client, headers, "Mid-move").status_code == 200
+
+def test_init_db_on_sqlite():
+    database = f"sqlite:///{DATA_DIR}/init-{uuid.uuid4().hex[:8]}.db"
+    env = {**os.environ, "DATABASE_URL": database, "DATABASE_SHARD_URLS": ""}
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "scripts", "init_db.py")],
+        env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert "successfully added" in result.stdout, result.stdout
+
+    seeded = create_engine(database)
+    try:
+        with seeded.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM projects")).scalar() == 3
+            assert conn.execute(text("SELECT COUNT(*) FROM one_time_tokens")).scalar() == 1
+    finally:
+        seeded.dispose()
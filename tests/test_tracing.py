@@ -0,0 +1,48 @@
+import asyncio
+import ipaddress
+import pytest
+from app.core import tracing
+from app.core.config import settings
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SAMPLED = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+NOT_SAMPLED = f"00-{TRACE_ID}-00f067aa0ba902b7-00"
+
+@pytest.fixture(autouse=True)
+def tracing_setup(monkeypatch):
+    monkeypatch.setattr(tracing, "trusted_networks", [ipaddress.ip_network("10.0.0.0/8")])
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(tracing.exporter, "submit", lambda span: None)
+
+def _root_span(client_host, traceparent=None):
+    """Run a request through TracingMiddleware and return the span it ran under."""
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(tracing.current_span.get())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    headers = [(b"traceparent", traceparent.encode())] if traceparent else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (client_host, 40000)}
+    asyncio.run(tracing.TracingMiddleware(app)(scope, None, send))
+    return seen[0]
+
+def test_trusted_caller_decides_sampling():
+    root = _root_span("10.1.2.3", SAMPLED)
+    assert root is not None
+    assert root.trace_id == TRACE_ID
+    assert _root_span("10.1.2.3", NOT_SAMPLED) is None
+
+def test_untrusted_caller_cannot_force_sampling():
+    assert _root_span("203.0.113.9", SAMPLED) is None
+    assert _root_span("testclient", SAMPLED) is None
+
+def test_untrusted_caller_still_joins_the_trace_when_sampled(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    root = _root_span("203.0.113.9", NOT_SAMPLED)
+    assert root.trace_id == TRACE_ID
+    assert root.parent_span_id == "00f067aa0ba902b7"
@@ -6,6 +6,7 @@ from email.mime.base import MIMEBase
 from email import encoders
 from dotenv import load_dotenv
 from typing import Optional, List
+from app.core.tracing import span
 load_dotenv()
 
 def create_html_message(content: str) -> str:
@@ -91,11 +92,12 @@ def send_verification_email(to: str, verification_url: str, cc: Optional[str] =
     
     # Send email using Zoho SMTP with TLS
     try:
-        server = smtplib.SMTP('smtp.zoho.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
-        server.quit()
+        with span("smtp.send", host="smtp.zoho.com", kind="verification"):
+            server = smtplib.SMTP('smtp.zoho.com', 587)
+            server.starttls()
+            server.login(sender_email, sender_password)
+            server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
+            server.quit()
     except Exception as e:
         raise Exception(f"Failed to send email: {str(e)}")
 
@@ -136,11 +138,12 @@ def send_reset_password_email(to: str, reset_url: str, cc: Optional[str] = None)
     
     # Send email using Zoho SMTP with TLS
     try:
-        server = smtplib.SMTP('smtp.zoho.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
-        server.quit()
+        with span("smtp.send", host="smtp.zoho.com", kind="reset_password"):
+            server = smtplib.SMTP('smtp.zoho.com', 587)
+            server.starttls()
+            server.login(sender_email, sender_password)
+            server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
+            server.quit()
     except Exception as e:
         raise Exception(f"Failed to send email: {str(e)}")
 
@@ -187,10 +190,11 @@ def send_report_email(to: str, file_path: str, topic: str, date_range: str, cc:
     
     # Send email using Zoho SMTP with TLS
     try:
-        server = smtplib.SMTP('smtp.zoho.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
-        server.quit()
+        with span("smtp.send", host="smtp.zoho.com", kind="report"):
+            server = smtplib.SMTP('smtp.zoho.com', 587)
+            server.starttls()
+            server.login(sender_email, sender_password)
+            server.sendmail(sender_email, [to] + ([cc] if cc else []), message.as_string())
+            server.quit()
     except Exception as e:
         raise Exception(f"Failed to send email: {str(e)}")